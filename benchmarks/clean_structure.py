@@ -0,0 +1,49 @@
+"""Per-molecule latency of naclo.clean_structure against a one-row Bleach.main and the bare RDKit calls.
+
+Usage: python benchmarks/clean_structure.py [--n N]
+"""
+import argparse
+import copy
+import time
+
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem.Descriptors import ExactMolWt
+
+from naclo import Bleach, bleach_default_options, clean_structure, fragments
+
+
+SMILES = 'Cc1cc(/C=C/C#N)cc(C)c1Nc1nc(Nc2ccc(C#N)cc2)ncc1N.Cl'
+
+
+def rdkit_only(smiles:str) -> None:
+    """The RDKit and string calls Bleach makes for one structure with default options."""
+    smiles = fragments.remove_recognized_salts(Chem.MolToSmiles(Chem.MolFromSmiles(smiles)))
+    mol = Chem.MolFromSmiles(fragments.carbon_count(smiles))
+    Chem.MolToSmiles(mol)
+    Chem.MolToInchiKey(mol)
+    ExactMolWt(mol)
+
+def bleach(smiles:str) -> None:
+    Bleach(pd.DataFrame({'SMILES': [smiles]}), {'structure_col': 'SMILES', 'structure_type': 'smiles',
+                                                 'target_col': ''}, copy.deepcopy(bleach_default_options)).main()
+
+def timeit(func, n:int) -> float:
+    func(SMILES)  # Warm caches
+    start = time.perf_counter()
+    for _ in range(n):
+        func(SMILES)
+    return (time.perf_counter() - start)/n
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, func, n in [('rdkit calls', rdkit_only, args.n), ('clean_structure', clean_structure, args.n),
+                          ('Bleach.main (1 row)', bleach, max(args.n // 40, 1))]:
+        print(f'{name:<22} {timeit(func, n)*1000:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
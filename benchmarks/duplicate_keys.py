@@ -0,0 +1,44 @@
+"""Cost of each duplicate key strategy: key computation alone and Bleach.handle_duplicates with inchi keys off.
+
+Usage: python benchmarks/duplicate_keys.py [--n N]
+"""
+import argparse
+import time
+
+import pandas as pd
+from rdkit import Chem
+
+from naclo import Bleach, mol_conversion
+
+
+SMILES = ['Cc1cc(/C=C/C#N)cc(C)c1Nc1nc(Nc2ccc(C#N)cc2)ncc1N',
+          'Cc1cc(/C=C/C#N)cc(C)c1Nc1ncc(N)c(Nc2c(C)cc(/C=C/C#N)cc2C)n1',
+          'O=C(O)C1(Sc2ccnc3ccc(Br)cc23)CCC1',
+          'CC(C)(Sc1ccncc1-c1ccc(C#N)c2ccccc12)C(=O)O',
+          'CN1CCN(Cc2ccc(C(=O)Nc3ccc(C)c(Nc4nccc(-c5cccnc5)n4)c3)cc2)CC1']
+
+
+def timeit(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=20000, help='Rows (each structure repeated n/5 times)')
+    args = parser.parse_args()
+
+    mols = [Chem.MolFromSmiles(SMILES[i % len(SMILES)]) for i in range(args.n)]
+    df = pd.DataFrame({'ROMol': mols, 'value': range(args.n)})
+
+    print(f'{"key":<18} {"keys (s)":>10} {"handle_duplicates (s)":>22}')
+    for key_type in mol_conversion.duplicate_key_types:
+        key_function = mol_conversion.duplicate_key_function(key_type)
+        keys = timeit(lambda: [key_function(m) for m in mols])
+        handle = timeit(lambda: Bleach.handle_duplicates(df, 'ROMol', 'InchiKey', 'value', key=key_type,
+                                                         inchi_keys=False))
+        print(f'{key_type:<18} {keys:>10.3f} {handle:>22.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Import time of naclo entry points, each measured in a fresh interpreter.
+
+Usage: python benchmarks/import_time.py [--repeat N]
+
+Reports the median wall time of each statement and which heavy dependencies it loaded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+STATEMENTS = [
+    'import naclo',
+    'from naclo import UnitConverter',
+    'from naclo import mol_conversion',
+    'from naclo import Bleach',
+    'import naclo; naclo.bleach_default_options',
+]
+HEAVY = ['pandas', 'rdkit.Chem', 'stse', 'pymongo', 'plotly', 'xlsxwriter', 'pyarrow']
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure(statement:str, repeat:int) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), '..', 'src'))
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement, heavy=HEAVY)], env=env,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {'seconds': statistics.median(r['seconds'] for r in runs), 'loaded': runs[-1]['loaded']}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for statement in STATEMENTS:
+        result = measure(statement, args.repeat)
+        print(f'{statement:<45} {result["seconds"]*1000:8.1f} ms   loads: {", ".join(result["loaded"]) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
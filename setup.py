@@ -19,7 +19,8 @@ setup(
                             'assets/recognized_binarize_options.json',
                             'assets/recognized_units.json',
                             'assets/recognized_salts.json']},
-    python_requires='>=3.6',
+    entry_points={'console_scripts': ['naclo = naclo.cli:main']},
+    python_requires='>=3.7',
     install_requires=[
         'numpy',
         'pandas',
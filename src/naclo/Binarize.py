@@ -1,21 +1,25 @@
-from typing import Iterable, List, Optional, Tuple, Union
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+import asyncio
 import warnings
+from concurrent.futures import Executor
 import pandas as pd
-from copy import copy
 import numpy as np
 
 import naclo
 import stse
-from stse.dataframes import sync_na_drop
-from naclo.__asset_loader import recognized_binarize_options
-from naclo.__naclo_util import recognized_options_checker, check_columns_in_df
+from naclo.__asset_loader import binarize_default_options, recognized_binarize_options
+from naclo.__naclo_util import check_columns_in_df, fill_default_options, map_chunks, recognized_options_checker
 
 class Binarize:
+    _duplicate_key_col = 'naclo_duplicate_key'  # Temporary grouping column, dropped from the output
+    active_operators = ['>', '<', '>=', '<=']
+    qualifier_codes = {'<': 1, '≤': 1, '>': 2, '≥': 3, '=': 4}  # Unrecognized: 0
+    
     def __init__(self, df:pd.DataFrame, params:dict, options:dict) -> None:
         self.df = df.copy()
         
-        self.__options = copy(options)
-        recognized_options_checker(options, recognized_binarize_options)
+        self.__options = fill_default_options(options, binarize_default_options)  # Missing settings take defaults
+        recognized_options_checker(self.__options, recognized_binarize_options)
         
         # Params
         self.__structure_col = params['structure_col']
@@ -74,55 +78,108 @@ class Binarize:
 
     @staticmethod
     def handle_duplicates(df:pd.DataFrame, structure_type:str, structure_col_name:str, bin_value_col_name:str,
-                          agree_ratio:float=.8) -> pd.DataFrame:
+                          agree_ratio:float=.8, key:str='inchi_key') -> pd.DataFrame:
+        Binarize.__check_agree_ratio(agree_ratio)
+        df = Binarize.__append_duplicate_keys(df, structure_type, structure_col_name, key)
+        return Binarize._aggregate_duplicates(df, bin_value_col_name, agree_ratio)
+
+    @staticmethod
+    def __check_agree_ratio(agree_ratio:float) -> None:
         if agree_ratio < 0 or agree_ratio > 1:
             raise ValueError('Agree ratio must be between 0 and 1')
         elif agree_ratio == 0.5:
             warnings.warn(f'Agree ratio of 0.5 will yield a 1 if structures are in 50{0} agreement'.format('%'))
-        
+
+    @staticmethod
+    def __append_duplicate_keys(df:pd.DataFrame, structure_type:str, structure_col_name:str, key:str,
+                                dropna:bool=True) -> pd.DataFrame:
         if structure_type == 'smiles':
-            df = naclo.dataframes.df_smiles_2_inchi_keys(df, structure_col_name, 'inchi_key')
+            return naclo.dataframes.df_smiles_2_duplicate_keys(df, structure_col_name, Binarize._duplicate_key_col,
+                                                               key, dropna=dropna)
         elif structure_type == 'mol':
-            df = naclo.dataframes.df_mols_2_inchi_keys(df, structure_col_name, 'inchi_key')
+            return naclo.dataframes.df_mols_2_duplicate_keys(df, structure_col_name, Binarize._duplicate_key_col,
+                                                             key, dropna=dropna)
         else:
             raise ValueError(f'Unrecognized structure type: {structure_type}')
-        
-        avg_df = stse.duplicates.average(df, subsets=['inchi_key'], average_by=bin_value_col_name) \
-            .reset_index(drop=True)
-
-        new_bins = []
-        for i, val in enumerate(avg_df[bin_value_col_name]):
-            if val >= agree_ratio:  # NOTE: Will default to 1 if agree ratio is set to 0.5
-                new_bins.append(1)
-            elif val <= 1 - agree_ratio:
-                new_bins.append(0)
-            else:
-                avg_df.drop(index=i, inplace=True)
-        avg_df[bin_value_col_name] = new_bins
-        
-        return avg_df.reset_index(drop=True).drop(columns=['inchi_key'])
+
+    @staticmethod
+    def _aggregate_duplicates(df:pd.DataFrame, bin_value_col_name:str, agree_ratio:float=.8) -> pd.DataFrame:
+        """Merges duplicates of an existing key column (dropped from the output) by agree ratio."""
+        df = df.dropna(subset=[Binarize._duplicate_key_col])
+        avg_df = naclo.aggregate.aggregate_duplicates(df, Binarize._duplicate_key_col, [bin_value_col_name])
+
+        ratios = avg_df[bin_value_col_name].to_numpy()
+        active = ratios >= agree_ratio  # NOTE: Will default to 1 if agree ratio is set to 0.5
+        agreed = active | (ratios <= 1 - agree_ratio)
+        avg_df = avg_df[agreed].copy()
+        avg_df[bin_value_col_name] = active[agreed].astype(int)
+
+        return avg_df.reset_index(drop=True).drop(columns=[Binarize._duplicate_key_col])
     
     def __instance_handle_duplicates(self) -> pd.DataFrame:
         self.df = Binarize.handle_duplicates(self.df, self.__structure_type, self.__structure_col,
-                                             self.binarized_col_name, self.__options['duplicates']['agree_ratio'])
+                                             self.binarized_col_name, self.__options['duplicates']['agree_ratio'],
+                                             self.__options['duplicates']['key'])
         return self.df
         
+    @staticmethod
+    def parse_qualifiers(qualifiers:Iterable) -> np.ndarray:  # *
+        """Qualifier codes for binarize, parsed once per distinct qualifier. Quotes are stripped, anything but <, ≤,
+        >, ≥ and = (e.g. >=, ~) is unrecognized.
+
+        Args:
+            qualifiers (Iterable): Qualifier strings.
+
+        Returns:
+            np.ndarray: int8 code per qualifier, values of Binarize.qualifier_codes (0 if unrecognized).
+        """
+        codes, uniques = pd.factorize(pd.Series(qualifiers, dtype=object))
+        unique_codes = [Binarize.qualifier_codes.get(q.replace('\'', ''), 0) if isinstance(q, str) else 0
+                        for q in uniques]
+        return np.append(np.array(unique_codes, dtype=np.int8), np.int8(0))[codes]  # NA (code -1) -> unrecognized
+
     @staticmethod
     def binarize(df:pd.DataFrame, values:Iterable, decision_boundary:Union[int, float, np.number], active_operator:str,
-                 qualifier_col_name:Optional[str]=None) -> Tuple[pd.DataFrame, np.array]:
+                 qualifier_col_name:Optional[str]=None) -> Tuple[pd.DataFrame, np.array]:  # *
+        """Labels values active (1) or inactive (0) by the decision boundary. A value on the boundary is active if the
+        active operator includes "=". With qualifiers (rows with NA qualifiers are dropped), a qualifier that
+        contradicts the label (e.g. "<" above the boundary), an unrecognized qualifier or "≥" on the boundary gives NA.
+        Same labels as stse.Binarizer.
+
+        Args:
+            df (pd.DataFrame): Data.
+            values (Iterable): Float castable value per row of df.
+            decision_boundary (Union[int, float, np.number]): Boundary.
+            active_operator (str): One of Binarize.active_operators.
+            qualifier_col_name (Optional[str], optional): Qualifier column. Defaults to None.
+
+        Raises:
+            ValueError: Unrecognized active operator, or values not the length of df with qualifiers.
+
+        Returns:
+            Tuple[pd.DataFrame, np.array]: df (without NA qualifier rows) and float labels.
+        """
+        if active_operator not in Binarize.active_operators:
+            raise ValueError(f'Active operator must be one of the following: {Binarize.active_operators}')
+        values = np.asarray(values, dtype=float)  # Cast any strings to floats
         if qualifier_col_name:
-            df, values = sync_na_drop(df, qualifier_col_name, values, all_na=True)  # Drop NA
-            # qualifiers = [q.replace('\'', '') for q in df[qualifier_col_name].tolist()]
-            qualifiers = [q.replace('\'', '') for q in df[qualifier_col_name].tolist()]
-        else:
-            qualifiers = None
-        
-        values = np.array(values, dtype=float)  # Cast any strings to floats
-            
-        binarizer = stse.Binarizer(values=values, boundary=decision_boundary, active_operator=active_operator,
-                                   qualifiers=qualifiers)
-        return df, binarizer.binarize()
-    
+            if len(values) != len(df):
+                raise ValueError('All iterables must be the same length as the dataframe.')
+            has_qualifier = df[qualifier_col_name].notna().to_numpy()
+            df, values = df[has_qualifier], values[has_qualifier]
+
+        greater = values > decision_boundary  # False for NA
+        on_boundary = values == decision_boundary
+        labels = (greater if '>' in active_operator else ~greater).astype(float)
+        labels[on_boundary] = 1 if '=' in active_operator else 0
+
+        if qualifier_col_name:
+            codes = Binarize.parse_qualifiers(df[qualifier_col_name])
+            agrees = ((codes == 1) & (values < decision_boundary)) | ((codes >= 2) & (codes <= 3) & greater) | \
+                ((codes == 4) & ~np.isnan(values))
+            labels[~(agrees | on_boundary) | (on_boundary & (codes == 3))] = np.nan
+        return df, labels
+
     def __instance_binarize(self, values:Iterable):
         qualifier_col_name = self.__options['qualifiers']['qualifier_col'] if self.__options['qualifiers']['run'] \
             else None
@@ -131,17 +188,84 @@ class Binarize:
                                  active_operator=self.__options['active_operator'],
                                  qualifier_col_name=qualifier_col_name)
     
+    @staticmethod
+    def _molecule_chunk(df:pd.DataFrame, structure_type:str, structure_col_name:str, target_col_name:str,
+                        units_col_name:str, output_units:str,
+                        key:Optional[str]) -> Tuple[Optional[np.ndarray], Optional[pd.Series]]:
+        """Molecule work of main on one chunk, for amain: converted values (if units_col_name) and duplicate keys (if
+        key, NA kept). Static and single underscore so process pools can pickle it."""
+        values = Binarize.convert_units(df, structure_col_name, target_col_name, units_col_name, structure_type,
+                                        output_units).to_numpy(dtype=float) if units_col_name else None
+        keys = Binarize.__append_duplicate_keys(df, structure_type, structure_col_name, key,
+                                                dropna=False)[Binarize._duplicate_key_col] if key else None
+        return values, keys
+
+    async def amain(self, executor:Optional[Executor]=None, chunksize:int=1000, n_jobs:int=1,
+                    progress:Optional[Callable]=None) -> pd.DataFrame:
+        """Asynchronous main. Mol weights and duplicate keys are computed in chunks in an executor so the event loop stays
+        responsive, binarization and duplicates follow in the executor. Cancelling the awaiting task stops scheduling
+        chunks.
+
+        Args:
+            executor (Optional[Executor], optional): Thread or process pool. Defaults to None (event loop default).
+            chunksize (int, optional): Rows per chunk. Defaults to 1000.
+            n_jobs (int, optional): Chunks in flight at once. Defaults to 1.
+            progress (Optional[Callable], optional): Called (or awaited) with (rows done, total rows) after each
+                chunk. Defaults to None.
+
+        Returns:
+            pd.DataFrame: Binarized data.
+        """
+        loop = asyncio.get_running_loop()
+        units_col = self.__options['convert_units']['units_col']
+        output_units = self.__options['convert_units']['output_units']
+        run_duplicates = self.__options['duplicates']['run']
+        if run_duplicates:
+            Binarize.__check_agree_ratio(self.__options['duplicates']['agree_ratio'])
+
+        chunks = await map_chunks(Binarize._molecule_chunk, self.df, self.__structure_type, self.__structure_col,
+                                  self.__target_col, units_col, output_units,
+                                  self.__options['duplicates']['key'] if run_duplicates else None, executor=executor,
+                                  chunksize=chunksize, n_jobs=n_jobs, progress=progress)
+        values, keys = zip(*chunks)
+
+        if units_col:
+            values = np.concatenate(values)
+            self.df[f'{output_units}_{self.__target_col}'] = values
+        else:
+            values = self.df[self.__target_col]
+        if run_duplicates:
+            self.df[Binarize._duplicate_key_col] = pd.concat(keys).to_numpy()  # Chunks are in row order
+
+        qualifier_col_name = self.__options['qualifiers']['qualifier_col'] if self.__options['qualifiers']['run'] \
+            else None
+        df, bin_values = await loop.run_in_executor(executor, Binarize.binarize, self.df, values,
+                                                    self.__decision_boundary, self.__options['active_operator'],
+                                                    qualifier_col_name)
+        df[self.binarized_col_name] = bin_values
+
+        if run_duplicates:
+            df = await loop.run_in_executor(executor, Binarize._aggregate_duplicates, df, self.binarized_col_name,
+                                            self.__options['duplicates']['agree_ratio'])
+
+        if self.__options['drop_na']:
+            df = df.dropna(subset=[self.binarized_col_name])
+
+        self.df = df
+        return self.df
+
     def main(self) -> pd.DataFrame:
         if self.__options['convert_units']['units_col']:
             # Convert and append units
             output_units = self.__options['convert_units']['output_units']
-            converted_values = self.convert_units(output_units).tolist()
+            converted_values = self.convert_units(output_units).to_numpy(dtype=float)
             
             self.df[f'{output_units}_{self.__target_col}'] = converted_values
             self.df, bin_values = self.binarize(converted_values)
             self.df[self.binarized_col_name] = bin_values
         else:
-            self.df[self.binarized_col_name] = self.binarize(self.df[self.__target_col].tolist())
+            self.df, bin_values = self.binarize(self.df[self.__target_col])
+            self.df[self.binarized_col_name] = bin_values
             
         if self.__options['duplicates']['run']:
             self.df = self.handle_duplicates()
@@ -1,6 +1,11 @@
+import asyncio
+import functools
+import numpy as np
 import pandas as pd
 import warnings
-from typing import Callable, Dict, Union, Optional
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Tuple, Union, Optional
+from rdkit import Chem
 
 # sourced from github.com/jwgerlach00
 import naclo
@@ -8,14 +13,16 @@ import stse
 from naclo.__asset_loader import recognized_bleach_options as recognized_options
 from naclo.__asset_loader import bleach_default_params as default_params
 from naclo.__asset_loader import bleach_default_options as default_options
-from naclo.__naclo_util import recognized_options_checker
+from naclo.__naclo_util import fill_default_options, map_chunks, recognized_options_checker
 
 
 class Bleach:
     filter_fragments_methods = ['carbon_count', 'mw', 'atom_count', 'none']
+    _duplicate_key_col = 'naclo_duplicate_key'  # Temporary grouping column for duplicate keys other than inchi key
     
     def __init__(self, df:pd.DataFrame, params:dict=default_params, options:dict=default_options) -> None:  # *
-        # Load user options
+        # Load user options, settings missing from them take their default
+        options = fill_default_options(options, default_options)
         self.mol_settings = options['molecule_settings']
         self.file_settings = options['file_settings']
         recognized_options_checker(options, recognized_options)
@@ -25,22 +32,26 @@ class Bleach:
             'smiles': 'SMILES',
             'mol': 'ROMol',
             'inchi_key': 'InchiKey',
-            'mw': 'MW'
+            'mw': 'MW',
+            'failure': 'FailureReason'
         }
 
-        # Save user input data
-        self.original_df = df.copy()
-        self.df = df.copy()
+        # Save user input data. Steps never modify a frame in place, so the input is not copied (main and amain copy
+        # only the working columns)
+        self.original_df = df
+        self.df = df
 
         # Load file parameters
         self.structure_col = params['structure_col']
         self.structure_type = params['structure_type']
         self.target_col = params['target_col']
         self.__param_checker()
+        self.statistics = self.__selected_statistics()
 
         self.mol_col = None
         self.smiles_col = None
         self.inchi_key_col = None
+        self.failure_col = None
         self.__set_structure_cols()  # Assign mol and SMILES cols using input + defaults
         
         # Set staticmethods to instance methods
@@ -77,41 +88,74 @@ class Bleach:
                 the data: "{list(self.df.columns)}"')
 
 
+    def __selected_statistics(self) -> Tuple[str, ...]:
+        """Statistics switched on in options.file_settings.duplicate_compounds.statistics, in the order of
+        naclo.aggregate.statistics.
+
+        Raises:
+            ValueError: NO_STATISTICS
+        """
+        duplicates = self.file_settings['duplicate_compounds']
+        statistics = tuple(s for s in naclo.aggregate.statistics if duplicates['statistics'][s])
+        if not statistics and duplicates['selected'] == 'average':
+            raise ValueError('NO_STATISTICS', 'Averaging duplicates needs at least one of \
+                options.file_settings.duplicate_compounds.statistics')
+        return statistics
+
+
 # -------------------------------------------------- PRIVATE METHODS ------------------------------------------------- #
     def __set_structure_cols(self) -> None:
         """Sets Mol and SMILES columns using declared structure type."""
         self.mol_col = self.structure_col if self.structure_type == 'mol' else self.__default_cols['mol']
         self.smiles_col = self.structure_col if self.structure_type == 'smiles' else self.__default_cols['smiles']
         self.inchi_key_col = self.__default_cols['inchi_key']
+        self.failure_col = self.__default_cols['failure']
 
-    def __drop_na_structures(self) -> None:
-        """Drops NA along declared structure column."""
-        self.df.dropna(subset=[self.structure_col], inplace=True)
-        if not len(self.df):
-            warnings.warn('ALL_NA_STRUCTURES: All structures in specified column were NA, all rows dropped',
-                          RuntimeWarning)
+    @staticmethod
+    def _drop_na_rows(df:pd.DataFrame, structure_col:str, target_col:str,
+                      run_na_targets:bool) -> Tuple[pd.DataFrame, int]:
+        """Converts blanks to NA. Drops NA structures, then NA targets if run and a target column is declared.
 
-    def __drop_na_targets(self) -> None:
-        """Drops NA along declared target column"""
+        Returns:
+            Tuple[pd.DataFrame, int]: Remaining rows, rows with a structure.
+        """
+        df = stse.dataframes.convert_to_nan(df).dropna(subset=[structure_col])
+        n_structures = len(df)
+        if target_col and run_na_targets:
+            df = df.dropna(subset=[target_col])
+        return df, n_structures
+
+    def __warn_na(self, n_structures:int, n_survivors:int) -> None:
+        """Warnings of drop_na, from the number of rows with a structure and of rows left."""
         run_na_targets = self.file_settings['remove_na_targets']['run']
+        if not n_structures:
+            warnings.warn('ALL_NA_STRUCTURES: All structures in specified column were NA, all rows dropped',
+                          RuntimeWarning)
 
-        if self.target_col and run_na_targets and len(self.df):  # If run and TARGET COLUMN DECLARED
-            self.df.dropna(subset=[self.target_col], inplace=True)
-            if not len(self.df):
+        if self.target_col and run_na_targets and n_structures:  # If run and TARGET COLUMN DECLARED
+            if not n_survivors:
                 warnings.warn('ALL_NA_TARGETS: All targets in specified column were NA, all rows dropped',
                               RuntimeWarning)
-
         elif run_na_targets:  # If run but not declared target
             warnings.warn('NA_TARGETS: options.file_settings.remove_na_targets was set to run but no activity column \
                 was specified', RuntimeWarning)
 
-    def __build_smiles(self) -> None:
-        """Creates a SMILES column in the dataset using dataset MolFile column. DROPS NA."""
-        self.df = naclo.dataframes.df_mols_2_smiles(self.df, self.mol_col, self.smiles_col)
+    def __warn_convert_units(self) -> bool:
+        """Warns if convert_units is set to run without a target column. Returns whether units can be converted."""
+        if not self.mol_settings['convert_units']['units_col']:
+            return False
+        if not self.target_col:
+            warnings.warn('CONVERT_UNITS: options.molecule_settings.convert_units was set to run but no activity \
+                column was specified', RuntimeWarning)
+            return False
+        return True
 
-    def __build_mols(self) -> None:
-        """Creates MolFile column in the dataset using dataset SMILES column. DROPS NA."""
-        self.df = naclo.dataframes.df_smiles_2_mols(self.df, self.smiles_col, self.mol_col)
+    @staticmethod
+    def _build_structures(df:pd.DataFrame, structure_type:str, mol_col_name:str, smiles_col_name:str) -> pd.DataFrame:
+        """Builds Mols from SMILES if not present, then (re)builds canonical SMILES from Mols. DROPS NA."""
+        if structure_type == 'smiles':
+            df = naclo.dataframes.df_smiles_2_mols(df, smiles_col_name, mol_col_name)
+        return naclo.dataframes.df_mols_2_smiles(df, mol_col_name, smiles_col_name)
         
     @staticmethod
     def __filter_fragments_factory(filter:str) -> Callable:
@@ -158,11 +202,61 @@ class Bleach:
             
         return df
 
+    @staticmethod
+    def _clean_structure_task(mol:Union[Chem.rdchem.Mol, bytes], options:dict) -> Tuple[Optional[str],
+                                                                                       Optional[bytes],
+                                                                                       Optional[str]]:
+        """Steps 4-5 for one Mol in a supervised worker: cleaned SMILES, Mol and inchi key (all None if dropped). Mols
+        travel as RDKit binary with all properties, default Mol pickling drops them."""
+        if isinstance(mol, bytes):
+            mol = Chem.Mol(mol)
+        cleaned = naclo.clean.clean_structure(mol, options)
+        if not cleaned:
+            return None, None, None
+        return cleaned.smiles, cleaned.mol.ToBinary(Chem.PropertyPickleOptions.AllProps), cleaned.inchi_key
+
+    @staticmethod
+    def supervised_cleanup(df:pd.DataFrame, smiles_col_name:str, mol_col_name:str, inchi_key_col_name:str,
+                           failure_col_name:str, mol_settings:dict) -> pd.DataFrame:  # *
+        """mol_cleanup and inchi keys with a time limit per molecule (mol_settings.time_limit). Each Mol is cleaned by
+        naclo.clean.clean_structure in supervised worker processes, so a molecule that runs too long or crashes its
+        process only costs that molecule. Those are dropped, or with on_failure="flag" kept uncleaned (NA inchi key)
+        with the reason ("TIMEOUT", "CRASH" or "ERROR") in failure_col_name."""
+        time_limit = mol_settings['time_limit']
+        options = {'molecule_settings': mol_settings, 'file_settings': {'append_columns': {'mw': False}}}
+        mols = [m.ToBinary(Chem.PropertyPickleOptions.AllProps) if isinstance(m, Chem.rdchem.Mol) else m
+                for m in df[mol_col_name]]
+        results = naclo.supervised.supervised_map(functools.partial(Bleach._clean_structure_task, options=options),
+                                                  mols, timeout=time_limit['seconds'], n_jobs=time_limit['workers'])
+
+        ok = np.array([status == 'ok' for status, _ in results], dtype=bool)
+        cleaned = pd.DataFrame([r if status == 'ok' else (None, None, None) for status, r in results],
+                               index=df.index, columns=[smiles_col_name, mol_col_name, inchi_key_col_name])
+        cleaned[mol_col_name] = [Chem.Mol(m) if isinstance(m, bytes) else m for m in cleaned[mol_col_name]]
+
+        df = df.copy()
+        for col in [smiles_col_name, mol_col_name]:  # Failed rows keep their uncleaned structure
+            df[col] = cleaned[col].where(ok, df[col])
+        df[inchi_key_col_name] = cleaned[inchi_key_col_name].fillna(np.nan)
+
+        if time_limit['on_failure'] == 'flag':
+            df[failure_col_name] = [np.nan if status == 'ok' else status.upper() for status, _ in results]
+        else:
+            df, ok = df[ok], ok[ok]
+        return df[~ok | df[inchi_key_col_name].notna().to_numpy()]  # Cleaning dropped it (e.g. only salts)
+
     @staticmethod
     def __append_inchi_keys(df:pd.DataFrame, mol_col_name:str, inchi_key_col_name:str) -> pd.DataFrame:
         """Declares inchi key column name using default. Appends inchi keys to dataset."""
         return naclo.dataframes.df_mols_2_inchi_keys(df, mol_col_name, inchi_key_col_name)
 
+    @staticmethod
+    def __append_duplicate_keys(df:pd.DataFrame, mol_col_name:str, inchi_key_col_name:str, key:str) -> pd.DataFrame:
+        """Appends the grouping key: inchi keys, or the temporary key column for other key types. Drops NA keys."""
+        if key == 'inchi_key':
+            return Bleach.__append_inchi_keys(df, mol_col_name, inchi_key_col_name)
+        return naclo.dataframes.df_mols_2_duplicate_keys(df, mol_col_name, Bleach._duplicate_key_col, key)
+
     @staticmethod
     def __drop_columns(df:pd.DataFrame, column_mapper:Dict[str, bool], mol_col_name:str, smiles_col_name:str,
                        inchi_key_col_name:str) -> pd.DataFrame:
@@ -171,7 +265,7 @@ class Bleach:
         # Drop added columns from built if not requested
         if not column_mapper['mol']:
             df = df.drop(mol_col_name, axis=1)
-        if not column_mapper['inchi_key']:
+        if not column_mapper['inchi_key'] and inchi_key_col_name in df.columns:  # Not built if not grouped by
             df = df.drop(inchi_key_col_name, axis=1)
         if not column_mapper['smiles']:
             df = df.drop(smiles_col_name, axis=1)
@@ -183,21 +277,113 @@ class Bleach:
         """Add columns that the user wants in the final output."""
         # Add MW column
         if column_mapper['mw']:
-            df = df.assign(MW = naclo.mol_weights(df[mol_col_name]))
+            descriptors = naclo.mol_stats.mol_descriptors(df[mol_col_name], descriptors=['mw'])
+            df = df.assign(MW = descriptors['mw'].to_numpy())
         return df
 
 
+    def __value_cols(self) -> List[str]:
+        """Columns merged by statistics when averaging duplicates: the converted units column if units are converted
+        (the target and units columns then keep the first row's values, targets in mixed units cannot be combined),
+        else the target column."""
+        convert_units = self.mol_settings['convert_units']
+        if not self.target_col:
+            return []
+        if convert_units['units_col']:
+            return [f'{convert_units["output_units"]}_{convert_units["units_col"]}']
+        return [self.target_col]
+
+    def __working_cols(self) -> List[str]:
+        """Columns the pipeline reads or (re)writes: structure, target, units and any column that collides with a
+        column Bleach builds."""
+        units_col = self.mol_settings['convert_units']['units_col']
+        built = list(self.__default_cols.values())
+        if units_col:
+            built += [f'molar_{units_col}', f'neg_log_molar_{units_col}']
+        cols = [self.structure_col, self.target_col, units_col] + built
+        return [c for c in self.df.columns if c in cols]
+
+    @staticmethod
+    def __na_mask(values:pd.Series, na:tuple=('', 'nan', 'none')) -> np.ndarray:
+        """Values NA after stse.dataframes.convert_to_nan, without converting any. Strings are compared through an
+        object array (Series.isin warns on object data)."""
+        is_na = values.isna().to_numpy()
+        if values.dtype == object and not is_na.all():
+            is_na |= np.isin(values.astype(str).str.lower().to_numpy(), np.array(na, dtype=object))
+        return is_na
+
+    @staticmethod
+    def _clean_chunk(df:pd.DataFrame, structure_col:str, structure_type:str, target_col:str, mol_col:str,
+                     smiles_col:str, inchi_key_col:str, failure_col:str, mol_settings:dict,
+                     file_settings:dict) -> Tuple[pd.DataFrame, pd.Index, int, List[str]]:
+        """Row-wise part of main (steps 1-5 up to inchi keys) on one chunk, for amain. Static and single underscore so
+        process pools can pickle it.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.Index, int, List[str]]: Cleaned chunk, rows left after drop_na, rows with a
+                structure, columns entirely NA after drop_na.
+        """
+        # Step 1
+        df, n_structures = Bleach._drop_na_rows(df, structure_col, target_col,
+                                                file_settings['remove_na_targets']['run'])
+        na_survivors, na_cols = df.index, list(df.columns[df.isna().all()])
+
+        # Step 2
+        df = Bleach._build_structures(df, structure_type, mol_col, smiles_col)
+
+        # Step 3
+        convert_units = mol_settings['convert_units']
+        if convert_units['units_col'] and target_col:
+            df = Bleach.convert_units(df, mol_col, target_col, convert_units['units_col'],
+                                      convert_units['output_units'], convert_units['drop_na'])
+
+        # Steps 4 and 5 (keys only, duplicates span chunks). Time limited cleaning always computes inchi keys.
+        if mol_settings['time_limit']['seconds'] > 0:
+            df = Bleach.supervised_cleanup(df, smiles_col, mol_col, inchi_key_col, failure_col, mol_settings)
+        else:
+            df = Bleach.mol_cleanup(df, smiles_col, mol_col, run_salts=mol_settings['remove_fragments']['salts'],
+                                    filter_method=mol_settings['remove_fragments']['filter_method'],
+                                    run_neutralize=mol_settings['neutralize_charges']['run'])
+            df = Bleach.__append_duplicate_keys(df, mol_col, inchi_key_col,
+                                                file_settings['duplicate_compounds']['key'])
+        return df, na_survivors, n_structures, na_cols
+
+    def __rejoin_passthrough(self, source:pd.DataFrame, passthrough_cols:List[str], na_survivors:pd.Index,
+                             columns:List[str]) -> None:
+        """Joins passthrough columns of the input (source) back onto the surviving rows. Each column is scanned once,
+        over the rows left after drop_na: columns entirely NA there are removed, as drop_na would have done on the full
+        frame, and NA-like values of the output rows become NA (object dtypes are inferred from those rows)."""
+        positions = na_survivors.get_indexer(self.df.index)
+        passthrough = {}
+        for col in passthrough_cols:
+            values = source[col].iloc[na_survivors]
+            is_na = Bleach.__na_mask(values)
+            if not is_na.all():
+                values = values.iloc[positions].where(~is_na[positions]).set_axis(self.df.index)
+                passthrough[col] = values.infer_objects() if values.dtype == object else values
+        out = pd.concat([self.df, pd.DataFrame(passthrough, index=self.df.index)], axis=1)
+        
+        # Original columns keep their position (a target split into statistic columns keeps it too), built columns
+        # follow in the order they were added
+        order = []
+        for c in columns:
+            if c in out.columns:
+                order.append(c)
+            elif c in self.__value_cols():
+                order += [f'{c}_{s}' for s in self.statistics if f'{c}_{s}' in out.columns]
+        order += [c for c in self.df.columns if c not in order]
+        self.df = out[order]
+
+
 # ---------------------------------------------------- MAIN STEPS ---------------------------------------------------- #
     # Step 1
     def drop_na(self) -> None:  # *
         """Converts blanks to NA. Drops NA Mols or SMILES. Handles NA targets. Removes entire NA columns"""
 
-        # Convert all df blanks and 'none' to NA
-        self.df = stse.dataframes.convert_to_nan(self.df)
-
-        # Drop rows
-        self.__drop_na_structures()
-        self.__drop_na_targets()
+        # Convert all df blanks and 'none' to NA, drop rows
+        self.df, n_structures = Bleach._drop_na_rows(self.df, self.structure_col, self.target_col,
+                                                     self.file_settings['remove_na_targets']['run'])
+        self.__warn_na(n_structures, len(self.df))
 
         # Drop cols
         self.df = stse.dataframes.remove_nan_cols(self.df)  # After dropping rows because columns may BECOME empty
@@ -205,13 +391,7 @@ class Bleach:
     # Step 2 
     def init_structure_compute(self) -> None:  # *
         """Builds (or rebuilds from Mols) SMILES. Builds Mols if not present in dataset."""
-        if self.structure_type == 'mol':
-            self.__build_smiles()
-            # Rebuilding Mols not necessary
-
-        elif self.structure_type == 'smiles':
-            self.__build_mols()
-            self.__build_smiles()  # Canonicalize SMILES
+        self.df = Bleach._build_structures(self.df, self.structure_type, self.mol_col, self.smiles_col)
     
     # Step 3
     @staticmethod
@@ -234,11 +414,7 @@ class Bleach:
     
     def __instance_convert_units(self):
         convert_units = self.mol_settings['convert_units']
-        if convert_units['units_col']:
-            if not self.target_col:
-                warnings.warn('CONVERT_UNITS: options.molecule_settings.convert_units was set to run but no activity \
-                    column was specified', RuntimeWarning)
-                return
+        if self.__warn_convert_units():
             self.df = Bleach.convert_units(df=self.df, mol_col_name=self.mol_col, value_col_name=self.target_col,
                                            units_col_name=convert_units['units_col'],
                                            output_units=convert_units['output_units'],
@@ -270,20 +446,66 @@ class Bleach:
 
     # Step 5
     @staticmethod
-    def handle_duplicates(df:pd.DataFrame, mol_col_name:str, inchi_key_col_name:str, target_col:Union[str, None]=None,
-                          method='average') -> pd.DataFrame:  # *
-        """Computes inchi keys. Averages, removes, or keeps duplicates. ONLY BY INCHI KEY FOR NOW."""
-        df = Bleach.__append_inchi_keys(df, mol_col_name, inchi_key_col_name)
+    def handle_duplicates(df:pd.DataFrame, mol_col_name:str, inchi_key_col_name:str,
+                          target_col:Union[str, List[str], None]=None, method='average', key:str='inchi_key',
+                          inchi_keys:bool=True, statistics:Tuple[str, ...]=('mean',)) -> pd.DataFrame:  # *
+        """Computes duplicate keys. Averages, removes, or keeps duplicates.
+
+        Args:
+            target_col (Union[str, List[str], None], optional): Column(s) aggregated when averaging. Defaults to None.
+            key (str, optional): One of naclo.mol_conversion.duplicate_key_types. Defaults to 'inchi_key'.
+            inchi_keys (bool, optional): Add inchi keys when grouping by another key, computed after duplicates are
+                merged. Defaults to True.
+            statistics (Tuple[str, ...], optional): Statistics of target columns when averaging, any of
+                naclo.aggregate.statistics. With several, each target column is replaced by "<column>_<statistic>"
+                columns. Defaults to ('mean',).
+        """
+        df = Bleach.__append_duplicate_keys(df, mol_col_name, inchi_key_col_name, key)
+        return Bleach._finish_duplicates(df, mol_col_name, inchi_key_col_name, target_col, method, key, inchi_keys,
+                                         statistics)
+
+    @staticmethod
+    def _finish_duplicates(df:pd.DataFrame, mol_col_name:str, inchi_key_col_name:str,
+                           target_col:Union[str, List[str], None], method:str, key:str, inchi_keys:bool,
+                           statistics:Tuple[str, ...]=('mean',)) -> pd.DataFrame:
+        """handle_duplicates after keys are appended: merges duplicates, then replaces a temporary key column with
+        inchi keys (if inchi_keys)."""
+        if key == 'inchi_key':
+            return Bleach._aggregate_duplicates(df, inchi_key_col_name, target_col, method, statistics)
+
+        df = Bleach._aggregate_duplicates(df, Bleach._duplicate_key_col, target_col, method, statistics)
+        df = df.drop(columns=[Bleach._duplicate_key_col])
+        return Bleach.__append_inchi_keys(df, mol_col_name, inchi_key_col_name) if inchi_keys else df
+
+    @staticmethod
+    def _aggregate_duplicates(df:pd.DataFrame, inchi_key_col_name:str, target_col:Union[str, List[str], None]=None,
+                              method='average', statistics:Tuple[str, ...]=('mean',)) -> pd.DataFrame:
+        """Averages, removes, or keeps duplicates of an existing inchi key column. Rows without a key (flagged by
+        supervised_cleanup) are kept as is, in their original position."""
+        no_key = df[inchi_key_col_name].isna().to_numpy()
+        if no_key.any():
+            labels = df.index
+            df = df.reset_index(drop=True)  # Merged rows keep their first row's position, so sorting restores order
+            df = pd.concat([Bleach._aggregate_duplicates(df[~no_key], inchi_key_col_name, target_col, method,
+                                                         statistics),
+                            df[no_key]]).sort_index(kind='stable')
+            df.index = labels[df.index]
+            return df
 
         if method == 'average' and target_col:
-            df = stse.duplicates.average(df, subsets=[inchi_key_col_name], average_by=target_col)
+            target_cols = [target_col] if isinstance(target_col, str) else list(target_col)
+            neg_log_cols = [c for c in target_cols if c.startswith('neg_log_molar_')]  # Named by convert_units
+            df = naclo.aggregate.aggregate_duplicates(df, inchi_key_col_name, target_cols, statistics, neg_log_cols)
         elif method == 'remove' or (method == 'average' and not target_col):
             df = stse.duplicates.remove(df, subsets=[inchi_key_col_name])
         return df
     
     def __instance_handle_duplicates(self) -> None:
-        self.df = Bleach.handle_duplicates(self.df, self.mol_col, self.inchi_key_col, self.target_col,
-                                           method=self.file_settings['duplicate_compounds']['selected'])
+        self.df = Bleach.handle_duplicates(self.df, self.mol_col, self.inchi_key_col, self.__value_cols(),
+                                           method=self.file_settings['duplicate_compounds']['selected'],
+                                           key=self.file_settings['duplicate_compounds']['key'],
+                                           inchi_keys=self.file_settings['append_columns']['inchi_key'],
+                                           statistics=self.statistics)
 
     # Step 6
     @staticmethod
@@ -322,11 +544,89 @@ class Bleach:
         Returns:
             pandas DataFrame: Cleaned df
         """
+        # Column projection: steps only carry (a copy of) the columns they use, the rest is read from the input by
+        # position at the end
+        source, index, columns = self.df, self.df.index, list(self.df.columns)
+        working_cols = self.__working_cols()
+        passthrough_cols = [c for c in columns if c not in working_cols]
+        self.df = self.df[working_cols].reset_index(drop=True)  # Positions are unique even if labels are not
+
         self.drop_na()  # Before init_structure bc need NA
+        na_survivors = self.df.index
         self.init_structure_compute()
         self.convert_units()
-        self.mol_cleanup()
-        self.handle_duplicates()
+        if self.mol_settings['time_limit']['seconds'] > 0:
+            self.df = Bleach.supervised_cleanup(self.df, self.smiles_col, self.mol_col, self.inchi_key_col,
+                                                self.failure_col, self.mol_settings)
+            # Workers compute inchi keys within the time limit, so duplicates are grouped by them
+            self.df = Bleach._aggregate_duplicates(self.df, self.inchi_key_col, self.__value_cols(),
+                                                   method=self.file_settings['duplicate_compounds']['selected'],
+                                                   statistics=self.statistics)
+        else:
+            self.mol_cleanup()
+            self.handle_duplicates()
         self.append_columns()
+
+        if passthrough_cols:
+            self.__rejoin_passthrough(source, passthrough_cols, na_survivors, columns)
+        self.df.index = index[self.df.index]
+        
+        self.remove_header_chars()
+        return self.df
+
+    async def amain(self, executor:Optional[Executor]=None, chunksize:int=1000, n_jobs:int=1,
+                    progress:Optional[Callable]=None) -> pd.DataFrame:  # *
+        """Asynchronous main: same output, but molecule work runs in chunks in an executor so the event loop stays
+        responsive. Duplicates and added columns are handled in the executor after the last chunk. Cancelling the
+        awaiting task stops scheduling chunks.
+
+        Args:
+            executor (Optional[Executor], optional): Thread or process pool. Defaults to None (event loop default).
+            chunksize (int, optional): Rows per chunk. Defaults to 1000.
+            n_jobs (int, optional): Chunks in flight at once. Defaults to 1.
+            progress (Optional[Callable], optional): Called (or awaited) with (rows done, total rows) after each
+                chunk. Defaults to None.
+
+        Returns:
+            pandas DataFrame: Cleaned df
+        """
+        loop = asyncio.get_running_loop()
+
+        source, index, columns = self.df, self.df.index, list(self.df.columns)
+        working_cols = self.__working_cols()
+        passthrough_cols = [c for c in columns if c not in working_cols]
+        self.df = self.df[working_cols].reset_index(drop=True)
+
+        chunks = await map_chunks(Bleach._clean_chunk, self.df, self.structure_col,
+                                  self.structure_type, self.target_col, self.mol_col, self.smiles_col,
+                                  self.inchi_key_col, self.failure_col, self.mol_settings, self.file_settings,
+                                  executor=executor,
+                                  chunksize=chunksize, n_jobs=n_jobs, progress=progress)
+        frames, survivors, n_structures, na_cols = zip(*chunks)
+        na_survivors = survivors[0].append(list(survivors[1:]))
+        self.__warn_na(sum(n_structures), len(na_survivors))
+        self.__warn_convert_units()
+
+        # Columns entirely NA in every chunk, as drop_na would remove before building columns
+        convert_units = self.mol_settings['convert_units']
+        built = {self.mol_col, self.smiles_col, self.inchi_key_col, self.failure_col,
+                 f'{convert_units["output_units"]}_{convert_units["units_col"]}'}
+        na_cols = set.intersection(*map(set, na_cols)) - built
+        df = pd.concat(frames)
+        df = df.drop(columns=[c for c in df.columns if c in na_cols])
+
+        duplicates = self.file_settings['duplicate_compounds']
+        key = 'inchi_key' if self.mol_settings['time_limit']['seconds'] > 0 else duplicates['key']
+        df = await loop.run_in_executor(executor, Bleach._finish_duplicates, df, self.mol_col, self.inchi_key_col,
+                                        self.__value_cols(), duplicates['selected'], key,
+                                        self.file_settings['append_columns']['inchi_key'], self.statistics)
+        self.df = await loop.run_in_executor(executor, Bleach.append_columns, df,
+                                             self.file_settings['append_columns'], self.mol_col, self.smiles_col,
+                                             self.inchi_key_col)
+
+        if passthrough_cols:
+            self.__rejoin_passthrough(source, passthrough_cols, na_survivors, columns)
+        self.df.index = index[self.df.index]
+
         self.remove_header_chars()
         return self.df
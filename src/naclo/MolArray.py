@@ -0,0 +1,201 @@
+from typing import Any, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionArray, ExtensionDtype, register_extension_dtype
+from pandas.api.indexers import check_array_indexer
+from rdkit import Chem
+
+from naclo.rdpickle import deserialize_mol, mol_blobs, pickle_properties
+
+
+@register_extension_dtype
+class MolDtype(ExtensionDtype):
+    """Pandas dtype for MolArray. Usable as a string alias: series.astype('mol')."""
+    name = 'mol'
+    type = Chem.rdchem.Mol
+    kind = 'O'
+    na_value = np.nan
+
+    @classmethod
+    def construct_array_type(cls) -> type:
+        return MolArray
+
+
+class MolArray(ExtensionArray):
+    # Property flags kept with each binary Mol blob
+    pickle_properties = pickle_properties
+
+    def __init__(self, buffer:Union[bytes, np.ndarray], offsets:np.ndarray) -> None:
+        """Immutable Mol column backed by one contiguous buffer of RDKit binary Mols and an offsets array (Arrow
+        style). Mol i is buffer[offsets[i]:offsets[i + 1]], an empty blob is NA. Mols are only materialized when a
+        row is accessed, slices share the parent buffer.
+
+        Args:
+            buffer (Union[bytes, np.ndarray]): Concatenated RDKit binary Mols.
+            offsets (np.ndarray): Blob boundaries into buffer, length n + 1.
+        """
+        self._buffer = buffer if isinstance(buffer, np.ndarray) else np.frombuffer(buffer, dtype=np.uint8)
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+
+# --------------------------------------------------- CONSTRUCTION --------------------------------------------------- #
+    @classmethod
+    def from_blobs(cls, blobs:Iterable[Optional[bytes]]) -> 'MolArray':
+        """Builds from serialized Mols. None, NaN and empty blobs are NA."""
+        blobs = [b if isinstance(b, (bytes, bytearray, memoryview)) else b'' for b in blobs]
+        lengths = np.fromiter((len(b) for b in blobs), dtype=np.int64, count=len(blobs))
+        offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(b''.join(blobs), offsets)
+
+    @classmethod
+    def from_mols(cls, mols:Iterable[Optional[Chem.rdchem.Mol]]) -> 'MolArray':
+        """Builds from RDKit Mols. Anything that is not a Mol is NA."""
+        return cls.from_blobs(mol_blobs(mols, cls.pickle_properties))
+
+    @classmethod
+    def _from_sequence(cls, scalars:Iterable, dtype:Any=None, copy:bool=False) -> 'MolArray':
+        if isinstance(scalars, MolArray):
+            return scalars.copy() if copy else scalars
+        return cls.from_mols(scalars)
+
+    @classmethod
+    def _from_factorized(cls, values:np.ndarray, original:'MolArray') -> 'MolArray':
+        return cls.from_blobs(values)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat:Sequence['MolArray']) -> 'MolArray':
+        # Each array's used bytes are viewed, not copied, so concatenate is the only copy
+        buffers = [a._buffer[a._offsets[0]:a._offsets[-1]] for a in to_concat]
+        starts = np.cumsum([0] + [len(b) for b in buffers[:-1]])
+        offsets = np.concatenate([np.zeros(1, dtype=np.int64)] +
+                                 [a._offsets[1:] - a._offsets[0] + s for a, s in zip(to_concat, starts)])
+        return cls(np.concatenate(buffers) if buffers else b'', offsets)
+
+    @classmethod
+    def from_arrow(cls, array:Any) -> 'MolArray':
+        """Builds from a pyarrow (large_)binary Array or ChunkedArray without copying the data buffer."""
+        import pyarrow as pa  # Optional dependency
+
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks() if array.num_chunks != 1 else array.chunk(0)
+        if array.null_count:  # Null slots are not guaranteed to be empty, go through Python bytes
+            return cls.from_blobs(array.to_pylist())
+
+        _, offsets, data = array.buffers()
+        offset_type = np.int64 if pa.types.is_large_binary(array.type) else np.int32
+        offsets = np.frombuffer(offsets, dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+        buffer = np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, dtype=np.uint8)
+        return cls(buffer, offsets.astype(np.int64))
+
+    def __arrow_array__(self, type:Any=None) -> Any:
+        """Converts to a pyarrow large_binary Array (used by pyarrow.Table.from_pandas). NA entries are null."""
+        import pyarrow as pa  # Optional dependency
+
+        compact = self.copy()
+        valid = np.packbits(~compact.isna(), bitorder='little')
+        return pa.Array.from_buffers(pa.large_binary(), len(compact),
+                                     [pa.py_buffer(valid), pa.py_buffer(compact._offsets),
+                                      pa.py_buffer(compact._buffer)])
+
+    def __reduce__(self) -> tuple:
+        compact = self.copy()
+        return (MolArray, (compact._buffer.tobytes(), compact._offsets))
+
+# ----------------------------------------------------- ACCESS ------------------------------------------------------- #
+    @property
+    def dtype(self) -> MolDtype:
+        return MolDtype()
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._offsets[-1] - self._offsets[0]) + self._offsets.nbytes
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def blob(self, i:int) -> bytes:
+        """Serialized Mol at position i, b'' if NA."""
+        return self._buffer[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def blobs(self) -> List[bytes]:
+        """All serialized Mols, b'' for NA. Does not materialize any Mol."""
+        return [self.blob(i) for i in range(len(self))]
+
+    @staticmethod
+    def _blob_2_mol(blob:bytes) -> Union[Chem.rdchem.Mol, float]:
+        return deserialize_mol(blob) if blob else np.nan
+
+    def __getitem__(self, item:Any) -> Any:
+        if isinstance(item, (int, np.integer)):
+            i = item + len(self) if item < 0 else item
+            if not 0 <= i < len(self):
+                raise IndexError(f'index {item} is out of bounds for MolArray of length {len(self)}')
+            return self._blob_2_mol(self.blob(i))
+
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step == 1:  # Zero-copy: view into the same buffer
+                stop = max(start, stop)
+                return MolArray(self._buffer, self._offsets[start:stop + 1])
+            return self.take(np.arange(start, stop, step))
+
+        item = check_array_indexer(self, item)
+        if item.dtype == bool:
+            item = np.flatnonzero(item)
+        return self.take(item)
+
+    def isna(self) -> np.ndarray:
+        return np.diff(self._offsets) == 0
+
+    def take(self, indices:Sequence[int], allow_fill:bool=False, fill_value:Any=None) -> 'MolArray':
+        indices = np.asarray(indices, dtype=np.intp)
+        n = len(self)
+
+        if allow_fill:
+            if (indices < -1).any():
+                raise ValueError('Invalid value in indices, must be all >= -1 for allow_fill=True')
+            if fill_value is not None and not pd.isna(fill_value):
+                raise ValueError('MolArray can only be filled with NA')
+            missing = indices == -1
+        else:
+            indices = np.where(indices < 0, indices + n, indices)
+            missing = np.zeros(len(indices), dtype=bool)
+        valid = indices[~missing]
+        if len(valid) and (valid.min() < 0 or valid.max() >= n):
+            raise IndexError('Index out of bounds for MolArray')
+
+        safe = np.where(missing, 0, indices)
+        lengths = np.where(missing, 0, np.diff(self._offsets)[safe]) if n else np.zeros(len(indices), dtype=np.int64)
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Copy runs of consecutive source rows as one slice each (NA rows add no bytes), e.g. a boolean mask keeping
+        # blocks of rows is a few slices
+        if not len(valid):
+            return MolArray(np.empty(0, dtype=np.uint8), offsets)
+        breaks = np.flatnonzero(np.diff(valid) != 1) + 1
+        firsts = valid[np.concatenate([[0], breaks])]
+        lasts = valid[np.concatenate([breaks - 1, [len(valid) - 1]])]
+        buffer = np.concatenate([self._buffer[start:stop] for start, stop in
+                                 zip(self._offsets[firsts], self._offsets[lasts + 1])])
+        return MolArray(buffer, offsets)
+
+    def copy(self) -> 'MolArray':
+        """Compact copy with its own buffer."""
+        start, stop = self._offsets[0], self._offsets[-1]
+        return MolArray(self._buffer[start:stop].copy(), self._offsets - start)
+
+    def _values_for_factorize(self) -> tuple:
+        values = np.array([b if b else None for b in self.blobs()], dtype=object)
+        return values, None
+
+    def __eq__(self, other:Any) -> np.ndarray:
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        if isinstance(other, MolArray):
+            return np.array([a == b and bool(a) for a, b in zip(self.blobs(), other.blobs())], dtype=bool)
+        if isinstance(other, Chem.rdchem.Mol):
+            other = other.ToBinary(self.pickle_properties)
+            return np.array([b == other for b in self.blobs()], dtype=bool)
+        return np.zeros(len(self), dtype=bool)
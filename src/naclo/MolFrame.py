@@ -0,0 +1,132 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem import AllChem
+from rdkit.Chem.Descriptors import ExactMolWt
+import numpy as np
+
+
+class MolFrame:
+    recognized_structures = ['smiles', 'mol']
+
+    def __init__(self, df:pd.DataFrame, structure_col:str, structure_type:str='smiles') -> None:
+        """Wraps a DataFrame with Mol derived columns that are computed lazily on first access and memoized. The
+        wrapped frame is never copied, derived columns are only materialized into a frame in to_df(). Derived columns
+        follow a copy of the structure column taken at construction and retaken when the column is set through
+        mf[structure_col] = ... or on invalidate(). Call invalidate() after editing structures through mf.df.
+
+        Args:
+            df (pd.DataFrame): Data holding a structure column.
+            structure_col (str): Name of SMILES or Mol column in df.
+            structure_type (str, optional): One of 'smiles' or 'mol'. Defaults to 'smiles'.
+
+        Raises:
+            ValueError: INVALID_STRUCTURE_TYPE
+            ValueError: STRUCTURE_COLUMN_NOT_FOUND
+        """
+        if structure_type not in self.recognized_structures:
+            raise ValueError('INVALID_STRUCTURE_TYPE', f'Structure type: "{structure_type}" is not one of: \
+                {self.recognized_structures}')
+        if structure_col not in df.columns:
+            raise ValueError('STRUCTURE_COLUMN_NOT_FOUND', f'The structure column: "{structure_col}" is not present \
+                in the data: "{list(df.columns)}"')
+
+        self.df = df
+        self.structure_col = structure_col
+        self.structure_type = structure_type
+        self.__cache:Dict[Hashable, pd.Series] = {}
+        self.__structures = self.df[self.structure_col].copy()  # Snapshot all derived columns are built from
+
+    def __getitem__(self, col:str) -> pd.Series:
+        return self.df[col]
+
+    def __setitem__(self, col:str, values:Any) -> None:
+        """Sets a column of the wrapped frame. Invalidates derived columns if the structure column is replaced."""
+        self.df[col] = values
+        if col == self.structure_col:
+            self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def invalidate(self) -> None:
+        """Clears all memoized derived columns and retakes the structure snapshot."""
+        self.__cache.clear()
+        self.__structures = self.df[self.structure_col].copy()
+
+    @staticmethod
+    def __exception_2_nan(x:Any, func:Callable) -> Any:
+        try:
+            out = func(x)
+        except Exception:
+            return np.nan
+        return np.nan if out is None else out
+
+    def __derive(self, key:Hashable, source:Callable[[], pd.Series], func:Callable) -> pd.Series:
+        """Memoized map of func over source."""
+        if key not in self.__cache:
+            self.__cache[key] = source().map(lambda x: self.__exception_2_nan(x, func), na_action='ignore')
+        return self.__cache[key]
+
+    @property
+    def mols(self) -> pd.Series:
+        """RDKit Mols, NaN where the structure could not be parsed."""
+        if self.structure_type == 'mol':
+            return self.__structures
+        return self.__derive('mol', lambda: self.__structures, Chem.MolFromSmiles)
+
+    @property
+    def smiles(self) -> pd.Series:
+        """Canonical SMILES built from the Mols."""
+        return self.__derive('smiles', lambda: self.mols, Chem.MolToSmiles)
+
+    @property
+    def inchi_keys(self) -> pd.Series:
+        """InChI keys built from the Mols."""
+        return self.__derive('inchi_key', lambda: self.mols, Chem.MolToInchiKey)
+
+    @property
+    def mol_weights(self) -> pd.Series:
+        """Exact molecular weights built from the Mols."""
+        return self.__derive('mw', lambda: self.mols, ExactMolWt)
+
+    def fingerprints(self, radius:int=2, n_bits:int=1024) -> pd.Series:
+        """Morgan bit vector fingerprints, memoized per (radius, n_bits).
+
+        Args:
+            radius (int, optional): Morgan radius. Defaults to 2.
+            n_bits (int, optional): Fingerprint length. Defaults to 1024.
+
+        Returns:
+            pd.Series: Contains ExplicitBitVect objects.
+        """
+        return self.__derive(('ecfp', radius, n_bits), lambda: self.mols,
+                             lambda m: AllChem.GetMorganFingerprintAsBitVect(m, radius, nBits=n_bits))
+
+    def to_df(self, columns:Optional[Dict[str, str]]=None, dropna:bool=True) -> pd.DataFrame:
+        """Builds an output frame with derived columns appended. This is the only place the frame is copied.
+
+        Args:
+            columns (Optional[Dict[str, str]], optional): Maps derived column ('mol', 'smiles', 'inchi_key', 'mw')
+                to output column name. Defaults to None (no derived columns).
+            dropna (bool, optional): Drop rows where any requested derived column is NA. Defaults to True.
+
+        Raises:
+            ValueError: Unrecognized derived column.
+
+        Returns:
+            pd.DataFrame: Wrapped data plus derived columns.
+        """
+        derived = {
+            'mol': lambda: self.mols,
+            'smiles': lambda: self.smiles,
+            'inchi_key': lambda: self.inchi_keys,
+            'mw': lambda: self.mol_weights
+        }
+        columns = columns or {}
+        for key in columns:
+            if key not in derived:
+                raise ValueError(f'Derived column: "{key}" is not one of: {list(derived)}')
+
+        df = self.df.assign(**{name: derived[key]() for key, name in columns.items()})
+        return df.dropna(subset=list(columns.values())) if dropna and columns else df
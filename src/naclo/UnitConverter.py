@@ -1,9 +1,10 @@
 from logging import warning
-from math import log10
+import functools
+import re
 import pandas as pd
 import numpy as np
 from copy import copy
-from typing import Union, Iterable
+from typing import Union, Iterable, Tuple
 
 from naclo.__asset_loader import recognized_units
 
@@ -12,6 +13,18 @@ class UnitConverter:
     __recognized_units = copy(recognized_units)
     __standard_unit_col = 'standard_unit'
     __multiplier_col = 'multiplier'
+
+    # Unit expression grammar: [scale] [prefix](m | mol/volume | g/volume), volume as "/l", " l-1", ".l-1", "•l-1"
+    __si_prefixes = {'f': -15, 'p': -12, 'n': -9, 'u': -6, 'm': -3, '': 0}  # Powers of 10
+    __volume_prefixes = {'u': -6, 'm': -3, 'd': -1, '': 0}
+    __scale_pattern = re.compile(r'^(?:x\s*)?(?:10\s*(?:\^|\*\*)\s*\(?([+-]?\d+)\)?|10([+-]\d+)|1e([+-]?\d+))'
+                                 r'\s*[*x.•·]?\s*')
+    __unit_pattern = re.compile(r'^([fpnum]?)(mol|g|m)(?:\s*/\s*([umd]?)l|\s*[ .•·*]\s*([umd]?)l\s*\^?\s*-1)?$')
+    __spellings = [(re.compile(r'[µμ]'), 'u'), (re.compile(r'mcg'), 'ug'), (re.compile(r'[⁻−]'), '-'),
+                   (re.compile(r'([dc])m\s*\^?\s*-3'), r'\1m3-1'), (re.compile(r'dm\s*\^?\s*3'), 'l'),
+                   (re.compile(r'(?:cm\s*\^?\s*3|cc)'), 'ml'), (re.compile(r'\s+'), ' ')]
+    __superscripts = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹', '0123456789')
+    __mass_units = {standard_unit for standard_unit, _ in recognized_units.values() if 'g/' in standard_unit}
     
     def __init__(self, values:Iterable, units:Iterable, mol_weights:Iterable) -> None:
         # Column names
@@ -38,84 +51,105 @@ class UnitConverter:
             'ng/l',
             'ug/l',
             'mg/l',
-            'm/l',
+            'g/l',
             'pg/ml',
             'ng/ml',
             'ug/ml',
             'mg/ml',
-            'm/ml'
+            'g/ml'
         ]
         
         self.df = UnitConverter.standardize_units(self.df, self.__unit_col)
     
     @staticmethod
-    def __neg_log(val:Union[int, float, np.number]) -> float:
-        """Simple negative log10 computation.
+    @functools.lru_cache(maxsize=1024)
+    def parse_unit(unit:str) -> Tuple[Union[str, float], float]:  # *
+        """Normalizes a concentration unit string, e.g. "nM ", "µmol/L", "10^-6 M" or "ug.mL-1". Spellings in
+        naclo/assets/recognized_units.json are looked up first. Memoized (1024 most recent strings).
 
         Args:
-            val (Union[int, float, np.number]): Value to use for computation.
+            unit (str): Unit string, case insensitive.
 
         Returns:
-            float: Computed value.
+            Tuple[Union[str, float], float]: Standard unit (a molar or g/L unit of recognized_units.json) and
+                multiplier to molar or g/L. (np.nan, np.nan) if not recognized.
         """
-        if val < 0:
-            warning(f'Negative value {val} passed to UnitConverter.__neg_log().')
-            return np.nan
-        elif val == 0:
-            return 0
+        unit = unit.lower().strip()
+        if unit in UnitConverter.__recognized_units:
+            standard_unit, multiplier = UnitConverter.__recognized_units[unit]
+            return standard_unit, multiplier
+
+        unit = unit.translate(UnitConverter.__superscripts)
+        for pattern, replacement in UnitConverter.__spellings:
+            unit = pattern.sub(replacement, unit)
+
+        scale = 0
+        match = UnitConverter.__scale_pattern.match(unit)
+        if match:
+            scale = int(next(group for group in match.groups() if group is not None))
+            unit = unit[match.end():]
+
+        match = UnitConverter.__unit_pattern.match(unit)
+        if not match:
+            return np.nan, np.nan
+        prefix, base, *volume = match.groups()
+        volume = next((v for v in volume if v is not None), None)
+        if (base == 'm') == (volume is not None):  # Molar has no volume, amounts and masses need one
+            return np.nan, np.nan
+
+        power = UnitConverter.__si_prefixes[prefix] + scale - UnitConverter.__volume_prefixes[volume or '']
+        if base == 'g':  # Spelled as in recognized_units.json if it is one of its mass units (e.g. "ng/ml"), else g/L
+            spelled = f'{prefix}g/{volume}l'
+            standard_unit = spelled if not scale and spelled in UnitConverter.__mass_units else 'g/l'
         else:
-            return -1*log10(val)
-    
+            standard_units = {-12: 'p', -9: 'n', -6: 'u', -3: 'm', 0: ''}
+            standard_unit = standard_units.get(power, '') + 'm'
+        return standard_unit, 10.0**power
+
     @staticmethod
     def standardize_units(df, unit_col_name) -> pd.DataFrame:
-        """Appends standard units and multipliers found in naclo/assets/recognized_units.json to self.df. Appends
-        np.nan if unit is not recognized."""
-        standard_units = []
-        multipliers = []
-        
-        for unit in df[unit_col_name]:
-            try:
-                standard_unit, multiplier = UnitConverter.__recognized_units[f'{unit}'.lower()]
-                standard_units.append(standard_unit)
-                multipliers.append(multiplier)
-            except KeyError:
-                standard_units.append(np.nan)
-                multipliers.append(np.nan)
-                continue
-            
-        df[UnitConverter.__standard_unit_col] = standard_units
-        df[UnitConverter.__multiplier_col] = multipliers
+        """Appends standard units and multipliers to df (see parse_unit). Appends np.nan if unit is not recognized.
+        Units are parsed once per distinct unit."""
+        codes, uniques = pd.factorize(df[unit_col_name])
+        parsed = [UnitConverter.parse_unit(f'{unit}') for unit in uniques] + [(np.nan, np.nan)]  # NA: code -1
+        standard_units, multipliers = zip(*parsed)
+
+        df[UnitConverter.__standard_unit_col] = np.array(standard_units, dtype=object)[codes]
+        df[UnitConverter.__multiplier_col] = np.array(multipliers, dtype=float)[codes]
         return df
             
-    def __to_molar_broadcaster(self, row:pd.Series) -> float:
-        """Broadcasting function to use with pd.DataFrame.apply(). Computes molar values from self.df.
-
-        Args:
-            row (pd.Series): pd.DataFrame row passed in apply().
+    def __in_group(self, group:Iterable) -> np.ndarray:
+        """Mask of rows whose standard unit is in group, checked once per distinct unit."""
+        codes, uniques = pd.factorize(self.df[self.__standard_unit_col])
+        return np.array([unit in group for unit in uniques] + [False], dtype=bool)[codes]
 
-        Returns:
-            Union[float]: Molar value. np.nan if the standard unit is not found in self.molar or self.g_ovr_l.
-        """
-        if row[self.__standard_unit_col] in self.molar:
-            molar_val = float(row[self.__value_col])*row[self.__multiplier_col]
-        elif row[self.__standard_unit_col] in self.g_ovr_l:  # Divide by mw (g/mol) -> g/L * mol/g = M
-            molar_val = float(row[self.__value_col])*row[self.__multiplier_col]/row[self.__mw_col]  # Divide by mw
-        else:
-            molar_val = np.nan
-        return molar_val
-    
     def to_molar(self) -> pd.Series:
-        """Applies self.__to_molar_broadcaster to self.df.
+        """Computes molar values from self.df. Mass concentrations are divided by mol weight (g/L * mol/g = M).
 
         Returns:
-            pd.Series: Molar values.
+            pd.Series: Molar values. np.nan if the standard unit is not found in self.molar or self.g_ovr_l.
         """
-        return self.df.apply(self.__to_molar_broadcaster, axis=1)
+        values = self.df[self.__value_col].to_numpy()
+        multipliers = self.df[self.__multiplier_col].to_numpy(dtype=float)
+        mol_weights = self.df[self.__mw_col].to_numpy(dtype=float)
+        molar, g_ovr_l = self.__in_group(self.molar), self.__in_group(self.g_ovr_l)
+
+        molars = np.full(len(self.df), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            molars[molar] = values[molar].astype(float)*multipliers[molar]
+            molars[g_ovr_l] = values[g_ovr_l].astype(float)*multipliers[g_ovr_l]/mol_weights[g_ovr_l]
+        return pd.Series(molars, index=self.df.index)
             
     def to_neg_log_molar(self) -> pd.Series:
-        """Applies self.__to_molar_broadcaster and self.__neg_log to self.df.
+        """Computes negative log10 molar values. Negative values are np.nan (with a warning), 0 stays 0.
 
         Returns:
             pd.Series: Negative log molar values.
         """
-        return self.to_molar().apply(self.__neg_log)
+        molars = self.to_molar()
+        values = molars.to_numpy()
+        for val in values[values < 0]:
+            warning(f'Negative value {val} passed to UnitConverter.to_neg_log_molar().')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            neg_logs = np.where(values > 0, -np.log10(values), np.where(values == 0, 0, np.nan))
+        return pd.Series(neg_logs, index=molars.index)
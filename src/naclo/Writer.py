@@ -1,13 +1,27 @@
 from argparse import ArgumentError
 import pandas as pd
+import numpy as np
 from stse import error_checking
-from io import BytesIO, StringIO
-from typing import Any, Union, Tuple
-from rdkit.Chem import PandasTools
+from io import BytesIO
+from typing import Any, Callable, Dict, IO, Iterator, List, MutableMapping, Optional, Union, Tuple
+from rdkit import Chem
 from collections.abc import Iterable
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+
+from naclo import compression as naclo_compression
+from naclo import depictions
+from naclo import rdpickle
+from naclo.MolArray import MolDtype
 
 
 class Writer:
+    stream_exts = ['csv', 'tsv', 'sdf']
+    excel_max_rows = 1048575  # Excel's row limit less the header
+    columnar_exts = ['parquet', 'feather']
+    
     def __init__(self, df:pd.DataFrame, mol_col_name:str='ROMol') -> None:
         """Initializes object for writing dataframes to various out formats.
 
@@ -20,37 +34,354 @@ class Writer:
         error_checking.type_check('df', df, [pd.DataFrame])
         error_checking.type_check('mol_col_name', mol_col_name, [str])
         
-        # Set properties
-        self.df = df.copy()
+        # Set properties (never modified, so not copied)
+        self.df = df
         self.mol_col_name = mol_col_name
         
-    def write(self, out:Union[str, BytesIO], ext:str) -> None:
+    def write(self, out:Union[str, BytesIO], ext:str, n_jobs:int=1,
+              dictionary_cols:Optional[List[str]]=None, compression:Optional[str]='infer') -> None:
         """Writes file to buffer object or path.
 
         Args:
             out (Union[str, BytesIO]): Buffer or path.
             ext (str): Save file extension.
+            n_jobs (int, optional): Worker processes rendering CSV/TSV/SDF chunks. Output is identical to serial.
+                Defaults to 1.
+            dictionary_cols (Optional[List[str]], optional): Parquet/Feather only. Columns to dictionary encode.
+                Defaults to None (string columns where at least half the values are repeats, e.g. units or InChI
+                keys of un-averaged data).
+            compression (Optional[str], optional): CSV/TSV/SDF only. "gzip", "bz2" or "zstd", compressed in
+                parallel blocks with n_jobs threads. Defaults to "infer" (from a path's suffix, e.g. ".sdf.gz").
+        
+        Raises:
+            ValueError: Compression requested for an ext that is not streamed.
         """
         self.__check_out(out, [str, BytesIO])
         self.__check_ext(ext)
         
-        out = self.__get_writer(out, ext)
+        compression = self.__check_compression(out, ext, compression)
+        out = self.__get_writer(out, ext, n_jobs, dictionary_cols, compression)
         
         if out:
             out.seek(0)
             return out
         
-    def rdkit_2_excel(self, out:str, size:Tuple[int, int]=(200, 200)) -> None:
-        """Writes file to Excel with MolFile images.
+    def rdkit_2_excel(self, out:Union[str, BytesIO], size:Tuple[int, int]=(200, 200), n_jobs:int=1,
+                      chunksize:int=1000, max_rows:Optional[int]=None,
+                      cache:Optional[MutableMapping[str, bytes]]=None, key_type:str='smiles') -> None:
+        """Writes file to Excel with structure images. The workbook is streamed row by row (xlsxwriter constant memory
+        mode) and each distinct structure is drawn once. One worker pool draws all chunks.
 
         Args:
-            out (str): Save path.
+            out (Union[str, BytesIO]): Save path or buffer.
             size (Tuple[int, int], optional): Size of image in pixels. Defaults to (200, 200).
+            n_jobs (int, optional): Worker processes drawing structures. Defaults to 1.
+            chunksize (int, optional): Rows drawn per batch. Defaults to 1000.
+            max_rows (Optional[int], optional): Data rows per worksheet, further rows continue on new worksheets.
+                Defaults to None (Excel's limit of 1048575).
+            cache (Optional[MutableMapping[str, bytes]], optional): Depiction cache, see
+                naclo.depictions.render_pngs. Pass naclo.depictions.image_cache to reuse depictions across exports.
+                Defaults to None (a naclo.depictions.PngCache for this export only).
+            key_type (str, optional): Cache structures by "smiles" or "inchi_key". Defaults to 'smiles'.
+        """
+        error_checking.type_check('out', out, [str, BytesIO])
+        if isinstance(out, str):
+            error_checking.val_check('out', out.split('.')[-1], ['xlsx', 'xls'])  # Check extension is Excel
+        cache = depictions.PngCache() if cache is None else cache
+        
+        with ExitStack() as stack:
+            write_rows = Writer.__open_excel_sink(stack, out, list(self.df.columns),
+                                                  list(self.df.columns).index(self.mol_col_name), size, max_rows)
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=n_jobs)) if n_jobs > 1 else None
+            for chunk in Writer._slices(self.df, chunksize):
+                write_rows(chunk, depictions.render_pngs(chunk[self.mol_col_name], size=size, n_jobs=n_jobs,
+                                                         cache=cache, key_type=key_type, executor=executor))
+    
+    @staticmethod
+    def __open_excel_sink(stack:ExitStack, out:Union[str, IO[bytes]], columns:List[str], mol_index:Optional[int],
+                          size:Tuple[int, int], max_rows:Optional[int]) -> Callable[[pd.DataFrame, List[bytes]], None]:
+        """Opens a workbook streamed row by row (xlsxwriter constant memory mode, closed with stack) and returns a
+        function appending a chunk of rows and their PNGs. The Mol column (mol_index, None if there is none) gets the
+        images, duplicate structures share one. Rows continue on a new worksheet past max_rows."""
+        import xlsxwriter  # Optional dependency, as in PandasTools
+        
+        max_rows = Writer.excel_max_rows if max_rows is None else max_rows
+        if not 1 <= max_rows <= Writer.excel_max_rows:
+            raise ValueError(f'max_rows must be between 1 and {Writer.excel_max_rows}')
+        
+        workbook = xlsxwriter.Workbook(out, {'constant_memory': True})
+        stack.callback(workbook.close)
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+        images = {}  # PNG -> buffer
+        state = {'sheet': None, 'row': 0}
+        
+        def add_sheet() -> None:
+            sheet = workbook.add_worksheet()
+            if mol_index is not None:
+                sheet.set_column_pixels(mol_index, mol_index, size[0])
+            for j, col in enumerate(columns):
+                sheet.write_string(0, j, str(col))
+            state['sheet'], state['row'] = sheet, 1
+        
+        def write_rows(chunk:pd.DataFrame, pngs:List[bytes]) -> None:
+            for values, png in zip(chunk.itertuples(index=False, name=None), pngs):
+                if state['sheet'] is None or state['row'] > max_rows:
+                    add_sheet()
+                sheet, row = state['sheet'], state['row']
+                sheet.set_row_pixels(row, size[1])
+                for j, value in enumerate(values):
+                    if j == mol_index:
+                        sheet.insert_image(row, j, 'structure.png',
+                                           {'image_data': images.setdefault(png, BytesIO(png))})
+                    else:
+                        Writer.__write_excel_cell(sheet, row, j, value, date_format)
+                state['row'] += 1
+        
+        stack.callback(lambda: state['sheet'] is None and add_sheet())  # Empty frame still gets a header
+        return write_rows
+        
+    @staticmethod
+    def __write_excel_cell(sheet:Any, row:int, col:int, value:Any, date_format:Any) -> None:
+        """Writes one value with the matching xlsxwriter cell type. NA and non-finite numbers are left blank, strings
+        are cut to Excel's cell limit."""
+        if isinstance(value, (bool, np.bool_)):
+            sheet.write_boolean(row, col, bool(value))
+        elif isinstance(value, (int, float, np.number)):
+            if np.isfinite(value):
+                sheet.write_number(row, col, value)
+        elif isinstance(value, datetime):
+            if not pd.isna(value):
+                sheet.write_datetime(row, col, value.to_pydatetime() if isinstance(value, pd.Timestamp) else value,
+                                     date_format)
+        elif value is not None and value is not pd.NA:
+            sheet.write_string(row, col, str(value)[:32000])
+        
+    @staticmethod
+    def stream(chunks:Union[pd.DataFrame, Iterable], out:Union[str, IO[bytes]], ext:str,
+               mol_col_name:str='ROMol', chunksize:int=10000, n_jobs:int=1,
+               compression:Optional[str]='infer') -> None:
+        """Writes DataFrame chunks to CSV, TSV or SDF incrementally. Only one chunk is rendered in memory at a time.
+
+        Args:
+            chunks (Union[pd.DataFrame, Iterable]): Iterable of DataFrames with the same columns, or a single
+                DataFrame (written in slices of chunksize rows).
+            out (Union[str, IO[bytes]]): Path or any binary file-like object. File-like objects are left open.
+            ext (str): One of Writer.stream_exts.
+            mol_col_name (str, optional): Name of molecule column, SDF only. Defaults to 'ROMol'.
+            chunksize (int, optional): Rows per slice when chunks is a DataFrame. Defaults to 10000.
+            n_jobs (int, optional): Worker processes rendering chunks (mol blocks and property sections). Rendered
+                chunks are written in input order so output is byte-identical to serial. Defaults to 1.
+            compression (Optional[str], optional): "gzip", "bz2" or "zstd". Output is a series of independently
+                compressed blocks (compressed by n_jobs threads) readable by gzip/zcat, bzip2 and zstd. Defaults to
+                "infer" (from a path's suffix, None for buffers).
         """
-        error_checking.type_check('out', out, [str])
-        error_checking.val_check('out', out.split('.')[-1], ['xlsx', 'xls'])  # Check extension is Excel
+        error_checking.val_check('ext', ext, Writer.stream_exts)
+        if isinstance(chunks, pd.DataFrame):
+            chunks = Writer._slices(chunks, chunksize)
+        if compression == 'infer':
+            compression = naclo_compression.infer_compression(out)
         
-        PandasTools.SaveXlsxFromFrame(self.df, out, molCol=self.mol_col_name, size=size)
+        with ExitStack() as stack:
+            handle = Writer.__open_sink(stack, out, compression, n_jobs)
+            for _, texts, _ in Writer.__render_chunks(chunks, [ext], mol_col_name, n_jobs):
+                handle.write(texts[ext].encode('utf8'))
+    
+    @staticmethod
+    def __open_sink(stack:ExitStack, out:Union[str, IO[bytes]], compression:Optional[str],
+                    n_jobs:int) -> IO[bytes]:
+        """Opens a path (closed with stack) and wraps it in a block compressor if compression is set."""
+        handle = stack.enter_context(open(out, 'wb')) if isinstance(out, str) else out
+        if compression:
+            handle = stack.enter_context(naclo_compression.open_compressed(handle, compression, n_jobs=n_jobs))
+        return handle
+    
+    def write_many(self, outs:Dict[str, Union[str, IO[bytes]]], chunksize:int=10000, n_jobs:int=1,
+                   dictionary_cols:Optional[List[str]]=None, size:Tuple[int, int]=(200, 200),
+                   cache:Optional[MutableMapping[str, bytes]]=None) -> Dict[str, Union[None, BytesIO]]:
+        """Writes several formats in a single pass over the data. Each chunk of rows is rendered for every requested
+        format while it is in memory, including its Parquet/Feather record batch. Per Mol work is shared between
+        formats: Mols are serialized once per chunk (all properties) for both SDF records and depictions, each
+        distinct structure is drawn once for every Excel sink and one record batch is written to every
+        Parquet/Feather sink. The binary Mol column of Parquet/Feather is the only other serialization, it keeps just
+        user set properties (see naclo.MolArray) and is skipped if the Mol column already is a MolArray.
+
+        Args:
+            outs (Dict[str, Union[str, IO[bytes]]]): Maps extension (any Writer.write ext) to path or binary buffer.
+                CSV/TSV/SDF paths ending in a compression suffix (".gz", ".bz2", ".zst") are compressed.
+            chunksize (int, optional): Rows per chunk. Defaults to 10000.
+            n_jobs (int, optional): Worker processes rendering CSV/TSV/SDF chunks and drawing structures. Defaults to
+                1.
+            dictionary_cols (Optional[List[str]], optional): See Writer.write. Defaults to None.
+            size (Tuple[int, int], optional): Excel only. Structure image size, see Writer.rdkit_2_excel. Defaults to
+                (200, 200).
+            cache (Optional[MutableMapping[str, bytes]], optional): Excel only. Depiction cache, see
+                Writer.rdkit_2_excel. Defaults to None.
+
+        Returns:
+            Dict[str, Union[None, BytesIO]]: Maps extension to rewound buffer (None for paths).
+        """
+        for ext, out in outs.items():
+            self.__check_out(out, [str, BytesIO])
+            self.__check_ext(ext)
+        
+        text_exts = [ext for ext in outs if ext in Writer.stream_exts]
+        excel_exts = [ext for ext in outs if ext in ['xlsx', 'xls']]
+        columnar_exts = [ext for ext in outs if ext in Writer.columnar_exts]
+        dictionary_dtypes = self.__dictionary_dtypes(self.df, self.mol_col_name, dictionary_cols) if columnar_exts \
+            else None
+        has_mols = self.mol_col_name in self.df.columns
+        cache = depictions.PngCache() if cache is None else cache
+        
+        with ExitStack() as stack:
+            handles = {ext: Writer.__open_sink(stack, outs[ext], naclo_compression.infer_compression(outs[ext]), n_jobs)
+                       for ext in text_exts}
+            columns = list(self.df.columns)
+            excel_sinks = [Writer.__open_excel_sink(stack, outs[ext], columns,
+                                                    columns.index(self.mol_col_name) if has_mols else None, size, None)
+                           for ext in excel_exts]
+            arrow_writers = {}
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=n_jobs)) if n_jobs > 1 else None
+            
+            chunks = Writer._slices(self.df, chunksize)
+            share_blobs = has_mols and bool(excel_exts) and 'sdf' in text_exts
+            for chunk, texts, blobs in Writer.__render_chunks(chunks, text_exts, self.mol_col_name, n_jobs,
+                                                              executor=executor, keep_blobs=share_blobs):
+                for ext, text in texts.items():
+                    handles[ext].write(text.encode('utf8'))
+                if excel_sinks:
+                    pngs = depictions.render_pngs(chunk[self.mol_col_name], size=size, n_jobs=n_jobs, cache=cache,
+                                                  executor=executor, blobs=blobs) if has_mols else [None]*len(chunk)
+                    for write_rows in excel_sinks:
+                        write_rows(chunk, pngs)
+                if columnar_exts:
+                    table = Writer.__arrow_table(Writer.__arrow_frame(chunk, self.mol_col_name, dictionary_dtypes))
+                    for ext in columnar_exts:
+                        if ext not in arrow_writers:
+                            arrow_writers[ext] = Writer.__open_arrow_writer(outs[ext], ext, table.schema)
+                            stack.callback(arrow_writers[ext].close)
+                        arrow_writers[ext].write_table(table)
+        
+        written = {}
+        for ext, out in outs.items():
+            if isinstance(out, BytesIO):
+                out.seek(0)
+                written[ext] = out
+            else:
+                written[ext] = None
+        return written
+    
+    @staticmethod
+    def __render_chunks(chunks:Iterable, exts:List[str], mol_col_name:str, n_jobs:int,
+                        executor:Optional[ProcessPoolExecutor]=None, keep_blobs:bool=False
+                        ) -> Iterator[Tuple[pd.DataFrame, Dict[str, str], Optional[List[Optional[bytes]]]]]:
+        """Renders each chunk to every text ext in order, in a process pool if n_jobs > 1 (executor if given, else
+        one started here). At most 2*n_jobs chunks are in flight. SDF chunks are sent to workers as Writer.__mol_blobs,
+        with keep_blobs the blobs are also computed for serial rendering. Yields (chunk, {ext: text}, blobs), blobs
+        None if not computed."""
+        parallel = n_jobs > 1 and bool(exts)
+        with ExitStack() as stack:
+            if parallel and executor is None:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=n_jobs))
+            pending = deque()
+            start = 0
+            for i, chunk in enumerate(chunks):
+                blobs = Writer.__mol_blobs(chunk, mol_col_name) if keep_blobs or (parallel and 'sdf' in exts) \
+                    else None
+                packed = blobs is not None and 'sdf' in exts
+                sent = chunk.assign(**{mol_col_name: blobs}) if packed else chunk
+                if parallel:
+                    texts = executor.submit(Writer._render_texts, sent, exts, mol_col_name, i == 0, start, packed)
+                else:
+                    texts = Writer._render_texts(sent, exts, mol_col_name, i == 0, start, packed)
+                pending.append((chunk, texts, blobs))
+                start += len(chunk)
+                while len(pending) >= (2*n_jobs if parallel else 1):
+                    chunk, texts, blobs = pending.popleft()
+                    yield chunk, texts.result() if parallel else texts, blobs
+            while pending:
+                chunk, texts, blobs = pending.popleft()
+                yield chunk, texts.result() if parallel else texts, blobs
+    
+    @staticmethod
+    def _render_texts(chunk:pd.DataFrame, exts:List[str], mol_col_name:str, header:bool, start:int=0,
+                      packed:bool=False) -> Dict[str, str]:
+        """Renders one chunk to several text formats. Plain staticmethod so it can be sent to worker processes.
+
+        Args:
+            packed (bool, optional): Mol column holds RDKit binary (see Writer.__mol_blobs). Defaults to False.
+
+        Returns:
+            Dict[str, str]: Maps ext to rendered text.
+        """
+        if packed:
+            chunk = chunk.assign(**{mol_col_name: [Chem.Mol(m) if isinstance(m, bytes) else m
+                                                   for m in chunk[mol_col_name]]})
+        return {ext: Writer._render_chunk(chunk, ext, mol_col_name, header=header, start=start) for ext in exts}
+    
+    @staticmethod
+    def __mol_blobs(chunk:pd.DataFrame, mol_col_name:str) -> Optional[List[Optional[bytes]]]:
+        """RDKit binary of each Mol holding all (incl. private and computed) properties, None for non Mols. Default
+        Mol pickling drops them, which changes generated 2D depictions in the worker. A MolArray column's blobs are
+        used as they are. None if there is no Mol column."""
+        if mol_col_name not in chunk.columns:
+            return None
+        mols = chunk[mol_col_name]
+        if isinstance(mols.dtype, MolDtype):
+            return [b if b else None for b in mols.array.blobs()]
+        return rdpickle.mol_blobs(mols, Chem.PropertyPickleOptions.AllProps)
+    
+    @staticmethod
+    def _slices(df:pd.DataFrame, chunksize:int) -> Iterator[pd.DataFrame]:
+        """Yields row slices of df (views, not copies). Always yields at least one (possibly empty) slice."""
+        for start in range(0, max(len(df), 1), chunksize):
+            yield df.iloc[start:start + chunksize]
+    
+    @staticmethod
+    def _render_chunk(chunk:pd.DataFrame, ext:str, mol_col_name:str, header:bool, start:int=0) -> str:
+        """Renders one chunk to text. Plain staticmethod so it can be sent to worker processes.
+
+        Args:
+            chunk (pd.DataFrame): Rows to render.
+            ext (str): One of Writer.stream_exts.
+            mol_col_name (str): Name of molecule column, SDF only.
+            header (bool): Include the CSV/TSV header.
+            start (int, optional): Position of the chunk's first row in the output, used for SDF record numbers.
+                Defaults to 0.
+
+        Returns:
+            str: Rendered text.
+        """
+        if ext == 'csv':
+            return chunk.to_csv(index=False, header=header)
+        elif ext == 'tsv':
+            return chunk.to_csv(sep='\t', index=False, header=header)
+        return Writer._render_sdf(chunk, mol_col_name, start=start)
+    
+    @staticmethod
+    def _render_sdf(chunk:pd.DataFrame, mol_col_name:str, start:int=0) -> str:
+        """Renders SDF records identical to rdkit.Chem.PandasTools.WriteSDF with all columns as properties and the
+        row index as title."""
+        properties = [c for c in chunk.columns if c != mol_col_name]
+        columns = [chunk[c].tolist() for c in properties]
+        
+        records = []
+        for i, (index, mol) in enumerate(zip(chunk.index, chunk[mol_col_name])):
+            mol = Chem.Mol(mol)  # Local copy to set props on
+            for name in mol.GetPropNames():  # Only the frame's columns are written
+                mol.ClearProp(name)
+            mol.SetProp('_Name', str(index))
+            for p, column in zip(properties, columns):
+                mol.SetProp(p, Writer.__format_prop(column[i]))
+            records.append(Chem.SDWriter.GetText(mol, molid=start + i))
+        return ''.join(records)
+    
+    @staticmethod
+    def __format_prop(value:Any) -> str:
+        """SD property text, floats are written without E notation."""
+        if np.issubdtype(type(value), np.floating):
+            s = '{:f}'.format(value).rstrip('0')
+            return s + '0' if s[-1] == '.' else s
+        return str(value)
     
     @staticmethod
     def __check_out(out:Any, types:Iterable) -> None:
@@ -69,55 +400,76 @@ class Writer:
         Args:
             ext (Any): Input to check value of.
         """
-        error_checking.val_check('ext', ext, ['csv', 'tsv', 'xlsx', 'xls', 'sdf'])
+        error_checking.val_check('ext', ext, ['csv', 'tsv', 'xlsx', 'xls', 'sdf'] + Writer.columnar_exts)
     
-    def __get_writer(self, out:Union[int, BytesIO], ext:str) -> Union[None, BytesIO]:
-        """Writer factory.
+    @staticmethod
+    def __check_compression(out:Union[str, BytesIO], ext:str, compression:Optional[str]) -> Optional[str]:
+        """Resolves "infer" and checks compression is only used with streamed exts."""
+        if compression == 'infer':
+            compression = naclo_compression.infer_compression(out)
+        if compression is not None:
+            error_checking.val_check('compression', compression, list(naclo_compression.default_levels))
+            if ext not in Writer.stream_exts:
+                raise ValueError(f'compression is only supported for {Writer.stream_exts}, not "{ext}"')
+        return compression
+    
+    def __get_writer(self, out:Union[int, BytesIO], ext:str, n_jobs:int, dictionary_cols:Optional[List[str]],
+                     compression:Optional[str]) -> Union[None, BytesIO]:
+        """Writer factory. Write options are passed down, not stored, so calls on one Writer do not interfere.
 
         Args:
             out (Union[int, BytesIO]): Buffer or path.
             ext (str): Extension to determine factory piping.
+            n_jobs (int): See write.
+            dictionary_cols (Optional[List[str]]): See write.
+            compression (Optional[str]): Resolved compression (not "infer").
 
         Raises:
             ArgumentError: Extension not recognized.
         """
         if ext == 'csv':
-            out = self.__write_csv(out)
+            out = self.__write_csv(out, n_jobs, compression)
         elif ext == 'tsv':
-            out = self.__write_tsv(out)
+            out = self.__write_tsv(out, n_jobs, compression)
         elif ext == 'xlsx' or ext == 'xls':
             out = self.__write_excel(out)
         elif ext == 'sdf':
-            out = self.__write_sdf(out)
+            out = self.__write_sdf(out, n_jobs, compression)
+        elif ext in Writer.columnar_exts:
+            out = self.__write_columnar(out, ext, dictionary_cols)
         else:
             raise ArgumentError(f'ext = {self.ext} is not recognized')
         
         if out:
             return out
     
-    def __write_csv(self, out:Union[int, BytesIO]) -> Union[None, BytesIO]:
+    def __write_csv(self, out:Union[int, BytesIO], n_jobs:int, compression:Optional[str]) -> Union[None, BytesIO]:
         """Writes to CSV.
 
         Args:
             out (Union[int, BytesIO]): Buffer or path.
+            n_jobs (int): Worker processes rendering chunks.
+            compression (Optional[str]): Block compression, None for plain text.
 
         Returns:
             Union[None, BytesIO]: Buffer if buffer.
         """
-        self.df.to_csv(out, index=False)
+        Writer.stream(self.df, out, 'csv', n_jobs=n_jobs, compression=compression)
         if isinstance(out, BytesIO):
             return out
         
-    def __write_tsv(self, out:Union[int, BytesIO]) -> Union[None, BytesIO]:
+    def __write_tsv(self, out:Union[int, BytesIO], n_jobs:int, compression:Optional[str]) -> Union[None, BytesIO]:
         """Writes to TSV.
 
         Args:
             out (Union[int, BytesIO]): Buffer or path.
+            n_jobs (int): Worker processes rendering chunks.
+            compression (Optional[str]): Block compression, None for plain text.
 
         Returns:
             Union[None, BytesIO]: Buffer if buffer.
         """
-        self.df.to_csv(out, sep='\t', index=False)
+        Writer.stream(self.df, out, 'tsv', n_jobs=n_jobs, compression=compression)
         if isinstance(out, BytesIO):
             return out
         
@@ -135,22 +487,88 @@ class Writer:
         if isinstance(out, BytesIO):
             return out
             
-    def __write_sdf(self, out:Union[int, BytesIO]) -> Union[None, BytesIO]:
-        """Writes to SDF.
+    def __write_sdf(self, out:Union[int, BytesIO], n_jobs:int, compression:Optional[str]) -> Union[None, BytesIO]:
+        """Writes to SDF. Records are rendered chunk by chunk straight into out.
+
+        Args:
+            out (Union[int, BytesIO]): Buffer or path.
+            n_jobs (int): Worker processes rendering chunks.
+            compression (Optional[str]): Block compression, None for plain text.
+
+        Returns:
+            Union[None, BytesIO]: Buffer if buffer.
+        """
+        Writer.stream(self.df, out, 'sdf', mol_col_name=self.mol_col_name, n_jobs=n_jobs,
+                      compression=compression)
+        if isinstance(out, BytesIO):
+            return out
+    
+    def __write_columnar(self, out:Union[int, BytesIO], ext:str,
+                         dictionary_cols:Optional[List[str]]) -> Union[None, BytesIO]:
+        """Writes to Parquet or Feather. The Mol column is stored as RDKit binary (large_binary), so reading it back
+        with naclo.readers.read_columnar does not re-parse any structures.
 
         Args:
             out (Union[int, BytesIO]): Buffer or path.
+            ext (str): 'parquet' or 'feather'.
+            dictionary_cols (Optional[List[str]]): See write.
+
+        Raises:
+            ImportError: pyarrow is not installed.
 
         Returns:
             Union[None, BytesIO]: Buffer if buffer.
         """
-        from naclo.dataframes import write_sdf  # Import within method to avoid circular import
+        try:
+            import pyarrow.feather
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError(f'Writing {ext} requires pyarrow: pip install pyarrow')
         
-        if isinstance(out, str):
-            write_sdf(self.df, out, self.mol_col_name)
+        dictionary_dtypes = Writer.__dictionary_dtypes(self.df, self.mol_col_name, dictionary_cols)
+        table = Writer.__arrow_table(Writer.__arrow_frame(self.df, self.mol_col_name, dictionary_dtypes))
+        if ext == 'parquet':
+            pyarrow.parquet.write_table(table, out)
         else:
-            out = StringIO()  # StringIO required by RDKit
-            write_sdf(self.df, out, self.mol_col_name)
-            out.seek(0)
-            out = BytesIO(out.read().encode('utf8'))
+            pyarrow.feather.write_feather(table, out)
+        if isinstance(out, BytesIO):
             return out
+    
+    @staticmethod
+    def __dictionary_dtypes(df:pd.DataFrame, mol_col_name:str,
+                            dictionary_cols:Optional[List[str]]) -> Dict[str, pd.CategoricalDtype]:
+        """Categorical dtype of each dictionary column, from its distinct values over the whole frame so every slice
+        has the same Arrow schema."""
+        if dictionary_cols is None:
+            dictionary_cols = [c for c in df.columns if df[c].dtype == object and c != mol_col_name and
+                               df[c].map(type).eq(str).all() and df[c].nunique() <= len(df)/2]
+        return {c: df[c].drop_duplicates().astype('category').dtype for c in dictionary_cols}
+    
+    @staticmethod
+    def __arrow_frame(df:pd.DataFrame, mol_col_name:str,
+                      dictionary_dtypes:Dict[str, pd.CategoricalDtype]) -> pd.DataFrame:
+        """Converts the Mol column to a binary MolArray and dictionary columns to categoricals. Works on a slice at a
+        time."""
+        if mol_col_name in df.columns and not isinstance(df[mol_col_name].dtype, MolDtype):
+            df = df.assign(**{mol_col_name: df[mol_col_name].astype('mol')})
+        if dictionary_dtypes:
+            df = df.assign(**{c: df[c].astype(dtype) for c, dtype in dictionary_dtypes.items()})
+        return df
+    
+    @staticmethod
+    def __arrow_table(df:pd.DataFrame) -> Any:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError('Writing parquet or feather requires pyarrow: pip install pyarrow')
+        return pa.Table.from_pandas(df, preserve_index=False)
+    
+    @staticmethod
+    def __open_arrow_writer(out:Union[str, IO[bytes]], ext:str, schema:Any) -> Any:
+        """Incremental Parquet or Feather (Arrow IPC file, lz4 like pyarrow.feather.write_feather) writer."""
+        import pyarrow as pa
+        import pyarrow.parquet
+        
+        if ext == 'parquet':
+            return pyarrow.parquet.ParquetWriter(out, schema)
+        return pa.ipc.new_file(out, schema, options=pa.ipc.IpcWriteOptions(compression='lz4'))
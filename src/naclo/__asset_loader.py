@@ -2,26 +2,30 @@ from importlib import resources
 import json
 
 
-with resources.open_text('naclo.assets', 'bleach_default_params.json') as f:
-    bleach_default_params = json.load(f)
+# Assets are parsed on first access (PEP 562), importing naclo does not read any JSON
+__assets = {
+    'bleach_default_params': 'bleach_default_params.json',
+    'bleach_default_options': 'bleach_default_options.json',
+    'binarize_default_params': 'binarize_default_params.json',
+    'binarize_default_options': 'binarize_default_options.json',
+    'recognized_bleach_options': 'recognized_bleach_options.json',
+    'recognized_binarize_options': 'recognized_binarize_options.json',
+    'recognized_units': 'recognized_units.json',
+    'recognized_salts': 'recognized_salts.json'
+}
 
-with resources.open_text('naclo.assets', 'bleach_default_options.json') as f:
-    bleach_default_options = json.load(f)
-    
-with resources.open_text('naclo.assets', 'binarize_default_params.json') as f:
-    binarize_default_params = json.load(f)
 
-with resources.open_text('naclo.assets', 'binarize_default_options.json') as f:
-    binarize_default_options = json.load(f)
+def __getattr__(name:str):
+    if name not in __assets:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-with resources.open_text('naclo.assets', 'recognized_bleach_options.json') as f:
-    recognized_bleach_options = json.load(f)
-    
-with resources.open_text('naclo.assets', 'recognized_binarize_options.json') as f:
-    recognized_binarize_options = json.load(f)
+    if hasattr(resources, 'files'):  # Python >= 3.9, open_text is deprecated
+        value = json.loads(resources.files('naclo.assets').joinpath(__assets[name]).read_text())
+    else:
+        with resources.open_text('naclo.assets', __assets[name]) as f:
+            value = json.load(f)
+    globals()[name] = value  # Cached, later lookups do not reach __getattr__
+    return value
 
-with resources.open_text('naclo.assets', 'recognized_units.json') as f:
-    recognized_units = json.load(f)
-
-with resources.open_text('naclo.assets', 'recognized_salts.json') as f:
-    recognized_salts = json.load(f)
+def __dir__():
+    return sorted(set(globals()) | set(__assets))
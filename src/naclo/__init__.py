@@ -2,16 +2,66 @@ __doc__ == """
 **naclo** is a Python cleaning toolset for small molecule drug discovery datasets.
 """
 
-from naclo.mol_stats import *
-from naclo.mol_conversion import *
-from naclo import database
-from naclo import dataframes
-from naclo import fragments
-from naclo import neutralize
-from naclo import rdpickle
-from naclo.Bleach import Bleach
-from naclo.Binarize import Binarize
-from naclo.__asset_loader import bleach_default_params, bleach_default_options
-from naclo.__asset_loader import binarize_default_params, binarize_default_options
-from naclo.UnitConverter import UnitConverter
-from naclo import __naclo_util
+import importlib
+import sys
+import types
+
+
+# Everything is imported on first attribute access (PEP 562). A process that only uses e.g. naclo.UnitConverter does
+# not load database, Excel or plotting dependencies.
+_submodules = ['aggregate', 'cli', 'clean', 'compression', 'database', 'dataframes', 'depictions', 'fragments',
+               'mol_conversion', 'mol_stats', 'neutralize', 'rdpickle', 'readers', 'server', 'supervised', '__naclo_util']
+_attributes = {
+    'Bleach': 'naclo.Bleach',
+    'Binarize': 'naclo.Binarize',
+    'clean_structure': 'naclo.clean',
+    'UnitConverter': 'naclo.UnitConverter',
+    'MolFrame': 'naclo.MolFrame',
+    'MolArray': 'naclo.MolArray',
+    'MolDtype': 'naclo.MolArray',
+    'bleach_default_params': 'naclo.__asset_loader',
+    'bleach_default_options': 'naclo.__asset_loader',
+    'binarize_default_params': 'naclo.__asset_loader',
+    'binarize_default_options': 'naclo.__asset_loader'
+}
+_star_modules = ['naclo.mol_conversion', 'naclo.mol_stats']  # Public names re-exported at top level, later wins
+
+
+def __public_names(module:types.ModuleType) -> list:
+    return [name for name in vars(module) if not name.startswith('_')]
+
+def __getattr__(name:str):
+    if name in _attributes:
+        value = getattr(importlib.import_module(_attributes[name]), name)
+    elif name in _submodules:
+        value = importlib.import_module(f'{__name__}.{name}')
+    elif name == '__all__':  # from naclo import *
+        value = sorted({n for n in _submodules + list(_attributes) if not n.startswith('_')} |
+                       {n for m in _star_modules for n in __public_names(importlib.import_module(m))})
+    elif not name.startswith('_'):
+        for module in _star_modules:
+            module = importlib.import_module(module)
+            if hasattr(module, name):
+                value = getattr(module, name)
+                break
+        else:
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    globals()[name] = value  # Cached, later lookups do not reach __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_submodules) | set(_attributes))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name:str, value) -> None:
+        # Importing a submodule binds it on the package, e.g. naclo.MolArray = <module>. Keep the class export.
+        if name in _attributes and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
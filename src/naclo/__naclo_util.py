@@ -1,5 +1,12 @@
+import asyncio
+import copy
+import inspect
 import warnings
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional
 
+import pandas as pd
 import stse
 
 
@@ -34,6 +41,10 @@ def recognized_options_checker(input_options, recognized_options) -> None:  # *
             if not input[key] in recognized[key]:
                 errors[f'BAD_OPTION{key.upper()}'] = f'"{input[key]}" is not an accepted value for "{key}", set \
                     to one of: "{recognized[key]}"'
+        elif isinstance(value, float):  # Whole numbers are accepted where a float is expected
+            if isinstance(input[key], bool) or not isinstance(input[key], (int, float)):
+                errors[f'BAD_OPTION{key.upper()}'] = f'{type(input[key])} is not an accepted type for {key}, \
+                    input a number'
         else:
             if not type(input[key]) == type(recognized[key]):
                 errors[f'BAD_OPTION{key.upper()}'] = f'{type(input[key])} is not an accepted type for {key}, \
@@ -41,8 +52,71 @@ def recognized_options_checker(input_options, recognized_options) -> None:  # *
     if errors:
         raise ValueError(errors)
     
+def fill_default_options(options:dict, defaults:dict) -> dict:
+    """Options with settings it does not set (e.g. ones added in a later version) taken from defaults. Nested dicts
+    are copied, options is not modified."""
+    filled = copy.deepcopy(defaults)
+    for key, value in options.items():
+        if isinstance(value, dict) and isinstance(filled.get(key), dict):
+            filled[key] = fill_default_options(value, filled[key])
+        else:
+            filled[key] = value
+    return filled
+
 def check_columns_in_df(df, columns) -> None:
     """Checks that all columns in columns are in df"""
     for column in columns:
         if column not in df.columns:
             raise ValueError(f'Column: "{column}" is not found in data.')
+
+
+async def map_chunks(func:Callable, df:pd.DataFrame, *args, executor:Optional[Executor]=None, chunksize:int=1000,
+                     n_jobs:int=1, progress:Optional[Callable]=None) -> List[Any]:
+    """Runs func(chunk, *args) on row chunks of df in an executor without blocking the event loop. Results are in
+    chunk order. An empty df is sent as one empty chunk. Cancelling the awaiting task cancels chunks not yet started.
+
+    Args:
+        func (Callable): Picklable (top level or class attribute) function if executor is a process pool.
+        df (pd.DataFrame): Data to split.
+        executor (Optional[Executor], optional): Thread or process pool. Defaults to None (event loop default).
+        chunksize (int, optional): Rows per chunk. Defaults to 1000.
+        n_jobs (int, optional): Chunks submitted at once. Defaults to 1.
+        progress (Optional[Callable], optional): Called (or awaited if it returns an awaitable) with (rows done,
+            total rows) after each chunk. Defaults to None.
+
+    Returns:
+        List[Any]: One result per chunk.
+    """
+    loop = asyncio.get_running_loop()
+    total, done = len(df), 0
+    starts = iter(range(0, max(total, 1), chunksize))
+    pending = deque()  # (rows, future) in submission order
+    results = []
+
+    def submit() -> bool:
+        start = next(starts, None)
+        if start is None:
+            return False
+        chunk = df.iloc[start:start + chunksize]
+        pending.append((len(chunk), loop.run_in_executor(executor, func, chunk, *args)))
+        return True
+
+    try:
+        while len(pending) < max(n_jobs, 1) and submit():
+            pass
+        while pending:
+            rows, future = pending[0]
+            results.append(await future)  # Event loop serves other tasks meanwhile
+            pending.popleft()
+            submit()
+
+            done += rows
+            if progress is not None:
+                reported = progress(done, total)
+                if inspect.isawaitable(reported):
+                    await reported
+    except BaseException:  # Including asyncio.CancelledError
+        for _, future in pending:
+            future.cancel()
+        raise
+    return results
@@ -0,0 +1,143 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+statistics = ['mean', 'median', 'geomean', 'std', 'count']
+
+
+def group_codes(keys:Iterable) -> Tuple[np.ndarray, int]:  # *
+    """Hashes keys to dense group codes, in order of first appearance.
+
+    Args:
+        keys (Iterable): One key per row (e.g. InChI keys). NA keys get code -1.
+
+    Returns:
+        Tuple[np.ndarray, int]: Code per row and number of groups.
+    """
+    codes, uniques = pd.factorize(keys if isinstance(keys, (pd.Series, np.ndarray)) else list(keys))
+    return codes, len(uniques)
+
+def __sorted_medians(codes:np.ndarray, values:np.ndarray, counts:np.ndarray) -> np.ndarray:
+    """Medians of non-NA values per group: one sort by (group, value), then the middle of each run."""
+    order = np.lexsort((values, codes))
+    values = values[order]
+    starts = np.cumsum(counts) - counts
+    medians = np.full(len(counts), np.nan)
+    has = counts > 0
+    low = starts[has] + (counts[has] - 1) // 2
+    high = starts[has] + counts[has] // 2
+    medians[has] = (values[low] + values[high]) / 2
+    return medians
+
+def group_statistics(codes:np.ndarray, n_groups:int, values:np.ndarray,
+                     stats:Iterable[str]=('mean',)) -> Dict[str, np.ndarray]:  # *
+    """Statistics of values per group, skipping NA values (as pandas does). Sums are bincounts, so the cost is linear in
+    rows, except median which sorts once.
+
+    Args:
+        codes (np.ndarray): Group per row from group_codes, rows with code -1 are ignored.
+        n_groups (int): Number of groups.
+        values (np.ndarray): Float values per row.
+        stats (Iterable[str], optional): Any of statistics: "mean", "median", "geomean" (exp of the mean log, NA if a
+            group has a non-positive value), "std" (sample, NA for one value) and "count" (non-NA values). Defaults
+            to ("mean",).
+
+    Raises:
+        ValueError: Unrecognized statistic.
+
+    Returns:
+        Dict[str, np.ndarray]: Statistic -> value per group.
+    """
+    stats = list(stats)
+    for stat in stats:
+        if stat not in statistics:
+            raise ValueError(f'Statistic: "{stat}" is not one of {statistics}')
+
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    counts = np.bincount(codes, minlength=n_groups)
+
+    out = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(codes, weights=values, minlength=n_groups) / counts
+        for stat in stats:
+            if stat == 'mean':
+                out[stat] = mean
+            elif stat == 'count':
+                out[stat] = counts
+            elif stat == 'std':
+                squares = np.bincount(codes, weights=(values - mean[codes])**2, minlength=n_groups)
+                out[stat] = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+            elif stat == 'geomean':
+                positive = values > 0
+                logs = np.bincount(codes[positive], weights=np.log(values[positive]), minlength=n_groups)
+                n_positive = np.bincount(codes[positive], minlength=n_groups)
+                out[stat] = np.where((n_positive == counts) & (counts > 0), np.exp(logs / n_positive), np.nan)
+            elif stat == 'median':
+                out[stat] = __sorted_medians(codes, values, counts)
+    return out
+
+def __neg_log_statistics(codes:np.ndarray, n_groups:int, values:np.ndarray,
+                         stats:List[str]) -> Dict[str, np.ndarray]:
+    """Statistics of -log10 values (e.g. neg_log_molar) taken on the linear scale: mean, median and geomean of
+    10**-value converted back (geomean is the mean of the -log10 values), std of the -log10 values themselves."""
+    with np.errstate(over='ignore', divide='ignore'):
+        out = group_statistics(codes, n_groups, 10.0**-values, stats)
+        for stat in ['mean', 'median', 'geomean']:
+            if stat in out:
+                out[stat] = -np.log10(out[stat])
+    if 'std' in out:
+        out['std'] = group_statistics(codes, n_groups, values, ['std'])['std']
+    return out
+
+def aggregate_duplicates(df:pd.DataFrame, key_col:str, value_cols:List[str], stats:Iterable[str]=('mean',),
+                         neg_log_cols:Iterable[str]=()) -> pd.DataFrame:  # *
+    """Merges rows with the same key: the first row of each key is kept (with its index) and value columns are replaced
+    by statistics over the key's rows. With one statistic a value column keeps its name, with several it is replaced
+    by "<column>_<statistic>" columns in its place. Rows with an NA key are dropped. With stats=("mean",) the output
+    matches stse.duplicates.average.
+
+    Args:
+        df (pd.DataFrame): Data.
+        key_col (str): Key column (e.g. InChI keys).
+        value_cols (List[str]): Columns to aggregate, cast to float.
+        stats (Iterable[str], optional): Any of naclo.aggregate.statistics. Defaults to ("mean",).
+        neg_log_cols (Iterable[str], optional): Value columns holding -log10 values (e.g. neg_log_molar). Mean,
+            median and geomean are taken on the linear scale and converted back, std is in log units. Defaults to ().
+
+    Raises:
+        ValueError: A value column is missing or not float castable.
+
+    Returns:
+        pd.DataFrame: One row per key, in order of first appearance.
+    """
+    stats, neg_log_cols = list(stats), set(neg_log_cols)
+    for col in value_cols:
+        if col not in df.columns:
+            raise ValueError(f'Value column: "{col}" not found in DataFrame')
+
+    codes, n_groups = group_codes(df[key_col])
+    firsts = np.full(n_groups, len(df))
+    np.minimum.at(firsts, codes[codes >= 0], np.flatnonzero(codes >= 0))  # First row of each group
+    out = df.iloc[firsts]
+
+    columns = {}
+    for col in df.columns:
+        if col not in value_cols:
+            columns[col] = out[col]
+            continue
+        try:
+            values = df[col].to_numpy(dtype=float)
+        except (ValueError, TypeError):
+            raise ValueError(f'Value column: "{col}" does not contain float castable values')
+        if col in neg_log_cols:
+            results = __neg_log_statistics(codes, n_groups, values, stats)
+        else:
+            results = group_statistics(codes, n_groups, values, stats)
+        if len(stats) == 1:
+            columns[col] = pd.Series(results[stats[0]], index=out.index)
+        else:
+            columns.update({f'{col}_{stat}': pd.Series(results[stat], index=out.index) for stat in stats})
+    return pd.DataFrame(columns, index=out.index)
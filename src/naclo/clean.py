@@ -0,0 +1,110 @@
+from typing import Optional, Union
+
+from rdkit import Chem
+from rdkit.Chem.Descriptors import ExactMolWt
+
+from naclo import fragments
+from naclo import neutralize
+from naclo import __asset_loader as asset_loader
+
+
+__na_strings = frozenset(['', 'nan', 'none'])  # stse.dataframes.convert_to_nan defaults
+__filters = {
+    'carbon_count': fragments.carbon_count,
+    'mw': fragments.mw,
+    'atom_count': fragments.atom_count
+}
+
+
+class CleanedStructure:
+    __slots__ = ('smiles', 'mol', 'inchi_key', 'mw', 'dropped')
+
+    def __init__(self, smiles:Optional[str]=None, mol:Optional[Chem.rdchem.Mol]=None, inchi_key:Optional[str]=None,
+                 mw:Optional[float]=None, dropped:Optional[str]=None) -> None:
+        """Result of naclo.clean.clean_structure. Falsy if the structure would have been dropped by Bleach.
+
+        Args:
+            smiles (Optional[str], optional): Canonical SMILES. Defaults to None.
+            mol (Optional[Chem.rdchem.Mol], optional): Cleaned Mol. Defaults to None.
+            inchi_key (Optional[str], optional): InChI key. Defaults to None.
+            mw (Optional[float], optional): Exact molecular weight (if requested by options). Defaults to None.
+            dropped (Optional[str], optional): Reason the structure was dropped: "NA_STRUCTURE",
+                "INVALID_STRUCTURE", "ONLY_SALTS" or "INVALID_INCHI_KEY". Defaults to None.
+        """
+        self.smiles = smiles
+        self.mol = mol
+        self.inchi_key = inchi_key
+        self.mw = mw
+        self.dropped = dropped
+
+    def __bool__(self) -> bool:
+        return self.dropped is None
+
+    def __repr__(self) -> str:
+        if self.dropped:
+            return f'CleanedStructure(dropped={self.dropped!r})'
+        return f'CleanedStructure(smiles={self.smiles!r}, inchi_key={self.inchi_key!r}, mw={self.mw!r})'
+
+
+def __mol_from_smiles(smiles:str) -> Optional[Chem.rdchem.Mol]:
+    try:
+        return Chem.MolFromSmiles(smiles)
+    except Exception:  # Same as naclo.dataframes: failures are NA
+        return None
+
+def clean_structure(structure:Union[str, Chem.rdchem.Mol], options:Optional[dict]=None) -> CleanedStructure:  # *
+    """Cleans one structure without DataFrames. Runs the same molecule steps as Bleach.main (canonicalize, remove
+    salts, filter fragments, neutralize, InChI key, MW) with the same results. Options are not validated.
+
+    Args:
+        structure (Union[str, Chem.rdchem.Mol]): SMILES or Mol.
+        options (Optional[dict], optional): Bleach options, only molecule_settings and file_settings.append_columns.mw
+            are used. Defaults to None (Bleach defaults).
+
+    Returns:
+        CleanedStructure: Cleaned structure, or reason it was dropped.
+    """
+    options = asset_loader.bleach_default_options if options is None else options
+    mol_settings = options['molecule_settings']
+
+    # Step 1: NA structures (Bleach.drop_na)
+    if structure is None or str(structure).lower() in __na_strings:
+        return CleanedStructure(dropped='NA_STRUCTURE')
+
+    # Step 2: Build Mol and canonical SMILES (Bleach.init_structure_compute)
+    mol = structure if isinstance(structure, Chem.rdchem.Mol) else __mol_from_smiles(structure)
+    if mol is None:
+        return CleanedStructure(dropped='INVALID_STRUCTURE')
+    smiles = Chem.MolToSmiles(mol)
+    parsed_from = None  # SMILES the current Mol was parsed from, re-parsing the same string is skipped
+
+    # Step 3: Fragments (Bleach.mol_cleanup)
+    if mol_settings['remove_fragments']['salts']:
+        smiles = fragments.remove_recognized_salts(smiles)
+        if not smiles:
+            return CleanedStructure(dropped='ONLY_SALTS')
+        mol, parsed_from = __mol_from_smiles(smiles), smiles
+        if mol is None:
+            return CleanedStructure(dropped='INVALID_STRUCTURE')
+
+    filter_method = mol_settings['remove_fragments']['filter_method']
+    if filter_method and filter_method != 'none':
+        smiles = __filters[filter_method](smiles)
+        if smiles != parsed_from:
+            mol, parsed_from = __mol_from_smiles(smiles), smiles
+            if mol is None:
+                return CleanedStructure(dropped='INVALID_STRUCTURE')
+
+    if mol_settings['neutralize_charges']['run']:
+        mol = neutralize.neutralize_mol(mol, neutralize.cached_neutralization_rxns())
+        smiles = Chem.MolToSmiles(mol)
+
+    # Step 5: InChI key (Bleach.handle_duplicates)
+    try:
+        inchi_key = Chem.MolToInchiKey(mol)
+    except Exception:
+        return CleanedStructure(dropped='INVALID_INCHI_KEY')
+
+    # Step 6: MW (Bleach.append_columns)
+    mw = ExactMolWt(mol) if options['file_settings']['append_columns']['mw'] else None
+    return CleanedStructure(smiles=smiles, mol=mol, inchi_key=inchi_key, mw=mw)
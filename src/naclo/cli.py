@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import copy
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+import naclo
+from naclo import __asset_loader as asset_loader
+from naclo import compression as naclo_compression
+from naclo import readers
+from naclo.Writer import Writer
+
+
+input_exts = ['csv', 'tsv', 'sdf']
+__seps = {'csv': ',', 'tsv': '\t'}
+
+
+def __ext(path:str, ext:Optional[str]) -> str:
+    """Explicit format, else the path's suffix after any compression suffix ("data.csv.gz" -> "csv")."""
+    if ext:
+        return ext.lower()
+    path = naclo_compression.strip_compression_ext(path)
+    return path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+
+def __parse_value(text:str):
+    """JSON value if it parses ("true", "0.8", "null"), else the text itself."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def __load_settings(defaults:dict, path:Optional[str], assignments:List[str]) -> dict:
+    """Defaults, updated by a JSON file and then by dotted KEY=VALUE assignments, e.g.
+    "file_settings.duplicate_compounds.selected=remove"."""
+    settings = copy.deepcopy(defaults)
+    if path:
+        with open(path) as f:
+            settings = __merge(settings, json.load(f))
+    for assignment in assignments:
+        if '=' not in assignment:
+            raise ValueError(f'Setting "{assignment}" must look like KEY=VALUE')
+        keys, value = assignment.split('=', 1)
+        branch = settings
+        *parents, leaf = keys.split('.')
+        for key in parents:
+            branch = branch.setdefault(key, {})
+        branch[leaf] = __parse_value(value)
+    return settings
+
+def __merge(base:dict, update:dict) -> dict:
+    """Nested dict update, so an options file may hold only the settings it changes."""
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            __merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+def __read_chunks(path:str, ext:str, structure_col:str, chunksize:int, n_jobs:int) -> Iterator[pd.DataFrame]:
+    if ext == 'sdf':
+        return readers.iter_sdf(path, mol_col_name=structure_col, chunksize=chunksize, n_jobs=n_jobs)
+    elif ext in __seps:
+        return pd.read_csv(path, sep=__seps[ext], chunksize=chunksize)
+    raise ValueError(f'Input format "{ext}" is not recognized, use one of {input_exts}')
+
+def __pipeline(args:argparse.Namespace, ext:str) -> Tuple[dict, dict]:
+    """Params and options of the requested command: defaults, then files, then flags."""
+    kind = args.command
+    params = __load_settings(getattr(asset_loader, f'{kind}_default_params'), args.params, [])
+    for key in ['structure_col', 'structure_type', 'target_col', 'decision_boundary']:
+        if getattr(args, key, None) is not None:
+            params[key] = getattr(args, key)
+    if not params['structure_type']:
+        params['structure_type'] = 'mol' if ext == 'sdf' else 'smiles'
+    if not params['structure_col']:
+        params['structure_col'] = 'ROMol' if params['structure_type'] == 'mol' else 'SMILES'
+    if kind == 'binarize' and params['decision_boundary'] is None:
+        raise ValueError('binarize needs a decision boundary (--decision-boundary or --params)')
+    options = __load_settings(getattr(asset_loader, f'{kind}_default_options'), args.options, args.set)
+    return params, options
+
+def _run_chunk(kind:str, df:pd.DataFrame, params:dict, options:dict) -> pd.DataFrame:
+    """Runs the whole pipeline on one chunk. Top level function so it can be sent to worker processes."""
+    if kind == 'bleach':
+        return naclo.Bleach(df, params, options).main()
+    return naclo.Binarize(df, params, options).main()
+
+def __stream_columns(out:pd.DataFrame, in_columns:List[str], options:dict, params:dict) -> List[str]:
+    """Output header when chunks are cleaned independently. Bleach drops columns that are entirely NA, which
+    depends on the chunk, so all input columns are kept (blank if NA) except structure columns the options drop."""
+    if 'file_settings' not in options:  # Binarize does not drop columns
+        return list(out.columns)
+    chars = options['file_settings']['remove_header_chars']['chars']
+    rename = lambda cols: list(naclo.Bleach.remove_header_chars(pd.DataFrame(columns=cols), chars).columns)
+    built = rename(['ROMol', 'SMILES', 'InchiKey', params['structure_col']])
+    kept = [c for c in rename(in_columns) if c in out.columns or c not in built]
+    return kept + [c for c in out.columns if c not in kept]
+
+def __mol_col(params:dict, options:dict) -> str:
+    """Name of the Mol column in the output, for SDF and Excel."""
+    mol_col = params['structure_col'] if params['structure_type'] == 'mol' else 'ROMol'
+    if 'file_settings' in options:
+        mol_col = naclo.Bleach.remove_header_chars(pd.DataFrame(columns=[mol_col]),
+                                                   options['file_settings']['remove_header_chars']['chars']).columns[0]
+    return mol_col
+
+def __run_whole(args:argparse.Namespace, chunks:Iterator[pd.DataFrame], params:dict, options:dict) -> pd.DataFrame:
+    """Reads all chunks, then cleans in chunks in parallel with amain. Holds the whole input in memory so duplicates
+    and NA columns are handled over the whole file, output is the same as main."""
+    df = pd.concat(list(chunks), ignore_index=True)
+    pipeline = naclo.Bleach(df, params, options) if args.command == 'bleach' else naclo.Binarize(df, params, options)
+
+    async def run() -> pd.DataFrame:
+        if args.jobs > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                return await pipeline.amain(executor, chunksize=args.chunksize, n_jobs=args.jobs)
+        return await pipeline.amain(chunksize=args.chunksize)
+    return asyncio.run(run())
+
+def __run_streaming(args:argparse.Namespace, chunks:Iterator[pd.DataFrame], params:dict,
+                    options:dict) -> Iterator[pd.DataFrame]:
+    """Cleans chunks independently in worker processes, in input order. Duplicates are only merged within a
+    chunk. Every chunk is written with the first chunk's header.
+
+    Raises:
+        ValueError: A later chunk has columns that are not in the header (e.g. SD properties first found there).
+    """
+    header = None
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    pending = []
+
+    def conform(in_columns:List[str], out:pd.DataFrame) -> pd.DataFrame:
+        nonlocal header
+        header = header or __stream_columns(out, in_columns, options, params)
+        added = [c for c in out.columns if c not in header]
+        if added:
+            raise ValueError(f'A chunk has columns {added} that are not in the output header {header}, '
+                             'use --whole-file')
+        return out.reindex(columns=header)
+
+    try:
+        for chunk in chunks:
+            if executor is None:
+                pending.append((list(chunk.columns), _run_chunk(args.command, chunk, params, options)))
+            else:
+                pending.append((list(chunk.columns),
+                                executor.submit(_run_chunk, args.command, chunk, params, options)))
+            while pending and (executor is None or len(pending) > 2*args.jobs):  # Bound chunks held in memory
+                in_columns, out = pending.pop(0)
+                yield conform(in_columns, out if executor is None else out.result())
+        while pending:
+            in_columns, out = pending.pop(0)
+            yield conform(in_columns, out.result())
+    finally:
+        if executor is not None:
+            for _, out in pending:  # Chunks of an abandoned stream that have not started (no cancel_futures < 3.9)
+                out.cancel()
+            executor.shutdown()
+
+def __drop_mol_col(df:pd.DataFrame, ext:str, mol_col:str) -> pd.DataFrame:
+    """Removes the Mol column from CSV/TSV output, where it would be written as Mol object reprs."""
+    return df.drop(columns=mol_col) if ext in __seps and mol_col in df.columns else df
+
+def __clean_file(args:argparse.Namespace) -> None:
+    in_ext = __ext(args.input, args.input_format)
+    out_ext = __ext(args.output, args.output_format)
+    if in_ext not in input_exts:
+        raise ValueError(f'Input format "{in_ext}" is not recognized, use one of {input_exts} (see --input-format)')
+    if not args.whole_file and out_ext not in Writer.stream_exts:
+        raise ValueError(f'Only {Writer.stream_exts} are written chunk by chunk, "{out_ext}" output needs '
+                         '--whole-file')
+
+    params, options = __pipeline(args, in_ext)
+    chunks = __read_chunks(args.input, in_ext, params['structure_col'], args.chunksize, args.jobs)
+    mol_col = __mol_col(params, options)
+
+    if args.whole_file:
+        df = __drop_mol_col(__run_whole(args, chunks, params, options), out_ext, mol_col)
+        Writer(df, mol_col_name=mol_col).write(args.output, out_ext, n_jobs=args.jobs)
+    else:
+        cleaned = (__drop_mol_col(chunk, out_ext, mol_col) for chunk in __run_streaming(args, chunks, params, options))
+        Writer.stream(cleaned, args.output, out_ext, mol_col_name=mol_col, n_jobs=args.jobs)
+
+def __serve(args:argparse.Namespace) -> None:
+    from naclo import server
+    options = __load_settings(asset_loader.bleach_default_options, args.options, args.set)
+    server.serve(args.host, args.port, options=options, max_batch_size=args.max_batch_size,
+                 max_delay=args.max_delay, n_jobs=args.jobs)
+
+def __parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='naclo', description='Cleaning toolset for small molecule drug discovery '
+                                     'datasets.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    settings = argparse.ArgumentParser(add_help=False)
+    settings.add_argument('--options', help='JSON options file, may hold only the settings it changes')
+    settings.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                          help='Option override with a dotted key and JSON value, e.g. '
+                          'file_settings.duplicate_compounds.selected=remove (repeatable)')
+    settings.add_argument('-j', '--jobs', type=int, default=1, help='Worker processes (default: 1)')
+
+    files = argparse.ArgumentParser(add_help=False)
+    files.add_argument('input', help=f'Input file: {", ".join(input_exts)} (CSV/TSV may be compressed)')
+    files.add_argument('-o', '--output', required=True,
+                       help='Output file, format from its suffix, e.g. out.sdf.gz, out.xlsx, out.parquet')
+    files.add_argument('--input-format', choices=input_exts, help='Input format (default: from suffix)')
+    files.add_argument('--output-format', help='Output format (default: from suffix)')
+    files.add_argument('--params', help='JSON params file')
+    files.add_argument('--structure-col', dest='structure_col', help='Structure column (default: ROMol for SDF, else SMILES)')
+    files.add_argument('--structure-type', dest='structure_type', choices=['smiles', 'mol'],
+                       help='Structure type (default: mol for SDF, else smiles)')
+    files.add_argument('--target-col', dest='target_col', help='Activity column')
+    files.add_argument('--chunksize', type=int, default=10000, help='Rows per chunk (default: 10000)')
+    files.add_argument('--whole-file', dest='whole_file', action='store_true',
+                       help='Load the whole input and merge duplicates across the file, as the library pipeline does. '
+                       'Needed for Excel, Parquet and Feather output. By default input is cleaned and written chunk '
+                       'by chunk in bounded memory: duplicates are only merged within a chunk and entirely NA '
+                       'columns are kept')
+
+    commands.add_parser('bleach', parents=[files, settings], help='Clean structures (naclo.Bleach)')
+    binarize = commands.add_parser('binarize', parents=[files, settings], help='Binarize activity (naclo.Binarize)')
+    binarize.add_argument('--decision-boundary', dest='decision_boundary', type=float,
+                          help='Activity decision boundary')
+
+    serve = commands.add_parser('serve', parents=[settings], help='Micro-batching cleaning server (naclo.server)')
+    serve.add_argument('--host', default='127.0.0.1', help='Interface (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8765, help='TCP port (default: 8765)')
+    serve.add_argument('--max-batch-size', dest='max_batch_size', type=int, default=256,
+                       help='Structures per batch (default: 256)')
+    serve.add_argument('--max-delay', dest='max_delay', type=float, default=0.005,
+                       help='Seconds a structure waits for a batch to fill (default: 0.005)')
+    return parser
+
+def main(argv:Optional[List[str]]=None) -> int:
+    """naclo console entry point.
+
+    Args:
+        argv (Optional[List[str]], optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit status.
+    """
+    parser = __parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'serve':
+            __serve(args)
+        else:
+            __clean_file(args)
+    except (ValueError, OSError) as e:
+        parser.exit(1, f'naclo {args.command}: error: {e}\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
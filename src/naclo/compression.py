@@ -0,0 +1,120 @@
+import bz2
+import gzip
+import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, IO, Optional, Union
+
+
+# Suffix -> codec, used to infer compression from output paths
+compression_exts = {'gz': 'gzip', 'gzip': 'gzip', 'bz2': 'bz2', 'zst': 'zstd', 'zstd': 'zstd'}
+default_levels = {'gzip': 6, 'bz2': 9, 'zstd': 3}
+
+
+def infer_compression(out:Union[str, IO[bytes]]) -> Optional[str]:  # *
+    """Codec named by a path's last suffix, e.g. "data.sdf.gz" -> "gzip". None for buffers and plain paths."""
+    if not isinstance(out, str) or '.' not in out:
+        return None
+    return compression_exts.get(out.rsplit('.', 1)[-1].lower())
+
+def strip_compression_ext(path:str) -> str:
+    """Drops a compression suffix: "data.sdf.gz" -> "data.sdf"."""
+    return path.rsplit('.', 1)[0] if infer_compression(path) else path
+
+def __gzip_member(block:bytes, level:int) -> bytes:
+    """One gzip member with mtime 0 for reproducible output. GzipFile, as gzip.compress takes mtime only from 3.8."""
+    out = io.BytesIO()
+    with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=level, mtime=0) as f:
+        f.write(block)
+    return out.getvalue()
+
+def __block_compressor(codec:str, level:int) -> Callable[[bytes], bytes]:
+    """Function compressing one block into a complete, independently decodable gzip member, bz2 stream or zstd
+    frame. Concatenated blocks are a valid file for gzip/zcat, bzip2 and zstd."""
+    if codec == 'gzip':
+        return lambda block: __gzip_member(block, level)
+    elif codec == 'bz2':
+        return lambda block: bz2.compress(block, compresslevel=level)
+    elif codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('zstd compression requires zstandard: pip install zstandard')
+        return lambda block: zstandard.ZstdCompressor(level=level).compress(block)
+    raise ValueError(f'compression = "{codec}" is not recognized, use one of {sorted(default_levels)}')
+
+
+class _BlockWriter:
+    def __init__(self, raw:IO[bytes], compress:Callable[[bytes], bytes], n_jobs:int, block_size:int) -> None:
+        """Binary file-like that compresses fixed size blocks, in a thread pool if n_jobs > 1 (zlib, bz2 and zstd
+        release the GIL). Blocks are written in order so output does not depend on n_jobs."""
+        self.raw = raw
+        self.__compress = compress
+        self.__block_size = block_size
+        self.__n_jobs = n_jobs
+        self.__buffer = bytearray()
+        self.__pending = deque()
+        self.__n_blocks = 0
+        self.__executor = ThreadPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+        self.closed = False
+
+    def write(self, data:bytes) -> int:
+        self.__buffer += data
+        while len(self.__buffer) >= self.__block_size:
+            self.__submit(bytes(self.__buffer[:self.__block_size]))
+            del self.__buffer[:self.__block_size]
+        return len(data)
+
+    def __submit(self, block:bytes) -> None:
+        self.__n_blocks += 1
+        if self.__executor is None:
+            self.raw.write(self.__compress(block))
+            return
+        self.__pending.append(self.__executor.submit(self.__compress, block))
+        while len(self.__pending) >= 2*self.__n_jobs:  # Bound memory held by in flight blocks
+            self.raw.write(self.__pending.popleft().result())
+
+    def close(self) -> None:
+        """Compresses the last partial block and waits for all blocks. The underlying file is left open."""
+        if self.closed:
+            return
+        try:
+            if self.__buffer or not self.__n_blocks:  # Empty input still gets one (empty) member
+                self.__submit(bytes(self.__buffer))
+                self.__buffer.clear()
+            while self.__pending:
+                self.raw.write(self.__pending.popleft().result())
+        finally:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+            self.closed = True
+
+    def __enter__(self) -> '_BlockWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def open_compressed(raw:IO[bytes], compression:str, n_jobs:int=1, level:Optional[int]=None,
+                    block_size:int=4 << 20) -> _BlockWriter:  # *
+    """Wraps a binary file-like so everything written to it is compressed in independent blocks.
+
+    Args:
+        raw (IO[bytes]): Destination, left open on close.
+        compression (str): "gzip", "bz2" or "zstd" (requires zstandard).
+        n_jobs (int, optional): Threads compressing blocks. Defaults to 1.
+        level (Optional[int], optional): Compression level. Defaults to None (gzip 6, bz2 9, zstd 3).
+        block_size (int, optional): Uncompressed bytes per block. Defaults to 4 MiB.
+
+    Raises:
+        ValueError: Unrecognized compression.
+        ImportError: zstd requested without zstandard installed.
+
+    Returns:
+        _BlockWriter: Binary file-like with write() and close().
+    """
+    compress = __block_compressor(compression, default_levels.get(compression) if level is None else level)
+    if block_size < 1:
+        raise ValueError('block_size must be at least 1')
+    return _BlockWriter(raw, compress, max(n_jobs, 1), block_size)
@@ -1,9 +1,221 @@
-from naclo.rdpickle import serialize_mol
-from stse.database import df_2_db
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
+import numpy as np
+import pandas as pd
+from pymongo import InsertOne, UpdateOne
 
-def rdkit_2_db(df, collection, mol_col='ROMol'):
-    # Convert to BSON for back-end storage
-    df2 = df.copy()
-    df2[mol_col] = df2[mol_col].apply(serialize_mol)
-    df_2_db(df2, collection)
+from naclo.MolArray import MolArray, MolDtype
+from naclo.rdpickle import deserialize_mol, pickle_properties, serialize_mol
+
+
+def __serialize_batch(batch:pd.DataFrame, mol_col:str) -> List[Dict[str, Any]]:
+    """Converts a batch of rows to BSON ready records with serialized Mols. Copies only the batch."""
+    if isinstance(batch[mol_col].dtype, MolDtype):  # Already serialized, no Mols are materialized
+        mols = batch[mol_col].array.blobs()
+    else:
+        mols = [serialize_mol(m) for m in batch[mol_col]]
+
+    records = batch.drop(columns=[mol_col]).to_dict('records')
+    columns = list(batch.columns)  # Keep original field order
+    return [{c: (mol if c == mol_col else record[c]) for c in columns} for record, mol in zip(records, mols)]
+
+def __same_value(a:Any, b:Any) -> bool:
+    """Field equality that treats two NaNs as equal."""
+    if isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b):
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):  # Not comparable as scalars
+        return False
+
+def __same_mol(a:Any, b:Any) -> bool:
+    """Serialized Mol equality across formats (pickle from serialize_mol or RDKit binary from naclo.MolArray): both
+    sides are only rebuilt as RDKit binary if their bytes differ."""
+    if __same_value(a, b):
+        return True
+    if not isinstance(a, (bytes, bytearray, memoryview)) or not isinstance(b, (bytes, bytearray, memoryview)):
+        return False
+    return deserialize_mol(a).ToBinary(pickle_properties) == deserialize_mol(b).ToBinary(pickle_properties)
+
+def __rdkit_binary(blob:Any) -> Any:
+    """RDKit binary (as held by naclo.MolArray) of a stored Mol. Documents hold pickles (serialize_mol) or RDKit binary
+    (written from a MolArray), pickles are rebuilt so one array never mixes formats."""
+    if isinstance(blob, (bytes, bytearray, memoryview)) and blob[:1] == b'\x80':  # Pickle protocol opcode
+        return deserialize_mol(blob).ToBinary(MolArray.pickle_properties)
+    return blob
+
+def __ensure_index(collection:Any, key_col:str) -> None:
+    """Creates an ascending index on key_col if the collection does not have one."""
+    if not any(list(index['key']) == [(key_col, 1)] for index in collection.index_information().values()):
+        collection.create_index([(key_col, 1)])
+
+def __upsert_batch(collection:Any, records:List[Dict[str, Any]], key_col:str, mol_col:str,
+                   ordered:bool) -> Dict[str, int]:
+    """Inserts new keys and $sets changed fields of existing keys in one bulk write. Runs on the writer thread so each
+    batch sees the result of the previous one. Earlier rows of a key repeated within the batch are counted as
+    duplicate, the last row wins. Rows with an NA key cannot be matched and are skipped (counted as no_key), NaN keys
+    would otherwise all collapse into one "duplicate" entry."""
+    keyed = [record for record in records if not pd.isna(record[key_col])]
+    unique = list({record[key_col]: record for record in keyed}.values())
+    existing = {doc[key_col]: doc for doc in collection.find({key_col: {'$in': [r[key_col] for r in unique]}},
+                                                              {'_id': 0})}
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': len(keyed) - len(unique),
+              'no_key': len(records) - len(keyed)}
+    ops = []
+    for record in unique:
+        old = existing.get(record[key_col])
+        if old is None:
+            ops.append(InsertOne(record))
+            counts['inserted'] += 1
+            continue
+
+        changed = {k: v for k, v in record.items()
+                   if k not in old or not (__same_mol if k == mol_col else __same_value)(old[k], v)}
+        if changed:
+            ops.append(UpdateOne({key_col: record[key_col]}, {'$set': changed}))
+            counts['updated'] += 1
+        else:
+            counts['unchanged'] += 1
+
+    if ops:
+        collection.bulk_write(ops, ordered=ordered)
+    return counts
+
+def rdkit_2_db(df:pd.DataFrame, collection:Any, mol_col:str='ROMol', batch_size:int=1000, ordered:bool=True,
+               progress:Optional[Callable[[int, int], None]]=None, upsert:bool=False,
+               key_col:str='InchiKey') -> Dict[str, int]:
+    """Writes a DataFrame holding a Mol column to a Mongo collection in fixed size batches. Serialization of the next
+    batch overlaps the write of the current one, only one batch of records is held in memory at a time.
+
+    Args:
+        df (pd.DataFrame): Data to write.
+        collection (Any): pymongo Collection or any object with a compatible interface.
+        mol_col (str, optional): Name of Mol column in df. Defaults to 'ROMol'.
+        batch_size (int, optional): Rows per write call. Defaults to 1000.
+        ordered (bool, optional): Passed to insert_many/bulk_write, False lets the server continue past failed
+            documents and write in any order. Defaults to True.
+        progress (Optional[Callable[[int, int], None]], optional): Called with (rows written, total rows) after
+            each batch. Defaults to None.
+        upsert (bool, optional): Match rows to stored documents by key_col. New keys are inserted, changed fields
+            of existing keys are updated and identical documents are skipped. Mols are compared by content, so
+            pickled and naclo.MolArray serialized Mols match. A key repeated within a batch is written once from its
+            last row, earlier rows are counted as duplicate (across batches the later row updates the document).
+            Rows with an NA key (e.g. structures Bleach flagged as failed) are not written and counted as no_key.
+            Creates the key_col index if missing. Defaults to False (insert every row).
+        key_col (str, optional): Upsert key column, e.g. the InChI key column from Bleach.handle_duplicates.
+            Defaults to 'InchiKey'.
+
+    Raises:
+        ValueError: batch_size < 1
+        ValueError: key_col not in df (upsert).
+
+    Returns:
+        Dict[str, int]: Number of rows inserted, updated, unchanged, duplicate and no_key (upsert only), summing to
+            the rows in df.
+    """
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1')
+    if upsert:
+        if key_col not in df.columns:
+            raise ValueError(f'Upsert key column: "{key_col}" is not found in data.')
+        __ensure_index(collection, key_col)
+
+    total = len(df)
+    written = 0
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0}
+    if upsert:
+        counts['no_key'] = 0
+
+    def wait(pending:Optional[Future], n:int) -> None:
+        nonlocal written
+        if pending is None:
+            return
+        result = pending.result()  # Re-raises write errors
+        if upsert:
+            for k, v in result.items():
+                counts[k] += v
+        else:
+            counts['inserted'] += n
+        written += n
+        if progress:
+            progress(written, total)
+
+    def write(records:List[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        if upsert:
+            return __upsert_batch(collection, records, key_col, mol_col, ordered)
+        collection.insert_many(records, ordered=ordered)
+
+    pending, pending_n = None, 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for start in range(0, total, batch_size):
+            records = __serialize_batch(df.iloc[start:start + batch_size], mol_col)
+            wait(pending, pending_n)
+            pending, pending_n = executor.submit(write, records), len(records)
+        wait(pending, pending_n)
+
+    return counts
+
+def iter_db_2_rdkit(collection:Any, mol_col:str='ROMol', columns:Optional[Iterable[str]]=None,
+                    inchi_keys:Optional[Iterable[str]]=None, inchi_key_col:str='InchiKey',
+                    query:Optional[Dict[str, Any]]=None, batch_size:int=1000,
+                    lazy:bool=True) -> Iterator[pd.DataFrame]:
+    """Streams documents written by rdkit_2_db back as DataFrame batches. Projection and InChI key filtering are
+    pushed down to the query so unneeded fields never leave the database.
+
+    Args:
+        collection (Any): pymongo Collection or any object with a compatible find().
+        mol_col (str, optional): Name of serialized Mol field. Defaults to 'ROMol'.
+        columns (Optional[Iterable[str]], optional): Fields to return. Mols are only fetched if mol_col is included.
+            Defaults to None (all fields).
+        inchi_keys (Optional[Iterable[str]], optional): Only return documents with these InChI keys. Defaults to
+            None.
+        inchi_key_col (str, optional): Name of InChI key field. Defaults to 'InchiKey'.
+        query (Optional[Dict[str, Any]], optional): Additional find() filter. Defaults to None.
+        batch_size (int, optional): Documents per yielded DataFrame (and per cursor round trip). Defaults to 1000.
+        lazy (bool, optional): Hold Mols in a naclo.MolArray so each Mol is only deserialized when accessed. Pickled
+            Mols are converted to the array's RDKit binary on read. Defaults to True.
+
+    Yields:
+        Iterator[pd.DataFrame]: Batches of documents.
+    """
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1')
+
+    filter = dict(query) if query else {}
+    if inchi_keys is not None:
+        filter[inchi_key_col] = {'$in': list(inchi_keys)}
+
+    projection = {'_id': 0}
+    if columns is not None:
+        columns = list(columns)
+        projection.update({col: 1 for col in columns})
+
+    cursor = iter(collection.find(filter, projection, batch_size=batch_size))
+    while True:
+        docs = list(islice(cursor, batch_size))
+        if not docs:
+            return
+
+        df = pd.DataFrame(docs, columns=columns)
+        if mol_col in df.columns:
+            if lazy:
+                df[mol_col] = pd.Series(MolArray.from_blobs(__rdkit_binary(b) for b in df[mol_col]), index=df.index)
+            else:
+                df[mol_col] = df[mol_col].map(deserialize_mol, na_action='ignore')
+        yield df
+
+def db_2_rdkit(collection:Any, mol_col:str='ROMol', columns:Optional[Iterable[str]]=None,
+               inchi_keys:Optional[Iterable[str]]=None, inchi_key_col:str='InchiKey',
+               query:Optional[Dict[str, Any]]=None, batch_size:int=1000, lazy:bool=True) -> pd.DataFrame:
+    """Reads documents written by rdkit_2_db into a single DataFrame. See iter_db_2_rdkit for arguments.
+
+    Returns:
+        pd.DataFrame: All matching documents.
+    """
+    batches = list(iter_db_2_rdkit(collection, mol_col=mol_col, columns=columns, inchi_keys=inchi_keys,
+                                   inchi_key_col=inchi_key_col, query=query, batch_size=batch_size, lazy=lazy))
+    if not batches:
+        return pd.DataFrame(columns=list(columns) if columns is not None else None)
+    return pd.concat(batches, ignore_index=True)
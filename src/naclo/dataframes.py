@@ -5,6 +5,7 @@ import pandas as pd
 from typing import Any, Callable, Optional, Union, IO
 import numpy as np
 
+from naclo import mol_conversion
 from naclo.Writer import Writer  # Nested import (not present in __init__)
 
 
@@ -63,10 +64,50 @@ def df_mols_2_inchi_keys(df:pd.DataFrame, mol_name:str, inchi_name:str, dropna:b
     return df.dropna(subset=[inchi_name]) if dropna else df
 
 def df_smiles_2_inchi_keys(df:pd.DataFrame, smiles_name:str, inchi_name:str, dropna:bool=True) -> pd.DataFrame:
-    df = df.copy()
-    df = df_smiles_2_mols(df, smiles_name, 'ROMol', dropna=dropna)
-    df = df_mols_2_inchi_keys(df, 'ROMol', inchi_name, dropna=dropna)
-    return df.drop(columns=['ROMol'])  # Remove added Mol column
+    """Adds InChi Key column to df using SMILES column as reference. Mols are built per row and discarded, no
+    intermediate Mol column is added to the frame.
+
+    Args:
+        df (pandas DataFrame): DataFrame to add InChi column to.
+        smiles_name (str): Name of SMILES column in df.
+        inchi_name (str): Name of InChi column in df.
+        dropna (bool, optional): Drop NA InChis (includes unparsable SMILES). Defaults to True.
+
+    Returns:
+        pandas DataFrame: DataFrame with InChi column appended.
+    """
+    smiles_2_inchi_key = lambda x: Chem.MolToInchiKey(Chem.MolFromSmiles(x))
+    df = df.assign(**{inchi_name: df[smiles_name].map(lambda x: __exception_2_nan(x, smiles_2_inchi_key),
+                                                       na_action='ignore')})
+    return df.dropna(subset=[inchi_name]) if dropna else df
+
+def df_mols_2_duplicate_keys(df:pd.DataFrame, mol_name:str, key_name:str, key_type:str='inchi_key',
+                             dropna:bool=True) -> pd.DataFrame:  # *
+    """Adds a duplicate key column to df using Mol column as reference.
+
+    Args:
+        df (pandas DataFrame): DataFrame to add key column to.
+        mol_name (str): Name of Mol column in df.
+        key_name (str): Name of key column.
+        key_type (str, optional): One of naclo.mol_conversion.duplicate_key_types. Defaults to 'inchi_key'.
+        dropna (bool, optional): Drop NA keys. Defaults to True.
+
+    Returns:
+        pandas DataFrame: DataFrame with key column appended.
+    """
+    key_function = mol_conversion.duplicate_key_function(key_type)
+    df = df.assign(**{key_name: df[mol_name].map(lambda x: __exception_2_nan(x, key_function), na_action='ignore')})
+    return df.dropna(subset=[key_name]) if dropna else df
+
+def df_smiles_2_duplicate_keys(df:pd.DataFrame, smiles_name:str, key_name:str, key_type:str='inchi_key',
+                               dropna:bool=True) -> pd.DataFrame:
+    """Adds a duplicate key column to df using SMILES column as reference, without keeping Mols. See
+    df_mols_2_duplicate_keys for arguments."""
+    key_function = mol_conversion.duplicate_key_function(key_type)
+    smiles_2_key = lambda x: key_function(Chem.MolFromSmiles(x))
+    df = df.assign(**{key_name: df[smiles_name].map(lambda x: __exception_2_nan(x, smiles_2_key),
+                                                    na_action='ignore')})
+    return df.dropna(subset=[key_name]) if dropna else df
 
 def write_sdf(df, out_path:Union[str, IO], mol_col_name:str, id_column_name:str='RowID') -> None:  # *
     """Writes dataframe to SDF file. Includes ID name if ID is valid.
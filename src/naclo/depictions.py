@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from io import BytesIO
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from rdkit import Chem
+from rdkit.Chem import Draw
+from rdkit.Chem.Draw import rdMolDraw2D
+
+from naclo import rdpickle
+
+
+key_types = ['smiles', 'inchi_key']
+
+
+class PngCache(MutableMapping):
+    def __init__(self, max_bytes:int=64*2**20) -> None:
+        """Key -> PNG mapping bounded by total PNG size. Least recently used entries are dropped past max_bytes.
+
+        Args:
+            max_bytes (int, optional): Size limit of stored PNGs. Defaults to 64 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.__pngs = OrderedDict()
+
+    def __getitem__(self, key:str) -> bytes:
+        png = self.__pngs[key]
+        self.__pngs.move_to_end(key)
+        return png
+
+    def __setitem__(self, key:str, png:bytes) -> None:
+        if key in self.__pngs:
+            self.nbytes -= len(self.__pngs[key])
+        self.__pngs[key] = png
+        self.__pngs.move_to_end(key)
+        self.nbytes += len(png)
+        while self.nbytes > self.max_bytes and self.__pngs:
+            _, dropped = self.__pngs.popitem(last=False)
+            self.nbytes -= len(dropped)
+
+    def __delitem__(self, key:str) -> None:
+        self.nbytes -= len(self.__pngs.pop(key))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__pngs)
+
+    def __len__(self) -> int:
+        return len(self.__pngs)
+
+
+# Process-wide cache, only used when passed explicitly (cache=naclo.depictions.image_cache) to reuse depictions
+# across exports
+image_cache = PngCache()
+
+
+def depiction_key(mol:Optional[Chem.rdchem.Mol], size:Tuple[int, int], key_type:str='smiles') -> str:  # *
+    """Cache key of a Mol's depiction: image size and canonical SMILES or InChI key. Empty structure for non-Mols.
+
+    Args:
+        mol (Optional[Chem.rdchem.Mol]): Structure.
+        size (Tuple[int, int]): Image size in pixels.
+        key_type (str, optional): "smiles" or "inchi_key". Defaults to "smiles".
+
+    Returns:
+        str: Key.
+    """
+    if not isinstance(mol, Chem.rdchem.Mol):
+        structure = ''
+    elif key_type == 'inchi_key':
+        structure = Chem.MolToInchiKey(mol)
+    else:
+        structure = Chem.MolToSmiles(mol)
+    return f'{size[0]}x{size[1]}:{key_type}:{structure}'
+
+def _render_png(mol:Optional[bytes], size:Tuple[int, int]) -> bytes:
+    """PNG of an RDKit binary Mol (empty image for None). Top level function so it can be sent to worker processes."""
+    mol = Chem.Mol(mol) if mol else Chem.Mol()
+    try:
+        drawer = rdMolDraw2D.MolDraw2DCairo(*size)
+        rdMolDraw2D.PrepareAndDrawMolecule(drawer, mol)
+        drawer.FinishDrawing()
+        return drawer.GetDrawingText()
+    except (RuntimeError, ValueError):  # Drawing code could not kekulize etc., fall back to PIL path
+        buf = BytesIO()
+        Draw.MolToImage(mol, size=size).save(buf, format='PNG')
+        return buf.getvalue()
+
+def render_pngs(mols:Iterable[Optional[Chem.rdchem.Mol]], size:Tuple[int, int]=(200, 200), n_jobs:int=1,
+                cache:Optional[MutableMapping]=None, key_type:str='smiles',
+                executor:Optional[Executor]=None,
+                blobs:Optional[Sequence[Optional[bytes]]]=None) -> List[bytes]:  # *
+    """PNG depictions of Mols. Each distinct structure is drawn once, structures found in cache are not redrawn.
+
+    Args:
+        mols (Iterable[Optional[Chem.rdchem.Mol]]): Structures, anything that is not a Mol gets an empty image.
+        size (Tuple[int, int], optional): Image size in pixels. Defaults to (200, 200).
+        n_jobs (int, optional): Worker processes drawing uncached structures, a pool is started for this call unless
+            executor is given. Defaults to 1.
+        cache (Optional[MutableMapping], optional): Key -> PNG store, any mapping works (e.g. a PngCache, the shared
+            naclo.depictions.image_cache or a shelve for reuse across sessions). Defaults to None (no caching beyond
+            this call).
+        key_type (str, optional): Identify structures by "smiles" (canonical) or "inchi_key". Defaults to "smiles".
+        executor (Optional[Executor], optional): Pool drawing uncached structures, left open. Reuse one pool for
+            many calls. Defaults to None.
+        blobs (Optional[Sequence[Optional[bytes]]], optional): RDKit binary of each Mol with all properties (e.g.
+            already serialized for another output format), sent to the drawing code instead of serializing the Mols
+            again. Defaults to None.
+
+    Returns:
+        List[bytes]: One PNG per Mol. Duplicates share the same bytes object.
+    """
+    if key_type not in key_types:
+        raise ValueError(f'key_type = "{key_type}" is not recognized, use one of {key_types}')
+    cache = {} if cache is None else cache
+
+    mols = list(mols)
+    keys = [depiction_key(m, size, key_type) for m in mols]
+    missing = {}  # Key -> position of first Mol with that key
+    for i, key in enumerate(keys):
+        if key not in missing and key not in cache:
+            missing[key] = i
+
+    # 2D coordinates and other computed props are kept so cached depictions match direct drawing
+    if blobs is None:
+        blobs = rdpickle.mol_blobs([mols[i] for i in missing.values()], Chem.PropertyPickleOptions.AllProps)
+    else:
+        blobs = [blobs[i] if isinstance(mols[i], Chem.rdchem.Mol) else None for i in missing.values()]
+    if (executor is not None or n_jobs > 1) and len(blobs) > 1:
+        with ExitStack() as stack:
+            if executor is None:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=n_jobs))
+            pngs = list(executor.map(_render_png, blobs, [size]*len(blobs),
+                                     chunksize=max(1, len(blobs) // (4*max(n_jobs, 1)))))
+    else:
+        pngs = [_render_png(b, size) for b in blobs]
+
+    pngs = dict(zip(missing, pngs))
+    pngs.update({key: cache[key] for key in set(keys) if key not in pngs})  # Read hits before any eviction
+    for key in missing:
+        cache[key] = pngs[key]
+    return [pngs[key] for key in keys]
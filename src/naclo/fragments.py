@@ -1,10 +1,12 @@
+from functools import lru_cache
+from typing import FrozenSet
 from rdkit import Chem
 from rdkit.Chem.Descriptors import ExactMolWt
 from rdkit.Chem.SaltRemover import SaltRemover
 import numpy as np
 
 from naclo import mol_stats
-from naclo.__asset_loader import recognized_salts
+from naclo import __asset_loader as asset_loader
 
 
 def mw(smile):  # *
@@ -67,6 +69,11 @@ def carbon_count(smile:str) -> str:  # *
     
     return fragments[max_index]
 
+@lru_cache(maxsize=1)
+def recognized_salt_set() -> FrozenSet[str]:
+    """SMILES in assets/recognized_salts.json as a set, built once per process."""
+    return frozenset(asset_loader.recognized_salts['smiles'])
+
 def remove_recognized_salts(smile:str) -> str:
     """Removes smiles fragments that are found in assets/recognized_salts.json. Salts sourced from:
     https://github.com/chembl/ChEMBL_Structure_Pipeline/blob/master/chembl_structure_pipeline/data/salts.smi
@@ -78,7 +85,8 @@ def remove_recognized_salts(smile:str) -> str:
         str: SMILES with salts removed. Could be empty string if all fragments are recognized salts.
     """
     fragments = smile.split('.')
-    fragments = [f for f in fragments if f not in recognized_salts['smiles']]
+    salts = recognized_salt_set()
+    fragments = [f for f in fragments if f not in salts]
     return '.'.join(fragments)
 
 def remove_salts(mols, salts='[Cl,Br]'):  # *
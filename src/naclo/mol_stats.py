@@ -1,6 +1,26 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem import Crippen, rdMolDescriptors
 from rdkit.Chem.Descriptors import ExactMolWt
 
 
+# Descriptor name --> function of a single Mol. Element counts are handled separately (single atom traversal).
+descriptor_functions:Dict[str, Callable[[Chem.rdchem.Mol], float]] = {
+    'mw': ExactMolWt,
+    'heavy_atoms': lambda mol: mol.GetNumHeavyAtoms(),
+    'rotatable_bonds': rdMolDescriptors.CalcNumRotatableBonds,
+    'tpsa': rdMolDescriptors.CalcTPSA,
+    'logp': Crippen.MolLogP,
+    'hbd': rdMolDescriptors.CalcNumHBD,
+    'hba': rdMolDescriptors.CalcNumHBA
+}
+
+
 def mol_weights(mols):  # *
     """Finds molecular weights from list of Mols.
 
@@ -22,3 +42,61 @@ def carbon_num(smile):  # *
         int: Number of carbons in SMILES.
     """
     return smile.lower().count('c')
+
+def __descriptor_columns(descriptors:Sequence[str], elements:Sequence[str]) -> List[str]:
+    return list(descriptors) + [f'num_{element}' for element in elements]
+
+def __descriptor_chunk(mols:List[Chem.rdchem.Mol], descriptors:Sequence[str], elements:Sequence[str]) -> np.ndarray:
+    """Computes descriptors for a chunk of Mols. One row per Mol, NaN row for anything that is not a Mol."""
+    funcs = [descriptor_functions[d] for d in descriptors]
+    out = np.full((len(mols), len(funcs) + len(elements)), np.nan)
+
+    for i, mol in enumerate(mols):
+        if not isinstance(mol, Chem.rdchem.Mol):
+            continue
+        for j, func in enumerate(funcs):
+            out[i, j] = func(mol)
+        if elements:  # Single pass over atoms (includes implicit Hs only when asked for 'H')
+            counts = Counter(atom.GetSymbol() for atom in mol.GetAtoms())
+            if 'H' in elements:
+                counts['H'] += sum(atom.GetTotalNumHs() for atom in mol.GetAtoms())
+            out[i, len(funcs):] = [counts.get(element, 0) for element in elements]
+    return out
+
+def mol_descriptors(mols:Iterable[Chem.rdchem.Mol], descriptors:Sequence[str]=tuple(descriptor_functions),
+                    elements:Optional[Sequence[str]]=None, n_jobs:int=1, chunksize:int=1000) -> pd.DataFrame:  # *
+    """Computes a set of descriptors for each Mol in a single traversal per Mol.
+
+    Args:
+        mols (Iterable[Chem.rdchem.Mol]): Contains RDKit Mols. Non-Mol entries (e.g. NaN) yield NaN rows.
+        descriptors (Sequence[str], optional): Keys of naclo.mol_stats.descriptor_functions. Defaults to all.
+        elements (Optional[Sequence[str]], optional): Element symbols to count, output as 'num_<symbol>' columns.
+            Defaults to None.
+        n_jobs (int, optional): Number of worker processes. Defaults to 1 (no pool).
+        chunksize (int, optional): Number of Mols sent to a worker at once. Defaults to 1000.
+
+    Raises:
+        ValueError: Unrecognized descriptor.
+
+    Returns:
+        pd.DataFrame: One column per descriptor, one row per Mol (RangeIndex).
+    """
+    descriptors = list(descriptors)
+    elements = list(elements) if elements else []
+    unrecognized = [d for d in descriptors if d not in descriptor_functions]
+    if unrecognized:
+        raise ValueError(f'Unrecognized descriptors: {unrecognized}, set to any of: {list(descriptor_functions)}')
+
+    mols = list(mols)
+    columns = __descriptor_columns(descriptors, elements)
+    chunks = [mols[i:i + chunksize] for i in range(0, len(mols), chunksize)]
+
+    if n_jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            n = len(chunks)
+            arrays = list(executor.map(__descriptor_chunk, chunks, [descriptors]*n, [elements]*n))
+    else:
+        arrays = [__descriptor_chunk(chunk, descriptors, elements) for chunk in chunks]
+
+    values = np.concatenate(arrays) if arrays else np.empty((0, len(columns)))
+    return pd.DataFrame(values, columns=columns)
@@ -2,6 +2,10 @@ from rdkit import Chem
 from rdkit.Chem import AllChem
 
 
+# Compiled reactions per reactants_products, SMARTS are only parsed once per process
+__reactions_cache = {}
+
+
 def init_neutralization_rxns(reactants_products={'[$([O-]);!$([O-][#7])]': 'O'}):
     """Builds reactions from dict of reactants and products.
 
@@ -19,6 +23,32 @@ def init_neutralization_rxns(reactants_products={'[$([O-]);!$([O-][#7])]': 'O'})
         
     return reactions
 
+def cached_neutralization_rxns(reactants_products={'[$([O-]);!$([O-][#7])]': 'O'}):
+    """init_neutralization_rxns, compiled once per distinct reactants_products. Returned reactions must not be
+    modified."""
+    key = tuple(reactants_products.items())
+    if key not in __reactions_cache:
+        __reactions_cache[key] = init_neutralization_rxns(reactants_products=reactants_products)
+    return __reactions_cache[key]
+
+def neutralize_mol(mol, reactions):
+    """Neutralizes one Mol with reactions from init_neutralization_rxns or cached_neutralization_rxns.
+
+    Args:
+        mol (rdkit.Chem.rdchem.Mol): Mol to neutralize.
+        reactions (dict): Reactant (keys) and product (values) Mols.
+
+    Returns:
+        rdkit.Chem.rdchem.Mol: Neutralized Mol (the input Mol if nothing matched).
+    """
+    # Iterate over neutralization reactions
+    for (reactant, product) in reactions.items():
+        # Loop until all instances have been found
+        while mol.HasSubstructMatch(reactant):
+            mol = AllChem.ReplaceSubstructs(mol, reactant, product)[0]
+            mol.UpdatePropertyCache()
+    return mol
+
 def neutralize_charges(mols, reactants_products={'[$([O-]);!$([O-][#7])]': 'O'}):
     """Neutralizes Mol charges by replacing reactants with products.
 
@@ -30,17 +60,5 @@ def neutralize_charges(mols, reactants_products={'[$([O-]);!$([O-][#7])]': 'O'})
     Returns:
         list: Neutralized RDKit Mols.
     """
-    reactions = init_neutralization_rxns(reactants_products=reactants_products)
-    
-    neutralized_mols = []
-    for mol in mols:
-        # Iterate over neutralization reactions
-        for (reactant, product) in zip(reactions.keys(), reactions.values()):
-            # Loop until all instances have been found
-            while mol.HasSubstructMatch(reactant):
-                mol = AllChem.ReplaceSubstructs(mol, reactant, product)[0]
-                mol.UpdatePropertyCache()     
-        
-        neutralized_mols.append(mol)
-        
-    return neutralized_mols
+    reactions = cached_neutralization_rxns(reactants_products=reactants_products)
+    return [neutralize_mol(mol, reactions) for mol in mols]
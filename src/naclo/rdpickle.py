@@ -1,8 +1,99 @@
 import pickle
+import struct
+import zlib
+from typing import TYPE_CHECKING, Iterable, List, Optional, Union
+
+import numpy as np
+from rdkit import Chem
+
+if TYPE_CHECKING:  # Runtime import is circular, see serialize_mols
+    from naclo.MolArray import MolArray
+
+
+# Batch format: header | int64 offsets (count + 1) | payload of concatenated RDKit binary Mols (optionally zlib)
+__MAGIC = b'NACLOMOL'
+__HEADER = struct.Struct('<8sBBQ')  # magic, version, compressed, count
+__VERSION = 1
+
+# User set Mol, atom and bond properties (computed and private properties are rebuilt on load)
+pickle_properties = (Chem.PropertyPickleOptions.MolProps | Chem.PropertyPickleOptions.AtomProps |
+                     Chem.PropertyPickleOptions.BondProps)
 
 
 def deserialize_mol(pickled_mol):
-    return pickle.loads(pickled_mol)
+    """Loads a Mol from pickle bytes or from RDKit binary (e.g. naclo.MolArray blobs)."""
+    if pickled_mol[:1] == b'\x80':  # Pickle protocol opcode
+        return pickle.loads(pickled_mol)
+    return Chem.Mol(bytes(pickled_mol))
 
 def serialize_mol(mol):
     return pickle.dumps(mol)
+
+def mol_blobs(mols:Iterable[Optional[Chem.rdchem.Mol]], properties:int=pickle_properties) -> List[Optional[bytes]]:
+    """RDKit binary of each Mol, None for anything that is not a Mol. Writers serialize through here once per Mol and
+    share the blobs between output formats."""
+    return [m.ToBinary(properties) if isinstance(m, Chem.rdchem.Mol) else None for m in mols]
+
+def serialize_mols(mols:Iterable[Optional[Chem.rdchem.Mol]], compress:bool=False,
+                   properties:int=pickle_properties) -> bytes:  # *
+    """Packs many Mols into a single buffer of RDKit binary Mols with an offset table.
+
+    Args:
+        mols (Iterable[Optional[Chem.rdchem.Mol]]): Contains RDKit Mols. Anything that is not a Mol is stored as NA.
+        compress (bool, optional): zlib compress the payload. Defaults to False.
+        properties (int, optional): Chem.PropertyPickleOptions flags of properties to keep. Defaults to Mol,
+            atom and bond properties.
+
+    Returns:
+        bytes: Serialized batch.
+    """
+    from naclo.MolArray import MolArray  # Import within function to avoid circular import
+
+    arr = MolArray.from_blobs(mol_blobs(mols, properties))
+    payload = arr._buffer.tobytes()
+    if compress:
+        payload = zlib.compress(payload)
+
+    header = __HEADER.pack(__MAGIC, __VERSION, int(compress), len(arr))
+    return b''.join([header, arr._offsets.astype('<i8').tobytes(), payload])
+
+def deserialize_mols(buffer:bytes, lazy:bool=False) -> Union[List[Optional[Chem.rdchem.Mol]], 'MolArray']:  # *
+    """Unpacks a buffer built by serialize_mols.
+
+    Args:
+        buffer (bytes): Serialized batch.
+        lazy (bool, optional): Return a naclo.MolArray that only builds a Mol when an entry is accessed. Defaults to
+            False.
+
+    Raises:
+        ValueError: Buffer was not built by serialize_mols or is truncated.
+
+    Returns:
+        Union[List[Optional[Chem.rdchem.Mol]], MolArray]: Mols, None for NA entries (NaN if lazy).
+    """
+    from naclo.MolArray import MolArray  # Import within function to avoid circular import
+
+    if len(buffer) < __HEADER.size:
+        raise ValueError('Buffer is not a naclo serialized Mol batch')
+    magic, version, compressed, count = __HEADER.unpack_from(buffer)
+    if magic != __MAGIC or version != __VERSION:
+        raise ValueError('Buffer is not a naclo serialized Mol batch')
+
+    start = __HEADER.size
+    stop = start + 8*(count + 1)
+    if len(buffer) < stop:
+        raise ValueError(f'Truncated Mol batch: offset table of {count} Mols does not fit in {len(buffer)} bytes')
+    offsets = np.frombuffer(buffer, dtype='<i8', count=count + 1, offset=start).astype(np.int64)
+    payload = memoryview(buffer)[stop:]
+    if compressed:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error:
+            raise ValueError('Truncated Mol batch: payload could not be decompressed')
+    if offsets[0] != 0 or np.any(np.diff(offsets) < 0) or offsets[-1] != len(payload):
+        raise ValueError('Truncated Mol batch: offset table does not match the payload')
+    arr = MolArray(payload, offsets)
+
+    if lazy:
+        return arr
+    return [Chem.Mol(arr.blob(i)) if not na else None for i, na in enumerate(arr.isna())]
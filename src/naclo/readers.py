@@ -0,0 +1,289 @@
+from itertools import islice
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from rdkit import Chem
+
+from naclo.MolArray import MolArray
+
+
+def read_columnar(source:Union[str, IO[bytes]], mol_col_name:str='ROMol', columns:Optional[List[str]]=None,
+                  lazy:bool=True) -> pd.DataFrame:  # *
+    """Reads Parquet or Feather written by naclo.Writer. The binary Mol column is wrapped without parsing any
+    structures, so reading is I/O bound.
+
+    Args:
+        source (Union[str, IO[bytes]]): Path or binary buffer. Format is detected from the file's magic bytes.
+        mol_col_name (str, optional): Name of binary Mol column. Defaults to 'ROMol'.
+        columns (Optional[List[str]], optional): Only read these columns. Defaults to None (all).
+        lazy (bool, optional): Keep Mols in a naclo.MolArray, each Mol is built on access. Else build all Mols
+            into an object column. Defaults to True.
+
+    Raises:
+        ImportError: pyarrow is not installed.
+        ValueError: Source is neither Parquet nor Feather.
+
+    Returns:
+        pd.DataFrame: Data with Mol column restored.
+    """
+    try:
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('Reading Parquet/Feather requires pyarrow: pip install pyarrow')
+
+    handle = open(source, 'rb') if isinstance(source, str) else source
+    try:
+        handle.seek(0)
+        magic = handle.read(6)
+        handle.seek(0)
+        if magic[:4] == b'PAR1':
+            table = pyarrow.parquet.read_table(handle, columns=columns)
+        elif magic == b'ARROW1':
+            table = pyarrow.feather.read_table(handle, columns=columns)
+        else:
+            raise ValueError('Source is not a Parquet or Feather file')
+    finally:
+        if isinstance(source, str):
+            handle.close()
+
+    if mol_col_name not in table.column_names:
+        return table.to_pandas()
+
+    position = table.column_names.index(mol_col_name)
+    mols = MolArray.from_arrow(table.column(mol_col_name))
+    df = table.drop([mol_col_name]).to_pandas()
+    df.insert(position, mol_col_name, pd.Series(mols, index=df.index) if lazy else list(mols))
+    return df
+
+
+def __ordered(supplier:Any) -> Iterator[Optional[Chem.rdchem.Mol]]:
+    """Yields a multithreaded supplier's Mols in file order. Threads finish records out of order, so each Mol is keyed
+    by its record id and held until all earlier records are out, anything still held at the end is flushed in id
+    order. Items without text are not records (the supplier reads past the end of the file) and only advance the
+    order. A record returned twice keeps its first result."""
+    skip = object()
+    pending, next_id = {}, 1
+    for mol in supplier:
+        record_id = supplier.GetLastRecordId()
+        if record_id < next_id or record_id in pending:
+            continue
+        pending[record_id] = mol if supplier.GetLastItemText().strip() else skip
+        while next_id in pending:
+            mol = pending.pop(next_id)
+            next_id += 1
+            if mol is not skip:
+                yield mol
+    for record_id in sorted(pending):
+        if pending[record_id] is not skip:
+            yield pending[record_id]
+
+def __chunks(rows:Iterator[Dict[str, Any]], chunksize:int, columns:Optional[List[str]]) -> Iterator[pd.DataFrame]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunksize))
+        if not chunk:
+            return
+        yield pd.DataFrame(chunk, columns=columns)
+
+def __sd_record(lines:List[str]) -> Tuple[str, str, Dict[str, str]]:
+    """Title, mol block and SD properties of one record's lines, property values as RDKit reads them (lines up to
+    the next blank line, joined by newlines)."""
+    if not lines:
+        return '', '', {}
+    end = next((i for i, line in enumerate(lines) if line.startswith('M  END')), len(lines) - 1)
+    properties, name, values = {}, None, []
+    for line in lines[end + 1:] + ['']:
+        if name is None:
+            if line.startswith('>') and '<' in line:
+                header = line[line.index('<') + 1:]
+                name, values = header.split('>', 1)[0], []
+        elif line.strip():
+            values.append(line)
+        else:
+            properties[name], name = '\n'.join(values), None
+    return lines[0], '\n'.join(lines[:end + 1]) + '\n', properties
+
+def __sd_records(path:str) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+    """Splits an SDF into records without parsing structures. Yields (title, mol block, SD properties) per record, a
+    blank record has an empty mol block."""
+    with open(path) as f:
+        lines = []
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line == '$$$$':
+                yield __sd_record(lines)
+                lines = []
+            else:
+                lines.append(line)
+        if any(line.strip() for line in lines):  # Last record without a terminator
+            yield __sd_record(lines)
+
+def __sd_property_names(path:str) -> List[str]:
+    """Names of all SD properties in a file in first seen order, from a text scan (no structures are parsed)."""
+    names = {}
+    for _, _, properties in __sd_records(path):
+        names.update(dict.fromkeys(properties))
+    return list(names)
+
+def iter_sdf(path:str, properties:Optional[List[str]]=None, mol_col_name:str='ROMol', id_col_name:Optional[str]='ID',
+             chunksize:int=10000, n_jobs:int=1, sanitize:bool=True, remove_hs:bool=True,
+             lazy:bool=False) -> Iterator[pd.DataFrame]:
+    """Reads an SDF in DataFrame chunks, with RDKit's multithreaded supplier if n_jobs > 1. Rows are in file order
+    for any n_jobs. Output plugs into naclo.Bleach with structure_col=mol_col_name and structure_type="mol".
+    Blank records (a "$$$$" line right after another) are skipped by the multithreaded supplier but not by the
+    serial one. Every chunk has the same columns.
+
+    Args:
+        path (str): SDF path.
+        properties (Optional[List[str]], optional): SD properties to keep as columns. Defaults to None (all SD
+            properties in the file, found by a text scan of the whole file before parsing).
+        mol_col_name (str, optional): Name of Mol column. Defaults to 'ROMol'.
+        id_col_name (Optional[str], optional): Column for record titles, None to skip. Defaults to 'ID'.
+        chunksize (int, optional): Rows per chunk. Defaults to 10000.
+        n_jobs (int, optional): Parser threads. Defaults to 1.
+        sanitize (bool, optional): Sanitize Mols. Defaults to True.
+        remove_hs (bool, optional): Remove explicit Hs. Defaults to True.
+        lazy (bool, optional): Do not parse structures, the Mol column holds each record's mol block text (build
+            Mols with Chem.MolFromMolBlock where they are needed, e.g. in worker processes). Titles and SD
+            properties are read from the text, records that would fail to parse are not detected. n_jobs, sanitize
+            and remove_hs are ignored. Defaults to False.
+
+    Yields:
+        Iterator[pd.DataFrame]: Chunks with the title, SD property (as text) and Mol columns. Records that fail to parse
+            are NA rows.
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1')
+    if properties is None:
+        properties = __sd_property_names(path)
+    columns = ([id_col_name] if id_col_name else []) + properties + [mol_col_name]
+
+    if lazy:
+        def rows() -> Iterator[Dict[str, Any]]:
+            for title, block, values in __sd_records(path):
+                if not block:  # Blank record, NA as the serial supplier returns
+                    yield {mol_col_name: np.nan}
+                    continue
+                row = {id_col_name: title} if id_col_name else {}
+                row.update({p: values[p] for p in properties if p in values})
+                row[mol_col_name] = block
+                yield row
+        yield from __chunks(rows(), chunksize, columns)
+        return
+
+    if n_jobs > 1:
+        supplier = Chem.MultithreadedSDMolSupplier(path, sanitize=sanitize, removeHs=remove_hs,
+                                                   numWriterThreads=n_jobs)
+        mols = __ordered(supplier)
+    else:
+        mols = Chem.SDMolSupplier(path, sanitize=sanitize, removeHs=remove_hs)
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        for mol in mols:
+            row = {}
+            if mol is not None:
+                if id_col_name:
+                    row[id_col_name] = mol.GetProp('_Name') if mol.HasProp('_Name') else np.nan
+                row.update({p: mol.GetProp(p) for p in properties if mol.HasProp(p)})
+                for p in list(mol.GetPropNames()):  # Properties live in the frame, not on the Mol
+                    mol.ClearProp(p)
+            row[mol_col_name] = mol if mol is not None else np.nan
+            yield row
+
+    yield from __chunks(rows(), chunksize, columns)
+
+def read_sdf(path:str, properties:Optional[List[str]]=None, mol_col_name:str='ROMol', id_col_name:Optional[str]='ID',
+             n_jobs:int=1, sanitize:bool=True, remove_hs:bool=True, lazy:bool=False) -> pd.DataFrame:  # *
+    """Reads a whole SDF into a DataFrame. See iter_sdf for arguments.
+
+    Returns:
+        pd.DataFrame: Title, SD property and Mol (or mol block if lazy) columns.
+    """
+    chunks = list(iter_sdf(path, properties=properties, mol_col_name=mol_col_name, id_col_name=id_col_name,
+                           n_jobs=n_jobs, sanitize=sanitize, remove_hs=remove_hs, lazy=lazy))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0] if chunks else pd.DataFrame()
+
+def __smiles_header(path:str, delimiter:Optional[str]) -> Tuple[str, List[str]]:
+    """Resolves the delimiter (from the extension if None) and reads the title line."""
+    if delimiter is None:
+        delimiter = {'csv': ',', 'tsv': '\t'}.get(path.rsplit('.', 1)[-1].lower(), ' \t')
+    with open(path) as f:
+        title = f.readline().rstrip('\r\n')
+    header = title.split() if delimiter == ' \t' else title.split(delimiter)
+    return delimiter, header
+
+def iter_smiles(path:str, smiles_col:str='SMILES', columns:Optional[List[str]]=None, delimiter:Optional[str]=None,
+                mol_col_name:str='ROMol', chunksize:int=10000, n_jobs:int=1, sanitize:bool=True,
+                lazy:bool=False) -> Iterator[pd.DataFrame]:
+    """Reads a delimited SMILES file with a title line (.smi, .csv, .tsv) in DataFrame chunks. Parsed with RDKit's
+    multithreaded supplier if n_jobs > 1, rows are in file order for any n_jobs.
+
+    Args:
+        path (str): File path.
+        smiles_col (str, optional): Title of SMILES column. Defaults to 'SMILES'.
+        columns (Optional[List[str]], optional): Other columns to keep. Defaults to None (all).
+        delimiter (Optional[str], optional): Column delimiter. Defaults to None ("," for .csv, tab for .tsv,
+            whitespace otherwise).
+        mol_col_name (str, optional): Name of Mol column. Defaults to 'ROMol'.
+        chunksize (int, optional): Rows per chunk. Defaults to 10000.
+        n_jobs (int, optional): Parser threads. Defaults to 1.
+        sanitize (bool, optional): Sanitize Mols. Defaults to True.
+        lazy (bool, optional): Do not parse structures, read the SMILES text with pandas instead (also handles
+            quoted CSV). Use with naclo.Bleach structure_type="smiles", which builds Mols itself. Else Mols are
+            parsed and the SMILES column is replaced by the Mol column, for structure_type="mol". Defaults to False.
+
+    Raises:
+        ValueError: smiles_col or a requested column is not in the title line.
+
+    Yields:
+        Iterator[pd.DataFrame]: Chunks. When parsing, rows that fail to parse are NA rows.
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1')
+    delimiter, header = __smiles_header(path, delimiter)
+    for col in [smiles_col] + (columns or []):
+        if col not in header:
+            raise ValueError(f'Column: "{col}" is not found in the title line of {path}')
+    keep = [c for c in header if c != smiles_col and (columns is None or c in columns)]
+
+    if lazy:
+        sep = r'\s+' if delimiter == ' \t' else delimiter
+        for chunk in pd.read_csv(path, sep=sep, usecols=[smiles_col] + keep, chunksize=chunksize):
+            yield chunk[[c for c in header if c == smiles_col or c in keep]]
+        return
+
+    smiles_index = header.index(smiles_col)
+    if n_jobs > 1:
+        supplier = Chem.MultithreadedSmilesMolSupplier(path, delimiter=delimiter, smilesColumn=smiles_index,
+                                                       nameColumn=-1, titleLine=True, sanitize=sanitize,
+                                                       numWriterThreads=n_jobs)
+        mols = __ordered(supplier)
+    else:
+        mols = Chem.SmilesMolSupplier(path, delimiter=delimiter, smilesColumn=smiles_index, nameColumn=-1,
+                                      titleLine=True, sanitize=sanitize)
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        for mol in mols:
+            if mol is None:
+                yield {mol_col_name: np.nan}
+                continue
+            values = mol.GetPropsAsDict()  # Typed column values
+            for p in list(mol.GetPropNames()):
+                mol.ClearProp(p)
+            yield {**{c: values.get(c, np.nan) for c in keep}, mol_col_name: mol}
+
+    columns = [c for c in header if c in keep or c == smiles_col]
+    columns[columns.index(smiles_col)] = mol_col_name  # Mol column takes the place of the SMILES column
+    yield from __chunks(rows(), chunksize, columns)
+
+def read_smiles(path:str, smiles_col:str='SMILES', columns:Optional[List[str]]=None, delimiter:Optional[str]=None,
+                mol_col_name:str='ROMol', n_jobs:int=1, sanitize:bool=True, lazy:bool=False) -> pd.DataFrame:  # *
+    """Reads a whole SMILES file into a DataFrame. See iter_smiles for arguments.
+
+    Returns:
+        pd.DataFrame: Mol (or SMILES if lazy) and other columns.
+    """
+    chunks = list(iter_smiles(path, smiles_col=smiles_col, columns=columns, delimiter=delimiter,
+                              mol_col_name=mol_col_name, n_jobs=n_jobs, sanitize=sanitize, lazy=lazy))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0] if chunks else pd.DataFrame()
@@ -0,0 +1,250 @@
+import asyncio
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from naclo import clean
+from naclo import fragments
+from naclo import neutralize
+
+
+# One structure's result as sent to clients
+result_fields = ('smiles', 'inchi_key', 'mw', 'dropped')
+
+
+def _warm_worker() -> None:
+    """Pool initializer: loads salts and compiles neutralization reactions once per worker, not per request."""
+    fragments.recognized_salt_set()
+    neutralize.cached_neutralization_rxns()
+
+def _clean_batch(structures:List[str], options:Optional[dict]) -> List[Tuple]:
+    """Cleans a micro-batch in a worker. Top level function so it can be sent to worker processes. Mols are not
+    returned, only picklable fields."""
+    results = []
+    for structure in structures:
+        cleaned = clean.clean_structure(structure, options)
+        results.append(tuple(getattr(cleaned, field) for field in result_fields))
+    return results
+
+
+class CleaningServer:
+    def __init__(self, options:Optional[dict]=None, max_batch_size:int=256, max_delay:float=0.005, n_jobs:int=1,
+                 executor:Optional[Executor]=None) -> None:
+        """Local cleaning service. Structures from all requests are gathered into micro-batches, a batch is sent once
+        it holds max_batch_size structures or max_delay seconds after its first structure arrived. Batches run
+        through naclo.clean.clean_structure in a pool of warm workers.
+
+        Protocol: newline delimited JSON over TCP. Each request line is {"id": any, "structures": [SMILES, ...]},
+        each response line is {"id": any, "results": [{"smiles", "inchi_key", "mw", "dropped"}, ...]} or
+        {"id": any, "error": str}. Responses on a connection are written as requests finish, match them by id. If a
+        batch fails, its requests are retried one by one so only the failing request gets an error.
+
+        Args:
+            options (Optional[dict], optional): Bleach options, see naclo.clean.clean_structure. Defaults to None
+                (Bleach defaults).
+            max_batch_size (int, optional): Structures per batch. Larger favors throughput. Defaults to 256.
+            max_delay (float, optional): Seconds a structure waits for a batch to fill. Smaller favors latency.
+                Defaults to 0.005.
+            n_jobs (int, optional): Worker processes, also the number of batches in flight. Defaults to 1.
+            executor (Optional[Executor], optional): Pool to use instead of starting one, left open by close.
+                Defaults to None.
+        """
+        if max_batch_size < 1:
+            raise ValueError(f'max_batch_size = {max_batch_size} must be at least 1')
+        if max_delay < 0:
+            raise ValueError(f'max_delay = {max_delay} must not be negative')
+
+        self.options = options
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.n_jobs = max(n_jobs, 1)
+        self.stats = {'requests': 0, 'structures': 0, 'batches': 0}
+
+        self.__executor = executor
+        self.__own_executor = executor is None
+        self.__queue = None
+        self.__batcher = None
+        self.__server = None
+        self.__batch = []  # Items taken from the queue but not yet sent
+        self.__running = set()  # Batch tasks in flight
+
+    async def __ensure_started(self) -> None:
+        if self.__batcher is not None:
+            return
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_warm_worker)
+        self.__queue = asyncio.Queue()
+        self.__batcher = asyncio.create_task(self.__batch_loop())
+
+    async def clean(self, structures:List[str]) -> List[dict]:
+        """Cleans structures through the micro-batcher. Can be awaited by many tasks at once.
+
+        Args:
+            structures (List[str]): SMILES.
+
+        Raises:
+            RuntimeError: The server was closed before the structures were batched.
+
+        Returns:
+            List[dict]: One result per structure, keys are naclo.server.result_fields.
+        """
+        await self.__ensure_started()
+        loop = asyncio.get_running_loop()
+        self.stats['requests'] += 1
+        self.stats['structures'] += len(structures)
+
+        request = self.stats['requests']
+        futures = [loop.create_future() for _ in structures]
+        for structure, future in zip(structures, futures):
+            self.__queue.put_nowait((structure, future, request))
+        return [dict(zip(result_fields, result)) for result in await asyncio.gather(*futures)]
+
+    async def __next_batch(self) -> List[Tuple[str, asyncio.Future, int]]:
+        """Waits for a structure, then collects more until the batch is full or max_delay has passed."""
+        loop = asyncio.get_running_loop()
+        self.__batch = batch = [await self.__queue.get()]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            if not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:  # Wakes as soon as a structure arrives, so a full batch leaves early
+                batch.append(await asyncio.wait_for(self.__queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def __batch_loop(self) -> None:
+        in_flight = asyncio.Semaphore(self.n_jobs)  # While workers are busy the next batch keeps filling
+        while True:
+            batch = await self.__next_batch()
+            await in_flight.acquire()
+            self.stats['batches'] += 1
+            task = asyncio.create_task(self.__run_batch(batch))
+            self.__batch = []
+            self.__running.add(task)
+            task.add_done_callback(self.__running.discard)
+            task.add_done_callback(lambda _: in_flight.release())
+
+    async def __run_batch(self, batch:List[Tuple[str, asyncio.Future, int]]) -> None:
+        loop = asyncio.get_running_loop()
+        structures, futures, requests = zip(*batch)
+        try:
+            results = await loop.run_in_executor(self.__executor, _clean_batch, list(structures), self.options)
+        except Exception as e:
+            if len(set(requests)) > 1:  # Retry per request so requests sharing the batch still succeed
+                by_request = {}
+                for item in batch:
+                    by_request.setdefault(item[2], []).append(item)
+                await asyncio.gather(*[self.__run_batch(items) for items in by_request.values()])
+                return
+            CleaningServer.__fail(futures, e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():  # Requester may have been cancelled
+                future.set_result(result)
+
+    @staticmethod
+    def __fail(futures:List[asyncio.Future], error:Exception) -> None:
+        """Sets error on futures that are not done (requesters may have been cancelled)."""
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    async def __handle_line(self, line:bytes, writer:asyncio.StreamWriter, write_lock:asyncio.Lock) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            structures = request['structures']
+            if not isinstance(structures, list):
+                raise ValueError('"structures" must be a list of SMILES')
+            response = {'id': request_id, 'results': await self.clean(structures)}
+        except Exception as e:  # Bad request or failed batch, the connection stays open
+            response = {'id': request_id, 'error': f'{type(e).__name__}: {e}'}
+        async with write_lock:  # Concurrent drain() on one writer raises AssertionError before Python 3.10
+            writer.write(json.dumps(response).encode('utf8') + b'\n')
+            await writer.drain()
+
+    async def __handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        tasks = set()
+        write_lock = asyncio.Lock()  # Responses of pipelined requests are written one at a time
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():  # Pipelined requests run concurrently so they share batches
+                    task = asyncio.create_task(self.__handle_line(line, writer, write_lock))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def start(self, host:str='127.0.0.1', port:int=8765) -> asyncio.AbstractServer:
+        """Starts listening. Use port 0 for any free port (see server.sockets).
+
+        Args:
+            host (str, optional): Interface. Defaults to "127.0.0.1" (local only).
+            port (int, optional): TCP port. Defaults to 8765.
+
+        Returns:
+            asyncio.AbstractServer: Listening server.
+        """
+        await self.__ensure_started()
+        self.__server = await asyncio.start_server(self.__handle_connection, host, port)
+        return self.__server
+
+    async def close(self) -> None:
+        """Stops listening and stops batching. Batches in flight finish, structures still waiting for a batch fail
+        with RuntimeError. Shuts down the worker pool if it was started here."""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        if self.__batcher is not None:
+            self.__batcher.cancel()
+            try:
+                await self.__batcher
+            except asyncio.CancelledError:
+                pass
+            self.__batcher = None
+
+            waiting = self.__batch + [self.__queue.get_nowait() for _ in range(self.__queue.qsize())]
+            self.__batch = []
+            CleaningServer.__fail([future for _, future, _ in waiting], RuntimeError('CleaningServer was closed'))
+            await asyncio.gather(*self.__running, return_exceptions=True)
+        if self.__own_executor and self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    async def __aenter__(self) -> 'CleaningServer':
+        await self.__ensure_started()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def serve(host:str='127.0.0.1', port:int=8765, **kwargs) -> None:
+    """Runs a CleaningServer until interrupted.
+
+    Args:
+        host (str, optional): Interface. Defaults to "127.0.0.1".
+        port (int, optional): TCP port. Defaults to 8765.
+        **kwargs: CleaningServer arguments.
+    """
+    async def run() -> None:
+        async with CleaningServer(**kwargs) as cleaning_server:
+            server = await cleaning_server.start(host, port)
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,123 @@
+import multiprocessing
+import time
+from multiprocessing import connection
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+# Status of one item: finished ("ok"), raised ("error"), ran past the time limit ("timeout") or killed its worker
+# process ("crash")
+statuses = ['ok', 'error', 'timeout', 'crash']
+
+
+def _serve(conn:connection.Connection, func:Callable) -> None:
+    """Worker process loop: one item in, one (status, result) out, until None is received."""
+    while True:
+        item = conn.recv()
+        if item is None:
+            break
+        try:
+            reply = ('ok', func(item))
+        except Exception as e:  # Reported, the worker stays up
+            reply = ('error', f'{type(e).__name__}: {e}')
+        conn.send(reply)
+
+
+class _Worker:
+    def __init__(self, func:Callable, max_tasks:Optional[int]) -> None:
+        """One supervised process. Killed and replaced after a timeout or crash, and recycled after max_tasks items
+        so memory leaked by native code is returned."""
+        self.__func = func
+        self.__max_tasks = max_tasks
+        self.process = None
+        self.conn = None
+        self.tasks = 0
+        self.start()
+
+    def start(self) -> None:
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child_conn, self.__func), daemon=True)
+        self.process.start()
+        child_conn.close()  # Parent only keeps its end, so a dead worker shows up as EOF
+        self.tasks = 0
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def send(self, item:Any) -> None:
+        if self.__max_tasks and self.tasks >= self.__max_tasks:
+            self.close()
+            self.start()
+        self.tasks += 1
+        self.conn.send(item)
+
+    def restart(self) -> None:
+        self.kill()
+        self.start()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=1)
+        except (OSError, ValueError):  # Pipe already broken
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def supervised_map(func:Callable, items:Iterable, timeout:float, n_jobs:int=1,
+                   max_tasks:Optional[int]=1000) -> List[Tuple[str, Any]]:  # *
+    """Maps func over items in worker processes, giving each item at most timeout seconds. A worker that runs over
+    or dies (e.g. a segfault in native code) is replaced, the other items are unaffected.
+
+    Args:
+        func (Callable): Function of one item. Picklable (top level) if the start method is not fork.
+        items (Iterable): Picklable inputs.
+        timeout (float): Seconds per item.
+        n_jobs (int, optional): Worker processes. Defaults to 1.
+        max_tasks (Optional[int], optional): Items per worker before it is recycled, None to never recycle.
+            Defaults to 1000.
+
+    Returns:
+        List[Tuple[str, Any]]: (status, result) per item, in input order. Status is one of naclo.supervised.statuses,
+            result is None for timeouts and crashes and the exception message for errors.
+    """
+    items = list(items)
+    results = [None]*len(items)
+    todo = iter(enumerate(items))
+    workers = [_Worker(func, max_tasks) for _ in range(min(max(n_jobs, 1), len(items)))]
+    busy = {}  # Worker -> (item index, deadline)
+
+    def feed(worker:_Worker) -> None:
+        for i, item in todo:
+            worker.send(item)
+            busy[worker] = (i, time.monotonic() + timeout)
+            return
+
+    try:
+        for worker in workers:
+            feed(worker)
+        while busy:
+            next_deadline = min(deadline for _, deadline in busy.values())
+            ready = connection.wait([w.conn for w in busy], timeout=max(0, next_deadline - time.monotonic()))
+            for worker, (i, deadline) in list(busy.items()):
+                if worker.conn in ready:
+                    try:
+                        results[i] = worker.conn.recv()
+                    except (EOFError, OSError):  # Process died mid item
+                        results[i] = ('crash', None)
+                        worker.restart()
+                elif time.monotonic() >= deadline:
+                    results[i] = ('timeout', None)
+                    worker.restart()
+                else:
+                    continue
+                del busy[worker]
+                feed(worker)
+    finally:
+        for worker in workers:
+            worker.close()
+    return results
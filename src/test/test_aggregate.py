@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+import stse
+
+from naclo import aggregate
+
+
+class TestAggregate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.df = pd.DataFrame({
+            'key': ['b', 'a', 'b', 'c', 'a', 'b', np.nan],
+            'other': [1, 2, 3, 4, 5, 6, 7],
+            'x': [1, 10, 3, np.nan, 1000, 8, 1],
+            'y': ['2', '4', '6', '8', '-1', '10', '1']
+        }, index=[10, 11, 12, 13, 14, 15, 16])
+
+    def test_group_codes(self):
+        codes, n_groups = aggregate.group_codes(self.df['key'])
+        self.assertEqual(codes.tolist(), [0, 1, 0, 2, 1, 0, -1])
+        self.assertEqual(n_groups, 3)
+
+    def test_group_statistics(self):
+        codes, n_groups = aggregate.group_codes(self.df['key'])
+        out = aggregate.group_statistics(codes, n_groups, self.df['x'].to_numpy(dtype=float), aggregate.statistics)
+
+        np.testing.assert_allclose(out['mean'], [4, 505, np.nan])
+        np.testing.assert_allclose(out['median'], [3, 505, np.nan])
+        np.testing.assert_allclose(out['geomean'], [24**(1/3), 100, np.nan])
+        np.testing.assert_allclose(out['std'], [np.std([1, 3, 8], ddof=1), np.std([10, 1000], ddof=1), np.nan])
+        self.assertEqual(out['count'].tolist(), [3, 2, 0])
+
+        # Non-positive values have no geometric mean
+        out = aggregate.group_statistics(codes, n_groups, np.array([-1, 1, 2, 1, 1, 3, 1.]), ['geomean'])
+        np.testing.assert_allclose(out['geomean'], [np.nan, 1, 1])
+
+        with self.assertRaises(ValueError):
+            aggregate.group_statistics(codes, n_groups, np.ones(7), ['mode'])
+
+    def test_aggregate_duplicates(self):
+        # Same as stse (without NA keys)
+        df = self.df.dropna(subset=['key'])
+        out = aggregate.aggregate_duplicates(df, 'key', ['y'])
+        expected = stse.duplicates.average(df, subsets=['key'], average_by='y')
+        self.assertTrue(out.equals(expected))
+
+        # Several columns and statistics
+        out = aggregate.aggregate_duplicates(self.df, 'key', ['x', 'y'], ['mean', 'count'])
+        expected = pd.DataFrame({
+            'key': ['b', 'a', 'c'],
+            'other': [1, 2, 4],
+            'x_mean': [4, 505, np.nan],
+            'x_count': [3, 2, 0],
+            'y_mean': [6, 1.5, 8],
+            'y_count': [3, 2, 1]
+        }, index=[10, 11, 13])
+        self.assertTrue(out.equals(expected))
+
+        # -log10 values: averaged on the linear scale, geomean is the mean in log space
+        df = pd.DataFrame({'key': ['a', 'a', 'b'], 'p': [6, 7, 5]})
+        out = aggregate.aggregate_duplicates(df, 'key', ['p'], ['mean', 'geomean', 'std'], neg_log_cols=['p'])
+        np.testing.assert_allclose(out['p_mean'], [-np.log10(5.5e-7), 5])
+        np.testing.assert_allclose(out['p_geomean'], [6.5, 5])
+        np.testing.assert_allclose(out['p_std'], [np.std([6, 7], ddof=1), np.nan])
+
+        with self.assertRaises(ValueError):
+            aggregate.aggregate_duplicates(self.df, 'key', ['missing'])
+        with self.assertRaises(ValueError):
+            aggregate.aggregate_duplicates(self.df.assign(y='text'), 'key', ['y'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,13 @@
+import asyncio
 import unittest
 import pandas as pd
 import numpy as np
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 from rdkit.Chem import MolFromSmiles
 from rdkit.Chem.Descriptors import ExactMolWt
 from math import log10
+import stse
 
 from naclo import binarize_default_params, binarize_default_options
 from naclo import Binarize
@@ -168,6 +171,32 @@ class TestBinarize(unittest.TestCase):
             binarize = Binarize(self.test_df, params=self.default_params, options=options)
             binarize.binarize(self.test_df['target'][:-1])
             
+    def test_binarize_matches_stse(self):
+        qualifiers = ['<', '≤', '>', '≥', '=', "'<'", "'>'", '>=', '<=', '~', '', np.nan]
+        values = [1, 5, 10, np.nan, '5']
+        df = pd.DataFrame({
+            'qualifiers': [q for q in qualifiers for _ in values],
+            'values': values*len(qualifiers)
+        })
+        
+        for active_operator in Binarize.active_operators:
+            # Qualifiers
+            out_df, out_arr = Binarize.binarize(df, df['values'], 5, active_operator, 'qualifiers')
+            kept = df.dropna(subset=['qualifiers'])
+            expected = stse.Binarizer(values=kept['values'].to_numpy(dtype=float), boundary=5,
+                                      active_operator=active_operator,
+                                      qualifiers=[q.replace('\'', '') for q in kept['qualifiers']]).binarize()
+            self.assertTrue(out_df.equals(kept))
+            np.testing.assert_array_equal(out_arr, expected)
+            
+            # No qualifiers
+            _, out_arr = Binarize.binarize(df, df['values'], 5, active_operator)
+            expected = stse.Binarizer(values=df['values'].to_numpy(dtype=float), boundary=5,
+                                      active_operator=active_operator).binarize()
+            np.testing.assert_array_equal(out_arr, expected)
+        
+        self.assertEqual(Binarize.parse_qualifiers(["'>'", '>=', '≤', np.nan]).tolist(), [2, 0, 1, 0])
+        
     def test_handle_duplicates(self):
         input_df = pd.DataFrame({
             'smiles': ['CC', 'CC', 'CCC', 'CCC', 'CCC', 'CCC', 'CCC', 'O=S=O', 'O=S=O', 'O=S=O', 'O'],
@@ -194,6 +223,12 @@ class TestBinarize(unittest.TestCase):
             out.equals(expected_df)
         )
         
+        # Same groups by SMILES hash
+        out = Binarize.handle_duplicates(input_df, 'smiles', 'smiles', 'bin', agree_ratio=0.6, key='hash64')
+        self.assertTrue(
+            out.equals(expected_df)
+        )
+        
     def test_main(self):
         options = {
             'duplicates': {
@@ -268,6 +303,31 @@ class TestBinarize(unittest.TestCase):
                 expected.to_numpy()
             )
         )
+        
+        # No unit conversion
+        options['convert_units']['units_col'] = ''
+        options['active_operator'] = '>'
+        binarize = Binarize(self.test_df, params=self.default_params, options=options)
+        out = binarize.main()
+        self.assertEqual(out['binarized_target'].tolist(), [1, 0, 0])
+
+    def test_amain(self):
+        options = deepcopy(self.default_options)
+        options['convert_units']['units_col'] = 'units'
+        options['qualifiers']['run'] = True
+        options['qualifiers']['qualifier_col'] = 'qualifiers'
+        df = pd.concat([self.test_df]*2, ignore_index=True)  # Duplicates span chunks
+
+        for drop_na in [False, True]:
+            options['drop_na'] = drop_na
+            expected = Binarize(df, params=self.default_params, options=options).main()
+
+            calls = []
+            with ProcessPoolExecutor(1) as executor:
+                out = asyncio.run(Binarize(df, params=self.default_params, options=options).amain(
+                    executor, chunksize=3, progress=lambda *a: calls.append(a)))
+            self.assertEqual(calls, [(3, 8), (6, 8), (8, 8)])
+            pd.testing.assert_frame_equal(out, expected)
 
 
 if __name__ == '__main__':
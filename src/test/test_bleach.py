@@ -1,4 +1,5 @@
 from math import log10
+import asyncio
 import unittest
 import json
 import pandas as pd
@@ -7,6 +8,17 @@ from naclo import Bleach, bleach_default_options, bleach_default_params
 import warnings
 from rdkit import Chem
 import copy
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+
+clean_structure_task = Bleach._clean_structure_task
+
+def slow_propanol(mol, options):
+    if Chem.MolToSmiles(Chem.Mol(mol)) == 'CCCO':
+        time.sleep(30)
+    return clean_structure_task(mol, options)
 
 
 class TestBleach(unittest.TestCase):
@@ -88,6 +100,30 @@ class TestBleach(unittest.TestCase):
                 'BAD_OPTION_MOLECULE_SETTINGS_NEUTRALIZE_CHARGES_RUN'
             )
 
+    def test_missing_options(self):
+        params = copy.deepcopy(self.default_params)
+        params['structure_col'] = 'SMILES'
+        params['structure_type'] = 'smiles'
+
+        # Options written before time_limit existed take its defaults
+        options = copy.deepcopy(self.default_options)
+        del options['molecule_settings']['time_limit']
+        bleach = Bleach(self.smiles_df, params, options)
+        self.assertEqual(bleach.mol_settings['time_limit'], self.default_options['molecule_settings']['time_limit'])
+        self.assertIn('time_limit', self.default_options['molecule_settings'])
+
+        # ... and so do options written before duplicate keys and statistics
+        del options['file_settings']['duplicate_compounds']['key']
+        del options['file_settings']['duplicate_compounds']['statistics']
+        self.assertEqual(Bleach(self.smiles_df, params, options).statistics, ('mean',))
+
+        # Whole seconds
+        options['molecule_settings']['time_limit'] = {'seconds': 5, 'on_failure': 'drop', 'workers': 1}
+        Bleach(self.smiles_df, params, options)
+        options['molecule_settings']['time_limit']['seconds'] = '5'
+        with self.assertRaises(ValueError):
+            Bleach(self.smiles_df, params, options)
+
     def test_drop_na(self):
         df = pd.DataFrame({
             'SMILES': [
@@ -447,7 +483,16 @@ class TestBleach(unittest.TestCase):
         self.assertTrue(
             bleach.df[['SMILES', 'InchiKey', 'target']].reset_index(drop=True).equals(expected)
         )
-        
+
+        # Several statistics and target columns
+        dup_df = bleach.df.drop(columns=['InchiKey']).copy()
+        dup_df['target'] = [1, 2, 3, 4]
+        dup_df['other'] = [1, 2, 3, 4]
+        dup_df = pd.concat([dup_df, dup_df.iloc[[2]].assign(target=6, other=7)])
+        out = Bleach.handle_duplicates(dup_df, 'ROMol', 'InchiKey', ['target', 'other'], statistics=('median', 'count'))
+        self.assertEqual(out['target_median'].tolist(), [1, 2, 4.5, 4])
+        self.assertEqual(out['other_count'].tolist(), [1, 1, 2, 1])
+
         # Remove
         options['file_settings']['duplicate_compounds']['selected'] = 'remove'
         bleach = Bleach(df, params, options)
@@ -481,7 +526,51 @@ class TestBleach(unittest.TestCase):
             'InchiKey',
             bleach.df.columns
         )
+
+        # Other keys group the same structures, inchi keys still added after merging
+        options['file_settings']['duplicate_compounds']['selected'] = 'average'
+        expected['target'] = [1, 2, 3.5, 5]
+        for options['file_settings']['duplicate_compounds']['key'] in ['smiles', 'hash64', 'hash128',
+                                                                      'registration_hash']:
+            bleach = Bleach(df, params, options)
+            bleach.drop_na()
+            bleach.init_structure_compute()
+            bleach.mol_cleanup()
+            bleach.handle_duplicates()
+            self.assertTrue(
+                bleach.df[['SMILES', 'InchiKey', 'target']].reset_index(drop=True).equals(expected)
+            )
         
+    def test_statistics_option(self):
+        params = copy.deepcopy(self.default_params)
+        params['structure_col'] = 'SMILES'
+        params['structure_type'] = 'smiles'
+        params['target_col'] = 'value'
+        options = copy.deepcopy(self.default_options)
+        options['file_settings']['duplicate_compounds']['statistics'].update({'mean': True, 'count': True})
+        df = pd.DataFrame({'SMILES': ['CCC', 'CCO', 'CCC'], 'value': [1, 2, 5], 'note': ['a', 'b', 'c']})
+
+        out = Bleach(df, params, options).main()
+        self.assertEqual(list(out.columns[:4]), ['SMILES', 'value_mean', 'value_count', 'note'])  # Target position
+        self.assertEqual(out['value_mean'].tolist(), [3, 2])
+        self.assertEqual(out['value_count'].tolist(), [2, 1])
+        pd.testing.assert_frame_equal(asyncio.run(Bleach(df, params, options).amain(chunksize=2)).drop(columns='ROMol'),
+                                      out.drop(columns='ROMol'))
+
+        # With units converted, statistics are of converted values and targets keep their first row's unit
+        units_df = pd.DataFrame({'SMILES': ['CCC', 'CCC'], 'value': [1, 100], 'units': ['uM', 'nM']})
+        options['molecule_settings']['convert_units'].update({'units_col': 'units', 'output_units': 'neg_log_molar'})
+        options['file_settings']['duplicate_compounds']['statistics'].update({'mean': False, 'geomean': True})
+        out = Bleach(units_df, params, options).main()
+        self.assertEqual((out['value'].tolist(), out['units'].tolist()), ([1], ['uM']))
+        self.assertAlmostEqual(out['neg_log_molar_units_geomean'].iloc[0], 6.5)
+        self.assertEqual(out['neg_log_molar_units_count'].iloc[0], 2)
+
+        options['molecule_settings']['convert_units']['units_col'] = ''
+        options['file_settings']['duplicate_compounds']['statistics'].update({'geomean': False, 'count': False})
+        with self.assertRaises(ValueError):
+            Bleach(df, params, options)
+
     def test_append_column(self):
         params = copy.deepcopy(self.default_params)
         options = copy.deepcopy(self.default_options)
@@ -547,6 +636,105 @@ class TestBleach(unittest.TestCase):
         
         bleach.mol_cleanup()
 
+    def test_main_column_projection(self):
+        params = copy.deepcopy(self.default_params)
+        params['structure_col'] = 'SMILES'
+        params['structure_type'] = 'smiles'
+        params['target_col'] = 'value'
+        options = copy.deepcopy(self.default_options)
+
+        df = pd.DataFrame({
+            'assay': ['a', 'b', 'c', 'd', 'e'],
+            'SMILES': ['CCC', 'CCC.Cl', None, 'CCCO', 'Br'],
+            'empty': ['', 'none', np.nan, None, ''],
+            'value': [1, 3, 4, 5, 6],
+            'note': ['none', 'x', 'only in dropped row', 'nan', None],  # Non-NA only in a row drop_na removes
+            'count': [1, 2, 3, 4, 5]
+        }, index=[10, 10, 11, 12, 13])  # Duplicate labels
+
+        # Same as running every step on the full frame
+        expected = Bleach(df, params, options)
+        expected.df = expected.df.reset_index(drop=True)
+        for step in ['drop_na', 'init_structure_compute', 'convert_units', 'mol_cleanup', 'handle_duplicates',
+                     'append_columns', 'remove_header_chars']:
+            getattr(expected, step)()
+        expected.df.index = df.index[expected.df.index]
+
+        out = Bleach(df, params, options).main()
+        self.assertEqual(list(out.columns), ['assay', 'SMILES', 'value', 'note', 'count', 'ROMol', 'InchiKey', 'MW'])
+        # Passthrough dtypes are inferred from output rows only (all NA "note" is float here, object on the full frame)
+        pd.testing.assert_frame_equal(out.drop(columns='ROMol'), expected.df.drop(columns='ROMol'), check_dtype=False)
+
+    def test_amain(self):
+        params = copy.deepcopy(self.default_params)
+        params['structure_col'] = 'SMILES'
+        params['structure_type'] = 'smiles'
+        params['target_col'] = 'value'
+        options = copy.deepcopy(self.default_options)
+
+        df = pd.DataFrame({
+            'assay': ['a', 'b', 'c', 'd', 'e', 'f'],
+            'SMILES': ['CCC', 'CCC.Cl', None, 'CCCO', 'Br', 'OCCC'],
+            'value': [1, 3, 4, 5, 6, 7],
+            'note': ['none', 'x', 'only in dropped row', 'nan', None, ''],
+        }, index=[10, 10, 11, 12, 13, 14])
+        expected = Bleach(df, params, options).main()
+
+        for executor in [ThreadPoolExecutor(2), ProcessPoolExecutor(1)]:
+            with executor:
+                calls = []
+                out = asyncio.run(Bleach(df, params, options).amain(executor, chunksize=2, n_jobs=2,
+                                                                    progress=lambda *a: calls.append(a)))
+            self.assertEqual(calls, [(2, 6), (4, 6), (6, 6)])
+            pd.testing.assert_frame_equal(out.drop(columns='ROMol'), expected.drop(columns='ROMol'))
+            self.assertEqual(list(out.ROMol.map(Chem.MolToSmiles)), list(expected.SMILES))
+
+        # Cancelled between chunks
+        async def cancelled(calls):
+            task = asyncio.current_task()
+            await Bleach(df, params, options).amain(chunksize=1, progress=lambda *a: calls.append(task.cancel()))
+
+        calls = []
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(cancelled(calls))
+        self.assertEqual(len(calls), 1)
+
+    def test_main_time_limit(self):
+        params = copy.deepcopy(self.default_params)
+        params['structure_col'] = 'SMILES'
+        params['structure_type'] = 'smiles'
+        params['target_col'] = 'value'
+        options = copy.deepcopy(self.default_options)
+        df = pd.DataFrame({'SMILES': ['CCC.Cl', 'CC(=O)[O-].[Na+]', 'CCC', 'CCCO', 'Cl', 'C1CC'],
+                           'value': [1, 2, 3, 4, 5, 6]})
+
+        expected = Bleach(df, params, options).main()
+        options['molecule_settings']['time_limit'] = {'seconds': 30.0, 'on_failure': 'drop', 'workers': 2}
+        out = Bleach(df, params, options).main()
+        pd.testing.assert_frame_equal(out.drop(columns='ROMol'), expected.drop(columns='ROMol'))
+        self.assertEqual([sorted(m.GetPropNames(True, True)) for m in out.ROMol],  # All properties kept
+                         [sorted(m.GetPropNames(True, True)) for m in expected.ROMol])
+
+        # Molecule over the limit is dropped or flagged, the rest is cleaned
+        task = mock.patch.object(Bleach, '_clean_structure_task', staticmethod(slow_propanol))
+        options['molecule_settings']['time_limit'] = {'seconds': 0.5, 'on_failure': 'drop', 'workers': 1}
+        with task:
+            out = Bleach(df, params, options).main()
+        self.assertEqual(list(out.SMILES), ['CCC', 'CC(=O)O'])
+
+        options['molecule_settings']['time_limit']['on_failure'] = 'flag'
+        with task:
+            out = Bleach(df, params, options).main()
+        self.assertEqual(list(out.SMILES), ['CCC', 'CC(=O)O', 'CCCO'])
+        self.assertEqual(list(out.FailureReason.fillna('')), ['', '', 'TIMEOUT'])
+        self.assertEqual(list(out.InchiKey.isna()), [False, False, True])
+
+        # Rows without a key keep their position
+        flagged = pd.DataFrame({'InchiKey': ['A', np.nan, 'B', 'A'], 'value': [1, 2, 3, 5]}, index=[9, 8, 7, 6])
+        out = Bleach._aggregate_duplicates(flagged, 'InchiKey', 'value')
+        self.assertEqual(list(out.index), [9, 8, 7])
+        self.assertEqual(list(out.value), [3, 2, 3])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+import copy
+import unittest
+import pandas as pd
+from rdkit import Chem
+
+from naclo import Bleach, bleach_default_options, clean_structure
+
+
+class TestClean(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.smiles = ['Cc1cc(/C=C/C#N)cc(C)c1Nc1nc(Nc2ccc(C#N)cc2)ncc1N',
+                      'CCC.Cl',
+                      'OC(=O)c1ccccc1.CCCCCCCC',
+                      'CC(=O)[O-].[Na+]',
+                      '[O-]c1ccccc1CCN',
+                      'Cl',
+                      'C1CC',
+                      'none']
+        return super().setUpClass()
+    
+    def test_clean_structure_matches_bleach(self):
+        for salts, filter_method, neutralize in [(True, 'carbon_count', True), (False, 'mw', False),
+                                                 (True, 'none', True), (False, 'atom_count', True)]:
+            options = copy.deepcopy(bleach_default_options)
+            options['molecule_settings']['remove_fragments'] = {'salts': salts, 'filter_method': filter_method}
+            options['molecule_settings']['neutralize_charges']['run'] = neutralize
+            
+            expected = Bleach(pd.DataFrame({'SMILES': self.smiles}),
+                              {'structure_col': 'SMILES', 'structure_type': 'smiles', 'target_col': ''},
+                              options).main()
+            results = [clean_structure(s, options) for s in self.smiles]
+            
+            self.assertEqual([r.smiles for r in results if r], list(expected.SMILES))
+            self.assertEqual([r.inchi_key for r in results if r], list(expected.InchiKey))
+            self.assertEqual([r.mw for r in results if r], list(expected.MW))
+    
+    def test_clean_structure(self):
+        out = clean_structure(Chem.MolFromSmiles('CCCCN.Cl'))
+        self.assertEqual(out.smiles, 'CCCCN')
+        self.assertEqual(out.inchi_key, Chem.MolToInchiKey(out.mol))
+        
+        self.assertEqual(clean_structure('Cl').dropped, 'ONLY_SALTS')
+        self.assertEqual(clean_structure('C1CC').dropped, 'INVALID_STRUCTURE')
+        self.assertEqual(clean_structure('').dropped, 'NA_STRUCTURE')
+        assert not clean_structure(None)
+        
+        with self.assertRaises(AttributeError):  # Slotted
+            out.extra = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import copy
+import os
+import tempfile
+import unittest
+import pandas as pd
+from rdkit import Chem
+
+from naclo import Bleach, bleach_default_options
+from naclo.cli import main
+
+
+class TestCli(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.df = pd.DataFrame({
+            'SMILES': ['CCC.Cl', 'CCC', 'CCCO', None, 'OCCC'],
+            'value': [1, 3, 5, 6, 7],
+            'note': ['a', None, 'b', 'c', None]
+        })
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'in.csv')
+        cls.df.to_csv(cls.path, index=False)
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+        return super().tearDownClass()
+
+    def test_bleach(self):
+        options = copy.deepcopy(bleach_default_options)
+        options['file_settings']['append_columns'].update(mol=False, mw=False)
+        params = {'structure_col': 'SMILES', 'structure_type': 'smiles', 'target_col': 'value'}
+        expected = Bleach(pd.read_csv(self.path), params, options).main().reset_index(drop=True)
+
+        out_path = os.path.join(self.tmp.name, 'out.tsv.gz')
+        self.assertEqual(main(['bleach', self.path, '-o', out_path, '--target-col', 'value', '--chunksize', '2',
+                               '--whole-file',
+                               '--set', 'file_settings.append_columns.mol=false',
+                               '--set', 'file_settings.append_columns.mw=false']), 0)
+        pd.testing.assert_frame_equal(pd.read_csv(out_path, sep='\t'), expected)
+
+    def test_bleach_stream(self):
+        out_path = os.path.join(self.tmp.name, 'out.csv')
+        main(['bleach', self.path, '-o', out_path, '--chunksize', '2', '--jobs', '2',
+              '--set', 'file_settings.append_columns={"smiles": true, "mol": true, "inchi_key": true, "mw": false}'])
+        out = pd.read_csv(out_path)
+        self.assertEqual(list(out.columns), ['SMILES', 'value', 'note', 'InchiKey'])  # Same header, no Mol reprs
+        self.assertEqual(list(out.SMILES), ['CCC', 'CCCO', 'CCCO'])  # Duplicates only removed within a chunk
+
+    def test_bleach_stream_sdf(self):
+        sdf_path = os.path.join(self.tmp.name, 'in.sdf')
+        with Chem.SDWriter(sdf_path) as writer:
+            for smiles, props in [('CCC', {'value': '1'}), ('CCO', {'value': '2', 'extra': 'x'})]:
+                mol = Chem.MolFromSmiles(smiles)
+                for name, value in props.items():
+                    mol.SetProp(name, value)
+                writer.write(mol)
+        
+        # SD property first found in a later chunk is not dropped
+        out_path = os.path.join(self.tmp.name, 'out.csv')
+        main(['bleach', sdf_path, '-o', out_path, '--chunksize', '1'])
+        self.assertEqual(list(pd.read_csv(out_path).extra.fillna('')), ['', 'x'])
+
+    def test_errors(self):
+        with self.assertRaises(SystemExit):
+            main(['bleach', self.path, '-o', os.path.join(self.tmp.name, 'out.xlsx')])
+        with self.assertRaises(SystemExit):
+            main(['bleach', self.path, '-o', os.path.join(self.tmp.name, 'out.csv'), '--set', 'no_value'])
+
+
+if __name__ == '__main__':
+    unittest.main()
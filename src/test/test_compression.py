@@ -0,0 +1,43 @@
+import bz2
+import gzip
+import unittest
+from io import BytesIO
+
+from naclo import compression
+
+
+class TestCompression(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.data = b''.join(f'C{i}\tCCO\t{i*0.5}\n'.encode() for i in range(5000))
+        return super().setUpClass()
+    
+    def test_infer_compression(self):
+        self.assertEqual(compression.infer_compression('out.sdf.gz'), 'gzip')
+        self.assertEqual(compression.infer_compression('out.csv.bz2'), 'bz2')
+        self.assertEqual(compression.infer_compression('out.csv.zst'), 'zstd')
+        self.assertIsNone(compression.infer_compression('out.csv'))
+        self.assertIsNone(compression.infer_compression(BytesIO()))
+        
+    def test_open_compressed(self):
+        for codec, decompress in [('gzip', gzip.decompress), ('bz2', bz2.decompress)]:
+            outs = []
+            for n_jobs in [1, 3]:
+                raw = BytesIO()
+                with compression.open_compressed(raw, codec, n_jobs=n_jobs, block_size=1000) as f:
+                    for i in range(0, len(self.data), 777):  # Writes not aligned with blocks
+                        f.write(self.data[i:i + 777])
+                self.assertEqual(decompress(raw.getvalue()), self.data)  # Concatenated members decode as one
+                outs.append(raw.getvalue())
+            self.assertEqual(outs[0], outs[1])  # Independent of n_jobs
+            
+            raw = BytesIO()
+            compression.open_compressed(raw, codec).close()
+            self.assertEqual(decompress(raw.getvalue()), b'')
+            
+        with self.assertRaises(ValueError):
+            compression.open_compressed(BytesIO(), 'lzma')
+            
+
+if __name__ == '__main__':
+    unittest.main()
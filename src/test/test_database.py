@@ -0,0 +1,169 @@
+import unittest
+import threading
+import pandas as pd
+import numpy as np
+from pymongo import InsertOne, UpdateOne
+from rdkit import Chem
+
+from naclo import database
+from naclo.rdpickle import deserialize_mol
+
+
+class FakeCollection:
+    """Minimal in-process stand-in for a pymongo Collection."""
+    def __init__(self) -> None:
+        self.docs = []
+        self.calls = []
+        self.indexes = {'_id_': [('_id', 1)]}
+        self.threads = set()
+
+    def insert_many(self, documents, ordered=True):
+        self.calls.append((len(documents), ordered))
+        self.threads.add(threading.get_ident())
+        self.docs.extend(dict(d) for d in documents)
+
+    def index_information(self):
+        return {name: {'key': key} for name, key in self.indexes.items()}
+
+    def create_index(self, keys):
+        self.indexes['_'.join(f'{k}_{d}' for k, d in keys)] = keys
+
+    def bulk_write(self, requests, ordered=True):
+        self.calls.append(('bulk_write', len(requests), ordered))
+        for op in requests:
+            if isinstance(op, InsertOne):
+                self.docs.append(dict(op._doc))
+            elif isinstance(op, UpdateOne):
+                for doc in self.docs:
+                    if all(doc.get(k) == v for k, v in op._filter.items()):
+                        doc.update(op._doc['$set'])
+                        break
+
+    def find(self, filter=None, projection=None, batch_size=0):
+        self.calls.append(('find', filter, projection))
+        for doc in self.docs:
+            if all(doc.get(k) in v['$in'] for k, v in (filter or {}).items()):
+                keep = [k for k, v in (projection or {}).items() if v]
+                yield {k: v for k, v in doc.items() if (k in keep if keep else True)}
+
+
+class TestDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.smiles = ['CCO', 'c1ccccc1', 'CN', 'CCC', 'O']
+        cls.df = pd.DataFrame({
+            'ROMol': [Chem.MolFromSmiles(s) for s in cls.smiles],
+            'value': list(range(5))
+        })
+        return super().setUpClass()
+
+    def test_rdkit_2_db(self):
+        collection = FakeCollection()
+        progress = []
+        counts = database.rdkit_2_db(self.df, collection, batch_size=2, ordered=False,
+                                     progress=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(counts, {'inserted': 5, 'updated': 0, 'unchanged': 0, 'duplicate': 0})
+        self.assertEqual(collection.calls, [(2, False), (2, False), (1, False)])
+        self.assertEqual(progress, [(2, 5), (4, 5), (5, 5)])
+        assert threading.get_ident() not in collection.threads  # Inserted off the serializing thread
+
+        self.assertEqual(list(collection.docs[0].keys()), ['ROMol', 'value'])
+        self.assertEqual(
+            [Chem.MolToSmiles(deserialize_mol(d['ROMol'])) for d in collection.docs],
+            self.smiles
+        )
+
+    def test_rdkit_2_db_mol_array(self):
+        collection = FakeCollection()
+        df = self.df.astype({'ROMol': 'mol'})
+        database.rdkit_2_db(df, collection)
+
+        self.assertEqual(collection.calls, [(5, True)])
+        self.assertEqual(
+            [Chem.MolToSmiles(deserialize_mol(d['ROMol'])) for d in collection.docs],
+            self.smiles
+        )
+
+    def test_empty(self):
+        collection = FakeCollection()
+        self.assertEqual(database.rdkit_2_db(self.df.iloc[:0], collection)['inserted'], 0)
+        self.assertEqual(collection.calls, [])
+
+    def test_db_2_rdkit(self):
+        collection = FakeCollection()
+        df = self.df.assign(InchiKey=[Chem.MolToInchiKey(m) for m in self.df.ROMol])
+        database.rdkit_2_db(df, collection)
+
+        # Lazy Mols
+        out = database.db_2_rdkit(collection, batch_size=2)
+        self.assertEqual(str(out.ROMol.dtype), 'mol')
+        self.assertEqual(list(out.columns), ['ROMol', 'value', 'InchiKey'])
+        self.assertEqual(list(out.ROMol.map(Chem.MolToSmiles)), self.smiles)
+
+        # Pickled and RDKit binary documents are read into one format
+        database.rdkit_2_db(df.astype({'ROMol': 'mol'}), collection)
+        out = database.db_2_rdkit(collection)
+        self.assertEqual(out.ROMol.array.blobs()[:5], out.ROMol.array.blobs()[5:])
+        collection.docs = collection.docs[:5]
+
+        # Eager Mols
+        out = database.db_2_rdkit(collection, lazy=False)
+        self.assertIsInstance(out.ROMol.iloc[0], Chem.rdchem.Mol)
+
+        # Projection and InChI key filter are pushed to the query
+        keys = list(df.InchiKey.iloc[[1, 3]])
+        batches = list(database.iter_db_2_rdkit(collection, columns=['InchiKey', 'value'], inchi_keys=keys,
+                                                batch_size=1))
+        self.assertEqual(collection.calls[-1], ('find', {'InchiKey': {'$in': keys}},
+                                                {'_id': 0, 'InchiKey': 1, 'value': 1}))
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(list(pd.concat(batches).value), [1, 3])
+        self.assertEqual(list(batches[0].columns), ['InchiKey', 'value'])
+
+    def test_rdkit_2_db_upsert(self):
+        collection = FakeCollection()
+        df = self.df.assign(InchiKey=[Chem.MolToInchiKey(m) for m in self.df.ROMol], note=np.nan)
+
+        counts = database.rdkit_2_db(df, collection, batch_size=2, upsert=True)
+        self.assertEqual(counts, {'inserted': 5, 'updated': 0, 'unchanged': 0, 'duplicate': 0, 'no_key': 0})
+        self.assertIn([('InchiKey', 1)], collection.indexes.values())
+
+        # Reload is idempotent
+        counts = database.rdkit_2_db(df, collection, batch_size=2, upsert=True)
+        self.assertEqual(counts, {'inserted': 0, 'updated': 0, 'unchanged': 5, 'duplicate': 0, 'no_key': 0})
+        self.assertEqual(len(collection.docs), 5)
+
+        # Only changed rows and new keys are written
+        refreshed = df.copy()
+        refreshed.loc[1, 'value'] = 42
+        refreshed = pd.concat([refreshed, pd.DataFrame({'ROMol': [Chem.MolFromSmiles('CCCl')], 'value': [7],
+                                                        'InchiKey': ['NEW'], 'note': [np.nan]})])
+        counts = database.rdkit_2_db(refreshed, collection, upsert=True)
+        self.assertEqual(counts, {'inserted': 1, 'updated': 1, 'unchanged': 4, 'duplicate': 0, 'no_key': 0})
+        self.assertEqual(collection.calls[-1], ('bulk_write', 2, True))
+        self.assertEqual([d['value'] for d in collection.docs], [0, 42, 2, 3, 4, 7])
+
+        # Same Mols serialized as RDKit binary (MolArray) are unchanged
+        counts = database.rdkit_2_db(refreshed.astype({'ROMol': 'mol'}), collection, upsert=True)
+        self.assertEqual(counts, {'inserted': 0, 'updated': 0, 'unchanged': 6, 'duplicate': 0, 'no_key': 0})
+
+        # Repeated keys within a batch: last row wins, counts add up to the rows
+        repeated = pd.concat([refreshed.iloc[[0]].assign(value=-1), refreshed.iloc[[0]].assign(value=-2)])
+        counts = database.rdkit_2_db(repeated, collection, upsert=True)
+        self.assertEqual(counts, {'inserted': 0, 'updated': 1, 'unchanged': 0, 'duplicate': 1, 'no_key': 0})
+        self.assertEqual(collection.docs[0]['value'], -2)
+
+        # NA keys (e.g. flagged failures) are skipped, not collapsed into one duplicate
+        failed = pd.DataFrame({'ROMol': [Chem.MolFromSmiles('CCBr'), Chem.MolFromSmiles('CCI')], 'value': [8, 9],
+                               'InchiKey': [np.nan, None], 'note': ['TIMEOUT', 'ERROR']})
+        counts = database.rdkit_2_db(pd.concat([repeated.iloc[[1]], failed]), collection, upsert=True)
+        self.assertEqual(counts, {'inserted': 0, 'updated': 0, 'unchanged': 1, 'duplicate': 0, 'no_key': 2})
+        self.assertEqual(len(collection.docs), 6)
+
+        with self.assertRaises(ValueError):
+            database.rdkit_2_db(self.df, collection, upsert=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
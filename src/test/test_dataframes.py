@@ -1,13 +1,18 @@
 from ast import Bytes
+import gzip
 import unittest
+import importlib.util
+import openpyxl
 import pandas as pd
 from rdkit import Chem
 from rdkit.Chem import PandasTools
 from setuptools import setup
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest import mock
 
 import naclo
-from naclo import dataframes
+from naclo import dataframes, readers
+from naclo.Writer import Writer
 
 
 class TestDataframes(unittest.TestCase):
@@ -103,12 +108,123 @@ class TestDataframesWriter(unittest.TestCase):
         # Test with path --> REQUIRES VISUAL CONFIRMATION
         path = 'test/assets/writer_rdkit_2_excel_test_case.xlsx'
         self.writer.rdkit_2_excel(path)
+
+    def test_writer_rdkit_2_excel_streaming(self):
+        df = pd.concat([self.test_df]*2, ignore_index=True).assign(value=[1.5, float('nan'), 3, 4, 5, 6])
+        cache = {}
+        buf = BytesIO()
+        Writer(df, mol_col_name='Molecule').rdkit_2_excel(buf, size=(100, 100), max_rows=4, cache=cache)
+        self.assertEqual(len(cache), 3)  # One depiction per distinct structure
+        
+        book = openpyxl.load_workbook(buf)
+        self.assertEqual(len(book.worksheets), 2)  # Row cap spills to a second sheet
+        rows = [list(r) for sheet in book.worksheets for r in sheet.iter_rows(values_only=True)]
+        self.assertEqual(rows[0], ['SMILES', 'Molecule', 'value'])
+        self.assertEqual([r[0] for r in rows if r[0] != 'SMILES'], list(df.SMILES))
+        self.assertEqual([r[2] for r in rows if r[0] != 'SMILES'], [1.5, None, 3, 4, 5, 6])
+        self.assertEqual(sum(len(sheet._images) for sheet in book.worksheets), 6)
         
     def test_writer_write(self):
         buf = BytesIO()
         for ext in ['csv', 'tsv', 'xls', 'xlsx', 'sdf']:
             out = self.writer.write(buf, ext=ext)
             assert isinstance(out, BytesIO)
+            
+    def test_writer_stream(self):
+        # SDF matches PandasTools output, record numbering continues across chunks
+        expected = StringIO()
+        dataframes.write_sdf(self.test_df, expected, 'Molecule')
+        
+        out = BytesIO()
+        chunks = (self.test_df.iloc[i:i + 2] for i in range(0, 3, 2))
+        Writer.stream(chunks, out, 'sdf', mol_col_name='Molecule')
+        self.assertEqual(out.getvalue().decode('utf8'), expected.getvalue())
+        
+        # CSV header written once
+        out = BytesIO()
+        Writer.stream(self.test_df, out, 'csv', chunksize=1)
+        self.assertEqual(out.getvalue().decode('utf8'), self.test_df.to_csv(index=False))
+        
+        with self.assertRaises(ValueError):
+            Writer.stream(self.test_df, BytesIO(), 'xlsx')
+
+    def test_writer_compression(self):
+        expected = self.writer.write(BytesIO(), 'sdf').getvalue()
+        out = self.writer.write(BytesIO(), 'sdf', compression='gzip', n_jobs=2)
+        self.assertEqual(gzip.decompress(out.getvalue()), expected)
+
+        with self.assertRaises(ValueError):
+            self.writer.write(BytesIO(), 'xlsx', compression='gzip')
+            
+    def test_writer_stream_parallel(self):
+        for ext in Writer.stream_exts:
+            df = self.test_df if ext == 'sdf' else self.test_df.drop(columns=['Molecule'])  # Mol repr has address
+            serial, parallel = BytesIO(), BytesIO()
+            Writer.stream(df, serial, ext, mol_col_name='Molecule', chunksize=1)
+            Writer.stream(df, parallel, ext, mol_col_name='Molecule', chunksize=1, n_jobs=2)
+            self.assertEqual(serial.getvalue(), parallel.getvalue())
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow not installed')
+    def test_writer_columnar(self):
+        df = self.test_df.assign(units=['nM', 'nM', 'nM'])
+        for ext in Writer.columnar_exts:
+            buf = Writer(df, mol_col_name='Molecule').write(BytesIO(), ext)
+            out = readers.read_columnar(buf, mol_col_name='Molecule')
+            
+            self.assertEqual(list(out.columns), ['SMILES', 'Molecule', 'units'])
+            self.assertEqual(str(out.Molecule.dtype), 'mol')
+            self.assertEqual(list(out.Molecule.map(Chem.MolToSmiles)), list(df.SMILES))
+            self.assertEqual(str(out.units.dtype), 'category')  # Dictionary encoded
+            
+            out = readers.read_columnar(buf, mol_col_name='Molecule', columns=['SMILES'], lazy=False)
+            self.assertEqual(list(out.columns), ['SMILES'])
+
+    def test_writer_write_many(self):
+        writer = Writer(self.test_df, mol_col_name='Molecule')
+        exts = ['sdf', 'xlsx'] + (Writer.columnar_exts if importlib.util.find_spec('pyarrow') else [])
+        for n_jobs in [1, 2]:
+            outs = writer.write_many({ext: BytesIO() for ext in exts}, chunksize=2, n_jobs=n_jobs)
+            self.assertEqual(list(outs), exts)
+
+            # SDF identical to single format write
+            self.assertEqual(outs['sdf'].getvalue(), writer.write(BytesIO(), 'sdf').getvalue())
+
+            # Chunks appended to one sheet
+            excel = pd.read_excel(outs['xlsx'])
+            self.assertEqual(list(excel.SMILES), list(self.test_df.SMILES))
+
+            for ext in exts[2:]:
+                out = readers.read_columnar(outs[ext], mol_col_name='Molecule')
+                self.assertEqual(list(out.Molecule.map(Chem.MolToSmiles)), list(self.test_df.SMILES))
+
+        # Dictionary columns get one schema across slices, same table as single format write
+        if importlib.util.find_spec('pyarrow'):
+            import pyarrow.parquet
+            df = self.test_df.assign(units=['nM', 'uM', 'nM'])
+            writer = Writer(df, mol_col_name='Molecule')
+            out = writer.write_many({'parquet': BytesIO()}, chunksize=1, dictionary_cols=['units'])['parquet']
+            expected = writer.write(BytesIO(), 'parquet', dictionary_cols=['units'])
+            self.assertTrue(pyarrow.parquet.read_table(out).equals(pyarrow.parquet.read_table(expected)))
+
+        # Each Mol serialized once per chunk and each structure drawn once, shared by SDF and every Excel sink
+        df = pd.concat([self.test_df, self.test_df.iloc[:1]], ignore_index=True)  # Duplicate structure
+        writer = Writer(df, mol_col_name='Molecule')
+        for n_jobs in [1, 2]:
+            with mock.patch.object(naclo.rdpickle, 'mol_blobs', wraps=naclo.rdpickle.mol_blobs) as serializer:
+                outs = writer.write_many({'sdf': BytesIO(), 'xlsx': BytesIO(), 'xls': BytesIO()}, chunksize=2,
+                                         n_jobs=n_jobs)
+            self.assertEqual(sum(len(list(call.args[0])) for call in serializer.call_args_list), len(df))
+            self.assertEqual(outs['sdf'].getvalue(), writer.write(BytesIO(), 'sdf').getvalue())
+            self.assertEqual(len(openpyxl.load_workbook(outs['xlsx']).active._images), len(df))
+        with mock.patch.object(naclo.depictions, '_render_png', wraps=naclo.depictions._render_png) as draw:
+            writer.write_many({'xlsx': BytesIO(), 'xls': BytesIO()}, chunksize=len(df))
+        self.assertEqual(draw.call_count, df.SMILES.nunique())
+        
+        # CSV matches single format write (Mol column dropped, repr has address)
+        writer = Writer(self.test_df.drop(columns=['Molecule']), mol_col_name='Molecule')
+        outs = writer.write_many({'csv': BytesIO(), 'tsv': BytesIO()}, chunksize=1)
+        for ext, out in outs.items():
+            self.assertEqual(out.getvalue(), writer.write(BytesIO(), ext).getvalue())
 
 
 if __name__ == '__main__':
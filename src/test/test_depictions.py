@@ -0,0 +1,65 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from rdkit import Chem
+
+from naclo import depictions
+
+
+class TestDepictions(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.mols = [Chem.MolFromSmiles(s) for s in ['CCO', 'OCC', 'c1ccccc1']] + [None]
+        return super().setUpClass()
+    
+    def test_depiction_key(self):
+        self.assertEqual(
+            depictions.depiction_key(self.mols[0], (100, 100)),
+            depictions.depiction_key(self.mols[1], (100, 100))  # Same canonical SMILES
+        )
+        self.assertNotEqual(
+            depictions.depiction_key(self.mols[0], (100, 100)),
+            depictions.depiction_key(self.mols[0], (200, 200))
+        )
+        self.assertEqual(
+            depictions.depiction_key(self.mols[0], (100, 100), key_type='inchi_key'),
+            '100x100:inchi_key:LFQSCWFLJHTTHZ-UHFFFAOYSA-N'
+        )
+        
+    def test_render_pngs(self):
+        cache = {}
+        pngs = depictions.render_pngs(self.mols, size=(100, 100), cache=cache)
+        self.assertEqual(len(pngs), 4)
+        assert all(png.startswith(b'\x89PNG') for png in pngs)
+        assert pngs[0] is pngs[1]  # Drawn once
+        self.assertEqual(len(cache), 3)
+        
+        # Cache hits are not redrawn, parallel matches serial
+        cache['100x100:smiles:CCO'] = b'cached'
+        self.assertEqual(depictions.render_pngs(self.mols, size=(100, 100), cache=cache)[0], b'cached')
+        self.assertEqual(depictions.render_pngs(self.mols, size=(100, 100), n_jobs=2, cache={}), pngs)
+        
+        with ProcessPoolExecutor(max_workers=2) as executor:  # One pool for several calls
+            self.assertEqual(depictions.render_pngs(self.mols, size=(100, 100), executor=executor), pngs)
+            self.assertEqual(depictions.render_pngs(self.mols, size=(100, 100), executor=executor), pngs)
+        
+        with self.assertRaises(ValueError):
+            depictions.render_pngs(self.mols, key_type='unknown')
+            
+    def test_png_cache(self):
+        cache = depictions.PngCache(max_bytes=10)
+        cache['a'] = b'1234'
+        cache['b'] = b'1234'
+        self.assertEqual(cache['a'], b'1234')  # Now most recently used
+        cache['c'] = b'1234'
+        self.assertEqual(list(cache), ['a', 'c'])
+        self.assertEqual(cache.nbytes, 8)
+        del cache['a']
+        self.assertEqual(cache.nbytes, 4)
+        
+        # Nothing persists unless a cache is passed
+        depictions.render_pngs(self.mols, size=(50, 50))
+        self.assertNotIn('50x50:smiles:CCO', depictions.image_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import pickle
+import pandas as pd
+import numpy as np
+from rdkit import Chem
+
+from naclo import MolArray, MolDtype
+from naclo.rdpickle import deserialize_mol, serialize_mol
+
+
+class TestMolArray(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.smiles = ['CCO', 'c1ccccc1', 'CN', None]
+        cls.mols = [Chem.MolFromSmiles(s) if s else None for s in cls.smiles]
+        cls.mols[0].SetProp('name', 'ethanol')
+        return super().setUpClass()
+
+    def to_smiles(self, values):
+        return [Chem.MolToSmiles(m) if isinstance(m, Chem.rdchem.Mol) else None for m in values]
+
+    def test_round_trip(self):
+        arr = MolArray.from_mols(self.mols)
+
+        self.assertIsInstance(arr.dtype, MolDtype)
+        self.assertEqual(self.to_smiles(arr), self.smiles)
+        self.assertEqual(arr.isna().tolist(), [False, False, False, True])
+        self.assertEqual(arr[0].GetProp('name'), 'ethanol')  # Properties kept
+
+        # Pickle transports only the buffer
+        out = pickle.loads(pickle.dumps(arr))
+        self.assertEqual(self.to_smiles(out), self.smiles)
+
+    def test_slicing(self):
+        arr = MolArray.from_mols(self.mols)
+
+        view = arr[1:3]
+        assert view._buffer is arr._buffer  # Zero-copy
+        self.assertEqual(self.to_smiles(view), self.smiles[1:3])
+
+        self.assertEqual(self.to_smiles(arr[[2, 0]]), ['CN', 'CCO'])
+        self.assertEqual(self.to_smiles(arr.take([1, -1], allow_fill=True)), ['c1ccccc1', None])
+        self.assertEqual(self.to_smiles(view.copy()), self.smiles[1:3])
+
+        # Runs, repeats, NA and empty takes; gathered buffer holds only the taken blobs
+        taken = arr.take([0, 1, 2, 2, 3, 0])
+        self.assertEqual(self.to_smiles(taken), ['CCO', 'c1ccccc1', 'CN', 'CN', None, 'CCO'])
+        self.assertEqual(taken.blobs(), [arr.blob(i) for i in [0, 1, 2, 2, 3, 0]])
+        self.assertEqual(len(arr[np.array([True, False, True, False])]._buffer), len(arr.blob(0) + arr.blob(2)))
+        self.assertEqual(len(arr.take([])), 0)
+
+        # Concatenating views copies only their bytes
+        joined = MolArray._concat_same_type([arr[2:3], view, MolArray.from_mols([])])
+        self.assertEqual(self.to_smiles(joined), ['CN', 'c1ccccc1', 'CN'])
+        self.assertEqual(len(joined._buffer), len(arr.blob(2))*2 + len(arr.blob(1)))
+
+    def test_pandas(self):
+        df = pd.DataFrame({
+            'ROMol': pd.Series(self.mols).astype('mol'),
+            'value': [1, 2, 1, 2]
+        })
+
+        self.assertEqual(
+            self.to_smiles(df.dropna()['ROMol']),
+            self.smiles[:3]
+        )
+        self.assertEqual(
+            self.to_smiles(df[df.value == 1]['ROMol']),
+            ['CCO', 'CN']
+        )
+        self.assertEqual(
+            self.to_smiles(pd.concat([df, df])['ROMol']),
+            2*self.smiles
+        )
+
+    def test_deserialize_mol(self):
+        # Reads both pickled and RDKit binary Mols
+        self.assertEqual(Chem.MolToSmiles(deserialize_mol(serialize_mol(self.mols[1]))), 'c1ccccc1')
+        self.assertEqual(Chem.MolToSmiles(deserialize_mol(self.mols[1].ToBinary())), 'c1ccccc1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -45,6 +45,19 @@ class TestMolConversion(unittest.TestCase):
             mol_conversion.smiles_2_inchi_keys(self.excel_smiles)
         )
 
+    def test_duplicate_key_function(self):
+        mols = mol_conversion.smiles_2_mols(['OCC', 'CCO', 'CCC'])
+        for key_type, length in [('inchi_key', 27), ('smiles', None), ('hash64', 16), ('hash128', 32),
+                                 ('registration_hash', 40)]:
+            keys = [mol_conversion.duplicate_key_function(key_type)(m) for m in mols]
+            self.assertEqual(keys[0], keys[1])
+            self.assertNotEqual(keys[0], keys[2])
+            if length:
+                self.assertEqual(len(keys[0]), length)
+        
+        with self.assertRaises(ValueError):
+            mol_conversion.duplicate_key_function('unknown')
+
     def test_mols_2_ecfp(self):
         ecfp = mol_conversion.mols_2_ecfp(self.sdf_mols, return_numpy=True)
         self.assertEqual(
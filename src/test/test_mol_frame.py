@@ -0,0 +1,80 @@
+import unittest
+import pandas as pd
+import numpy as np
+from rdkit import Chem
+
+from naclo import MolFrame
+
+
+class TestMolFrame(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.smiles_df = pd.DataFrame({
+            'SMILES': ['OCC', 'C1=CC=CC=C1', 'bad', np.nan],
+            'value': [1, 2, 3, 4]
+        })
+        return super().setUpClass()
+
+    def test_derived_columns(self):
+        mf = MolFrame(self.smiles_df, 'SMILES', 'smiles')
+
+        self.assertEqual(
+            mf.smiles.tolist()[:2],
+            ['CCO', 'c1ccccc1']
+        )
+        self.assertEqual(
+            mf.inchi_keys.iloc[0],
+            Chem.MolToInchiKey(Chem.MolFromSmiles('CCO'))
+        )
+        assert mf.mols.iloc[2:].isna().all()
+
+        # Memoized
+        assert mf.smiles is mf.smiles
+        assert mf.fingerprints() is mf.fingerprints()
+
+    def test_invalidate(self):
+        mf = MolFrame(self.smiles_df.copy(), 'SMILES', 'smiles')
+        first = mf.smiles
+
+        mf['SMILES'] = ['C', 'CC', 'CCC', 'CCCC']
+        self.assertEqual(
+            mf.smiles.tolist(),
+            ['C', 'CC', 'CCC', 'CCCC']
+        )
+        assert mf.smiles is not first
+
+        # In place edits: derived columns stay consistent with the snapshot until invalidate()
+        mf.df['SMILES'].to_numpy()[0] = 'CCl'
+        self.assertEqual(mf.smiles.iloc[0], 'C')
+        self.assertEqual(mf.inchi_keys.iloc[0], Chem.MolToInchiKey(Chem.MolFromSmiles('C')))
+        mf.invalidate()
+        self.assertEqual(mf.smiles.iloc[0], 'CCl')
+
+        # Non-structure columns do not invalidate
+        cached = mf.smiles
+        mf['value'] = 0
+        assert mf.smiles is cached
+
+    def test_to_df(self):
+        mf = MolFrame(self.smiles_df, 'SMILES', 'smiles')
+        out = mf.to_df({'smiles': 'canonical', 'inchi_key': 'InchiKey'})
+
+        self.assertEqual(
+            list(out.columns),
+            ['SMILES', 'value', 'canonical', 'InchiKey']
+        )
+        self.assertEqual(
+            len(out),
+            2
+        )
+        self.assertEqual(
+            list(self.smiles_df.columns),
+            ['SMILES', 'value']
+        )
+
+        with self.assertRaises(ValueError):
+            mf.to_df({'unknown': 'x'})
+
+
+if __name__ == '__main__':
+    unittest.main()
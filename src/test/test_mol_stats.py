@@ -22,6 +22,31 @@ class TestMolStats(unittest.TestCase):
             [57.021, 16.031]
         )
 
+    def test_mol_descriptors(self):
+        mols = self.test_mols + [None]
+        out = mol_stats.mol_descriptors(mols, descriptors=['mw', 'heavy_atoms', 'hba'], elements=['C', 'O', 'Cl'])
+
+        self.assertEqual(
+            list(out.columns),
+            ['mw', 'heavy_atoms', 'hba', 'num_C', 'num_O', 'num_Cl']
+        )
+        self.assertEqual(
+            list(out['mw'].round(3).iloc[:2]),
+            [57.021, 16.031]
+        )
+        self.assertEqual(
+            out.iloc[0, 1:].tolist(),
+            [4, 2, 2, 1, 0]
+        )
+        assert out.iloc[2].isna().all()
+
+        # Parallel matches serial
+        parallel = mol_stats.mol_descriptors(mols, elements=['C'], n_jobs=2, chunksize=1)
+        assert parallel.equals(mol_stats.mol_descriptors(mols, elements=['C']))
+
+        with self.assertRaises(ValueError):
+            mol_stats.mol_descriptors(mols, descriptors=['unknown'])
+
 
 if __name__ == '__main__':
     unittest.main()
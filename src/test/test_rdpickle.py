@@ -0,0 +1,51 @@
+import unittest
+from rdkit import Chem
+
+from naclo import rdpickle
+
+
+class TestRdpickle(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.smiles = ['CCO', 'c1ccccc1', 'CN']
+        cls.mols = [Chem.MolFromSmiles(s) for s in cls.smiles] + [None]
+        cls.mols[0].SetProp('name', 'ethanol')
+        cls.mols[1].GetAtomWithIdx(0).SetProp('label', 'a0')
+        return super().setUpClass()
+
+    def test_serialize_mols(self):
+        for compress in [False, True]:
+            buf = rdpickle.serialize_mols(self.mols, compress=compress)
+            out = rdpickle.deserialize_mols(buf)
+
+            self.assertEqual(
+                [Chem.MolToSmiles(m) for m in out[:3]],
+                self.smiles
+            )
+            self.assertIsNone(out[3])
+
+            # Properties are kept
+            self.assertEqual(out[0].GetProp('name'), 'ethanol')
+            self.assertEqual(out[1].GetAtomWithIdx(0).GetProp('label'), 'a0')
+
+    def test_deserialize_mols_lazy(self):
+        lazy = rdpickle.deserialize_mols(rdpickle.serialize_mols(self.mols, compress=True), lazy=True)
+
+        self.assertEqual(len(lazy), 4)
+        self.assertEqual(Chem.MolToSmiles(lazy[2]), 'CN')
+        self.assertEqual(lazy.isna().tolist(), [False, False, False, True])
+
+    def test_bad_buffer(self):
+        with self.assertRaises(ValueError):
+            rdpickle.deserialize_mols(b'not a batch of mols at all')
+
+        # Truncated header, offset table and payload
+        for compress in [False, True]:
+            buf = rdpickle.serialize_mols(self.mols, compress=compress)
+            for size in [0, 10, 25, len(buf) - 1]:
+                with self.assertRaises(ValueError):
+                    rdpickle.deserialize_mols(buf[:size])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import copy
+import os
+import tempfile
+import unittest
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem import PandasTools
+
+from naclo import Bleach, bleach_default_options, readers
+
+
+class TestReaders(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.sdf_path = 'test/assets/sdf_test_case.sdf'
+        cls.smiles = ['CCO', 'c1ccccc1', 'C1CC', 'CCCCN.Cl']
+        
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.smiles_path = os.path.join(cls.tmp.name, 'test.csv')
+        pd.DataFrame({'SMILES': cls.smiles, 'name': ['a', 'b', 'c', 'd'], 'value': [1.5, 2, 3, 4]}).to_csv(
+            cls.smiles_path, index=False)
+        return super().setUpClass()
+    
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+        return super().tearDownClass()
+    
+    def test_read_sdf(self):
+        expected = PandasTools.LoadSDF(self.sdf_path, molColName='ROMol')
+        for n_jobs in [1, 2]:
+            out = readers.read_sdf(self.sdf_path, n_jobs=n_jobs)
+            self.assertEqual(list(out.columns), ['ID', 'Smiles', 'InChi', 'ROMol'])
+            self.assertEqual(list(out.Smiles), list(expected.Smiles))  # File order
+            self.assertEqual(list(out.ROMol.map(Chem.MolToSmiles)), list(expected.ROMol.map(Chem.MolToSmiles)))
+            
+        # Projection and chunks
+        chunks = list(readers.iter_sdf(self.sdf_path, properties=['InChi'], id_col_name=None, chunksize=3))
+        self.assertEqual([len(c) for c in chunks], [3, 1])
+        self.assertEqual(list(chunks[0].columns), ['InChi', 'ROMol'])
+        
+        # Lazy: mol block text, same titles and properties
+        out = readers.read_sdf(self.sdf_path, lazy=True)
+        expected = readers.read_sdf(self.sdf_path)
+        pd.testing.assert_frame_equal(out.drop(columns=['ROMol']), expected.drop(columns=['ROMol']))
+        self.assertEqual([Chem.MolToSmiles(Chem.MolFromMolBlock(b)) for b in out.ROMol],
+                         list(expected.ROMol.map(Chem.MolToSmiles)))
+    
+    def test_sdf_columns(self):
+        sdf_path = os.path.join(self.tmp.name, 'properties.sdf')
+        with Chem.SDWriter(sdf_path) as writer:
+            for smiles, props in [('CCC', {'value': '1'}), ('CCO', {'value': '2', 'extra': 'x'})]:
+                mol = Chem.MolFromSmiles(smiles)
+                for name, value in props.items():
+                    mol.SetProp(name, value)
+                writer.write(mol)
+        
+        # Properties first found in a later chunk are columns of every chunk
+        for lazy in [False, True]:
+            chunks = list(readers.iter_sdf(sdf_path, chunksize=1, lazy=lazy))
+            self.assertEqual([list(c.columns) for c in chunks], [['ID', 'value', 'extra', 'ROMol']]*2)
+            self.assertTrue(pd.isna(chunks[0].extra[0]))
+        
+    def test_parallel_order(self):
+        block = lambda smiles: Chem.MolToMolBlock(Chem.MolFromSmiles(smiles)) + '$$$$\n'
+        sdf_path = os.path.join(self.tmp.name, 'edge.sdf')
+        with open(sdf_path, 'w') as f:  # Empty Mol and unparsable records
+            f.write(block('CCO') + Chem.MolToMolBlock(Chem.Mol()) + '$$$$\nbroken\n  junk\n\nM  END\n$$$$\n' +
+                    block('CCC') + block('CCCC'))
+        smiles_path = os.path.join(self.tmp.name, 'edge.smi')
+        with open(smiles_path, 'w') as f:  # Comment line and unparsable record
+            f.write('SMILES name\nCCO a\n# comment\nCCC b\nC1CC c\nCCCC d\n')
+
+        to_smiles = lambda mols: [Chem.MolToSmiles(m) if isinstance(m, Chem.Mol) else None for m in mols]
+        expected_sdf = readers.read_sdf(sdf_path)
+        expected_smiles = readers.read_smiles(smiles_path)
+        self.assertEqual(to_smiles(expected_sdf.ROMol), ['CCO', '', None, 'CCC', 'CCCC'])
+        self.assertEqual(list(expected_smiles.name.fillna('')), ['a', 'b', '', 'd'])
+        for n_jobs in [2, 4]:
+            out = readers.read_sdf(sdf_path, n_jobs=n_jobs)
+            self.assertEqual(to_smiles(out.ROMol), to_smiles(expected_sdf.ROMol))
+            self.assertTrue(out.drop(columns=['ROMol']).equals(expected_sdf.drop(columns=['ROMol'])))
+            out = readers.read_smiles(smiles_path, n_jobs=n_jobs)
+            self.assertEqual(to_smiles(out.ROMol), to_smiles(expected_smiles.ROMol))
+            self.assertTrue(out.drop(columns=['ROMol']).equals(expected_smiles.drop(columns=['ROMol'])))
+
+    def test_read_smiles(self):
+        for n_jobs in [1, 2]:
+            out = readers.read_smiles(self.smiles_path, n_jobs=n_jobs)
+            self.assertEqual(list(out.columns), ['ROMol', 'name', 'value'])
+            self.assertEqual(list(out.name.fillna('')), ['a', 'b', '', 'd'])  # Unparsable row is NA
+            self.assertEqual(Chem.MolToSmiles(out.ROMol[1]), 'c1ccccc1')
+            
+        out = readers.read_smiles(self.smiles_path, columns=['value'], lazy=True)
+        self.assertEqual(list(out.columns), ['SMILES', 'value'])
+        self.assertEqual(list(out.SMILES), self.smiles)
+        
+        with self.assertRaises(ValueError):
+            readers.read_smiles(self.smiles_path, smiles_col='smiles')
+            
+    def test_readers_2_bleach(self):
+        options = copy.deepcopy(bleach_default_options)
+        df = readers.read_smiles(self.smiles_path)
+        out = Bleach(df, {'structure_col': 'ROMol', 'structure_type': 'mol', 'target_col': ''}, options).main()
+        self.assertEqual(list(out.SMILES), ['CCO', 'c1ccccc1', 'CCCCN'])
+        
+        df = readers.read_smiles(self.smiles_path, lazy=True)
+        out = Bleach(df, {'structure_col': 'SMILES', 'structure_type': 'smiles', 'target_col': ''}, options).main()
+        self.assertEqual(list(out.SMILES), ['CCO', 'c1ccccc1', 'CCCCN'])
+
+
+if __name__ == '__main__':
+    unittest.main()
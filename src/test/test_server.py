@@ -0,0 +1,121 @@
+import asyncio
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from naclo import clean_structure
+from naclo import server as naclo_server
+from naclo.server import CleaningServer
+
+
+class TestServer(unittest.TestCase):
+    def test_clean_micro_batches(self):
+        structures = [['CCC.Cl', 'none'], ['[O-]c1ccccc1CCN', 'C1CC']]
+
+        async def run():
+            async with CleaningServer(max_batch_size=10, max_delay=0.2) as server:
+                out = await asyncio.gather(*[server.clean(s) for s in structures])
+                return out, dict(server.stats)
+
+        out, stats = asyncio.run(run())
+        self.assertEqual(stats, {'requests': 2, 'structures': 4, 'batches': 1})  # Both requests in one batch
+        for results, smiles in zip(out, structures):
+            for result, s in zip(results, smiles):
+                expected = clean_structure(s)
+                self.assertEqual(result, {'smiles': expected.smiles, 'inchi_key': expected.inchi_key,
+                                          'mw': expected.mw, 'dropped': expected.dropped})
+
+        # Batch size cap
+        async def run_small():
+            async with CleaningServer(max_batch_size=1, max_delay=0.2) as server:
+                await server.clean(['C', 'CC', 'CCC'])
+                return server.stats['batches']
+
+        self.assertEqual(asyncio.run(run_small()), 3)
+
+    def test_failed_batch(self):
+        clean_batch = naclo_server._clean_batch
+
+        def failing_batch(structures, options):
+            if 'fail' in structures:
+                raise RuntimeError('worker failed')
+            return clean_batch(structures, options)
+
+        async def run():
+            async with CleaningServer(max_batch_size=10, max_delay=0.2, executor=executor) as server:
+                out = await asyncio.gather(server.clean(['CCO']), server.clean(['C', 'fail']), server.clean(['CC']),
+                                           return_exceptions=True)
+                return out, server.stats['batches']
+
+        # Requests sharing a failed batch are retried on their own, only the failing one errors
+        with ThreadPoolExecutor(1) as executor, mock.patch.object(naclo_server, '_clean_batch', failing_batch):
+            (first, failed, last), batches = asyncio.run(run())
+        self.assertEqual(batches, 1)
+        self.assertEqual(first[0]['smiles'], 'CCO')
+        self.assertIsInstance(failed, RuntimeError)
+        self.assertEqual(last[0]['smiles'], 'CC')
+
+    def test_close_fails_waiting(self):
+        async def run():
+            server = CleaningServer(max_batch_size=10, max_delay=10, executor=executor)
+            request = asyncio.create_task(server.clean(['C']))
+            await asyncio.sleep(0.05)  # Structure waits for the batch to fill
+            await server.close()
+            return await asyncio.gather(request, return_exceptions=True)
+
+        with ThreadPoolExecutor(1) as executor:
+            out = asyncio.run(asyncio.wait_for(run(), 5))
+        self.assertIsInstance(out[0], RuntimeError)
+
+    def test_server_protocol(self):
+        async def run():
+            async with CleaningServer(max_delay=0) as server:
+                listener = await server.start(port=0)
+                port = listener.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(b'{"id": 1, "structures": ["CCC.Cl"]}\nnot json\n{"id": 3}\n')
+                await writer.drain()
+                responses = [json.loads(await reader.readline()) for _ in range(3)]
+                writer.close()
+                return sorted(responses, key=lambda r: str(r['id']))
+
+        responses = asyncio.run(run())
+        self.assertEqual(responses[0]['results'][0]['smiles'], 'CCC')
+        self.assertEqual(responses[1]['id'], 3)
+        self.assertIn('structures', responses[1]['error'])
+        self.assertIsNone(responses[2]['id'])
+        self.assertIn('error', responses[2])
+
+    def test_serialized_writes(self):
+        class Writer:  # Fails like StreamWriter.drain() before Python 3.10 if drains overlap
+            def __init__(self) -> None:
+                self.lines, self.draining = [], False
+
+            def write(self, data):
+                self.lines.append(data)
+
+            async def drain(self):
+                assert not self.draining, 'concurrent drain'
+                self.draining = True
+                await asyncio.sleep(0.01)
+                self.draining = False
+
+            def close(self):
+                pass
+
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(b'not json\n' * 5)
+            reader.feed_eof()
+            writer = Writer()
+            async with CleaningServer(max_delay=0) as server:
+                await server._CleaningServer__handle_connection(reader, writer)
+            return writer.lines
+
+        lines = asyncio.run(asyncio.wait_for(run(), 5))
+        self.assertEqual(len(lines), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
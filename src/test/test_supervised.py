@@ -0,0 +1,32 @@
+import os
+import time
+import unittest
+
+from naclo.supervised import supervised_map
+
+
+def work(x):
+    if x == 'slow':
+        time.sleep(30)
+    elif x == 'crash':
+        os._exit(1)
+    elif x == 'error':
+        raise ValueError('bad item')
+    return x*2
+
+
+class TestSupervised(unittest.TestCase):
+    def test_supervised_map(self):
+        items = [1, 'slow', 2, 'crash', 'error', 3]
+        for n_jobs in [1, 2]:
+            start = time.monotonic()
+            out = supervised_map(work, items, timeout=0.5, n_jobs=n_jobs, max_tasks=2)
+            self.assertLess(time.monotonic() - start, 10)
+            self.assertEqual(out, [('ok', 2), ('timeout', None), ('ok', 4), ('crash', None),
+                                   ('error', 'ValueError: bad item'), ('ok', 6)])
+        
+        self.assertEqual(supervised_map(work, [], timeout=1), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
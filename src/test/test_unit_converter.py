@@ -80,6 +80,43 @@ class TestUnitConverter(unittest.TestCase):
                 equal_nan=True
             )
         )
-        
+
+    def test_parse_unit(self):
+        expected = {
+            'ug•ml-1': ('ug/ml', 1e-3),  # recognized_units.json
+            'nM ': ('nm', 1e-9),
+            'µmol/L': ('um', 1e-6),
+            'μM': ('um', 1e-6),
+            '10^-6 M': ('um', 1e-6),
+            '10⁻⁶ M': ('um', 1e-6),
+            '1e-9 M': ('nm', 1e-9),
+            'ug.mL-1': ('ug/ml', 1e-3),
+            'mcg/mL': ('ug/ml', 1e-3),
+            'mg l^-1': ('mg/l', 1e-3),
+            'mg/dL': ('g/l', 1e-2),
+            'mmol/mL': ('m', 1),
+            'mol dm-3': ('m', 1),
+            'fM': ('m', 1e-15),
+            'fg/mL': ('g/l', 1e-12),
+            'fg/L': ('g/l', 1e-15),
+            '10^-3 g/L': ('g/l', 1e-3)
+        }
+        for unit, (standard_unit, multiplier) in expected.items():
+            self.assertEqual(UnitConverter.parse_unit(unit)[0], standard_unit)
+            self.assertAlmostEqual(UnitConverter.parse_unit(unit)[1], multiplier, delta=multiplier*1e-12)
+
+        for unit in ['mol', 'g', 'mm/l', 'percent', 'nan']:
+            self.assertTrue(np.isnan(UnitConverter.parse_unit(unit)[1]))
+
+    def test_standardize_units(self):
+        converter = UnitConverter([1, 2, 3, 4], ['10^-6 M', 'µmol/L', 'µmol/L', 'mg/dL'], [100, 100, 100, 100])
+        self.assertEqual(converter.df['standard_unit'].tolist(), ['um', 'um', 'um', 'g/l'])
+        self.assertTrue(np.allclose(converter.to_molar(), [1e-6, 2e-6, 3e-6, 4e-4]))
+
+        # Mass units without a recognized spelling convert through g/L
+        converter = UnitConverter([1, 2, 3], ['fg/mL', 'fg/L', 'ng/mL'], [100, 100, 100])
+        self.assertEqual(converter.df['standard_unit'].tolist(), ['g/l', 'g/l', 'ng/ml'])
+        np.testing.assert_allclose(converter.to_molar(), [1e-14, 2e-17, 3e-8])
+
 if __name__ == '__main__':
     unittest.main()